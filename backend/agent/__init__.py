@@ -1,3 +1,11 @@
-from .agent import ProductAnalysisAgent
+__all__ = ["ProductAnalysisAgent", "get_agent"]
 
-__all__ = ["ProductAnalysisAgent"]
+
+def __getattr__(name: str):
+    # agent.agent (langchain) ilk erişimde yüklenir — `from agent import config`
+    # gibi hafif alt modül importları LLM SDK'larını çekmesin
+    if name in __all__:
+        from . import agent as _agent
+
+        return getattr(_agent, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
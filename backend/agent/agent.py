@@ -3,165 +3,76 @@ Product Analysis Agent — Direct Pipeline
 ─────────────────────────────────────────────────────────────
 Tek LLM çağrısı ile ürün analizi + form oluşturma.
 
+analyze() async, analyze_sync() senkron sürümdür; ikisi aynı adımları izler.
+analyze_stream() aynı çağrıyı akış olarak yapar ve alanları tamamlandıkça verir.
+Fotoğrafsız analizde model sırası model_router'dan gelir (Gemini flash,
+flash-lite, Groq Llama); her sağlayıcının prompt adaptörü PROMPT_ADAPTERS'tadır.
+
 Akış (toplam 1 LLM çağrısı):
   1. [Python] Şema bilgisini al (DB + product_specs)
   2. [LLM]   Açıklama + şema → doldurulmuş form JSON
-  3. [Python] Form doğrulama (validator)
+  3. [Python] Form doğrulama (form_validator — kategori/çeşit bazlı derlenmiş)
 
 Önceki ReAct agent 7+ API çağrısı yapıyordu.
 Bu pipeline tek çağrı ile aynı sonucu üretir.
 """
+import asyncio
+import hashlib
 import json
 import logging
-from typing import Any, Optional
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional
 
 from langchain_core.messages import HumanMessage
 
 from agent.config import (
+    BATCH_MAX_DESCRIPTION_TOKENS,
+    BATCH_MAX_ITEMS,
     GOOGLE_MODEL,
     GOOGLE_MODEL_FALLBACK,
+    HEDGE_ENABLED,
+    PRECLASSIFIER_ENABLED,
+    PRECLASSIFIER_TOP_K,
+    ROUTER_ENABLED,
+    bind_google_json,
     configure_langsmith,
     get_google_llm,
+    get_groq_llm,
+)
+from agent import call_ledger, hedging, model_router
+from agent.analysis_cache import get_cached_result, make_cache_key, store_result
+from agent.category_classifier import CategoryClassifier, build_classifier
+from agent.form_validator import validate_product
+from agent.json_stream import IncrementalJSONParser
+from agent.output_schema import (
+    allow_no_match,
+    batch_schema,
+    build_category_schemas,
+    merge_category_schemas,
+)
+from agent.prompt_cache import get_cached_prefix
+from agent.schema_registry import Registry, get_registry
+from agent.rate_limiter import aacquire, acquire, mark_rate_limited
+from agent.retry import (
+    ainvoke_with_retry,
+    invoke_with_retry,
+    is_rate_limit_error,
+    retry_delay_seconds,
 )
-from agent.retry import invoke_with_retry, is_rate_limit_error
 
-logger = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    from image_ingest import IngestedImage
 
-# ─── Frontend CATEGORY_TEMPLATES — AI'ın kullanacağı alan adları ───
-# Frontend'teki formun EXACT alan adlarını kullanmalıyız
-FRONTEND_CATEGORY_FIELDS: dict[str, dict] = {
-    "Kazanlar": {
-        "types": ["buhar_kazani", "cift_cidarli_kazan", "tencere_kazan", "cay_kazani", "corba_kazani"],
-        "fields": ["capacity_liters", "energy_type", "diameter_cm", "height_cm"],
-        "energy_options": ["Gazlı", "Elektrikli"],
-    },
-    "Fırınlar": {
-        "types": ["konveksiyonlu_firin", "pastane_firini", "pizza_firini", "doner_firini", "tunnel_firin", "rotary_firin"],
-        "fields": ["energy_type", "tray_count", "tray_size", "length_cm", "width_cm", "height_cm"],
-        "energy_options": ["Gazlı", "Elektrikli"],
-    },
-    "Ocaklar": {
-        "types": ["gazli_ocak", "elektrikli_ocak", "induksiyonlu_ocak", "wok_ocagi", "pasta_ocagi", "krep_ocagi"],
-        "fields": ["burner_count", "energy_type", "length_cm", "width_cm", "height_cm"],
-        "energy_options": ["Gazlı", "Elektrikli", "İndüksiyon"],
-    },
-    "Buzdolapları": {
-        "types": ["tek_kapili_buzdolabi", "cift_kapili_buzdolabi", "dikey_donduruculu_buzdolabi", "soklama_buzdolabi", "vitrini_buzdolabi"],
-        "fields": ["volume_liters", "door_count", "cooling_type", "length_cm", "width_cm", "height_cm"],
-        "energy_options": [],
-    },
-    "Evyeler": {
-        "types": ["tek_gozlu_evye", "cift_gozlu_evye", "uc_gozlu_evye", "damlalikli_evye", "kose_evye"],
-        "fields": ["length_cm", "width_cm", "height_cm", "depth_cm", "basin_count", "has_drainboard", "thickness_mm"],
-        "energy_options": [],
-    },
-    "Tezgahlar": {
-        "types": ["paslanmaz_celik_tezgah", "granit_tezgah", "mermer_tezgah", "kesme_tezgahi", "hazirlik_tezgahi"],
-        "fields": ["length_cm", "width_cm", "height_cm", "has_bottom_shelf", "has_backsplash", "thickness_mm"],
-        "energy_options": [],
-    },
-    "Fritözler": {
-        "types": ["basincli_fritoz", "klasik_fritoz", "elektrikli_fritoz", "gazli_fritoz"],
-        "fields": ["capacity_liters", "energy_type", "tank_count", "length_cm", "width_cm", "height_cm"],
-        "energy_options": ["Gazlı", "Elektrikli"],
-    },
-    "Benmari": {
-        "types": ["elektrikli_benmari", "gazli_benmari", "kuru_benmari", "sulu_benmari"],
-        "fields": ["compartment_count", "energy_type", "heating_type", "length_cm", "width_cm", "height_cm"],
-        "energy_options": ["Elektrikli", "Gazlı"],
-    },
-    "Tost Makineleri": {
-        "types": ["sandvic_tost_makinesi", "krep_tost_makinesi", "panini_makinesi"],
-        "fields": ["plate_size", "plate_type", "energy_type"],
-        "energy_options": ["Elektrikli", "Gazlı"],
-        "plate_type_options": ["Düz", "Oluklu", "Karışık"],
-    },
-    "Arabalar": {
-        "types": ["pilav_arabasi", "kokorec_arabasi", "tantuni_arabasi", "doner_arabasi", "servis_arabasi", "tasima_arabasi"],
-        "fields": ["length_cm", "width_cm", "height_cm", "energy_type", "has_glass", "wheel_count"],
-        "energy_options": ["Tüplü", "Doğalgaz", "Elektrikli", "Kömürlü", "Gazlı", "Yok"],
-    },
-    "Dondurucular": {
-        "types": ["dikey_dondurucu", "yatay_dondurucu", "soklama_dondurucu", "dondurma_dondurucu"],
-        "fields": ["volume_liters", "temperature_min", "length_cm", "width_cm", "height_cm"],
-        "energy_options": [],
-    },
-    "Aspiratörler": {
-        "types": ["duvar_tipi_aspirator", "ada_tipi_aspirator", "tavan_tipi_aspirator", "kanalli_aspirator"],
-        "fields": ["length_cm", "width_cm", "height_cm", "filter_type", "has_motor"],
-        "energy_options": [],
-    },
-    "Kesme Makineleri": {
-        "types": ["et_kiyma_makinesi", "sebze_dograma_makinesi", "ekmek_dilimleme_makinesi", "et_dilimleme_makinesi"],
-        "fields": ["power_hp", "blade_diameter_mm", "capacity_kg_h", "energy_type"],
-        "energy_options": ["Elektrikli", "Manuel"],
-    },
-    "Mikserler": {
-        "types": ["planet_mikser", "spiral_mikser", "cirpma_makinesi", "hamur_yogurma_makinesi"],
-        "fields": ["capacity_liters", "power_hp", "speed_count"],
-        "energy_options": [],
-    },
-    "Izgaralar": {
-        "types": ["gazli_izgara", "elektrikli_izgara", "kontakt_izgara", "tavuk_izgara"],
-        "fields": ["energy_type", "cooking_area", "length_cm", "width_cm", "height_cm"],
-        "energy_options": ["Gazlı", "Elektrikli", "Kömürlü"],
-    },
-    "Kahve Makineleri": {
-        "types": ["espresso_makinesi", "filtre_kahve_makinesi", "turk_kahvesi_makinesi", "otomatik_kahve_makinesi"],
-        "fields": ["group_count", "boiler_capacity", "brand"],
-        "energy_options": [],
-    },
-    "Çay Kazanları": {
-        "types": ["elektrikli_cay_kazani", "gazli_cay_kazani", "termos_cay_kazani"],
-        "fields": ["capacity_liters", "energy_type", "tap_count"],
-        "energy_options": ["Elektrikli", "Gazlı"],
-    },
-    "Bulaşık Makineleri": {
-        "types": ["bulasik_yikama_makinesi", "bulasik_kurutma_makinesi", "tunel_tipi_bulasik_makinesi"],
-        "fields": ["capacity_basket_h", "wash_type", "length_cm", "width_cm", "height_cm"],
-        "energy_options": [],
-    },
-    "Ekmek Kızartma Makineleri": {
-        "types": ["ekmek_kizartma_makinesi", "coklu_ekmek_kizartma_makinesi"],
-        "fields": ["slice_capacity", "conveyor_type"],
-        "energy_options": [],
-    },
-    "Döner Makineleri": {
-        "types": ["elektrikli_doner_makinesi", "gazli_doner_makinesi", "dikey_doner_makinesi"],
-        "fields": ["energy_type", "capacity_kg", "burner_count", "height_cm"],
-        "energy_options": ["Gazlı", "Elektrikli"],
-    },
-    "Pizza Fırınları": {
-        "types": ["tas_firin", "elektrikli_pizza_firini", "tunel_pizza_firini"],
-        "fields": ["energy_type", "pizza_capacity", "pizza_diameter_cm", "deck_count"],
-        "energy_options": ["Gazlı", "Elektrikli", "Odunlu"],
-    },
-    "Krep Makineleri": {
-        "types": ["krep_tavasi", "elektrikli_krep_makinesi", "gazli_krep_makinesi"],
-        "fields": ["plate_diameter_cm", "plate_count", "energy_type"],
-        "energy_options": ["Elektrikli", "Gazlı"],
-    },
-    "Waffle Makineleri": {
-        "types": ["elektrikli_waffle_makinesi", "gazli_waffle_makinesi"],
-        "fields": ["mold_count", "mold_shape", "energy_type"],
-        "energy_options": ["Elektrikli", "Gazlı"],
-    },
-    "Raflar": {
-        "types": ["duz_raf", "kose_raf", "duvar_rafi", "delikli_raf"],
-        "fields": ["length_cm", "width_cm", "height_cm", "shelf_count", "load_capacity_kg"],
-        "energy_options": [],
-    },
-}
+logger = logging.getLogger(__name__)
 
 # ─── Tek adımlık analiz + form prompt'u ───────────────────────
-UNIFIED_PROMPT = """Sen endüstriyel mutfak ekipmanları uzmanısın. Kullanıcının ürün açıklamasını analiz edip form verisi oluştur.
+# Sabit kısım (kategoriler + kurallar + çıktı formatı) önde, kullanıcı
+# açıklaması sonda — böylece önek sağlayıcı tarafında önbelleklenebilir.
+UNIFIED_PROMPT_PREFIX = """Sen endüstriyel mutfak ekipmanları uzmanısın. Kullanıcının ürün açıklamasını analiz edip form verisi oluştur.
 
 ## MEVCUT KATEGORİLER VE ÜRÜN ÇEŞİTLERİ
 {category_types_desc}
 
-## KULLANICI AÇIKLAMASI
-{user_description}
-
 ## KURALLAR
 1. Sadece açıklamada GEÇEN bilgileri kullan, UYDURMA
 2. category_name: Tam olarak yukarıdaki kategori adlarından birini seç
@@ -185,7 +96,215 @@ UNIFIED_PROMPT = """Sen endüstriyel mutfak ekipmanları uzmanısın. Kullanıc
     "extra_specs": {{
         "alan_adi": "deger"
     }}
-}}"""
+}}
+"""
+
+UNIFIED_PROMPT_SUFFIX = """
+## KULLANICI AÇIKLAMASI
+{user_description}"""
+
+
+BATCH_PROMPT_SUFFIX = """
+## TOPLU ANALİZ
+Aşağıda numaralandırılmış {count} ayrı ürün açıklaması var. Her açıklamayı BAĞIMSIZ değerlendir.
+Her biri için yukarıdaki ÇIKTI formatında bir nesne üret ve "index" alanına açıklamanın numarasını yaz.
+Çıktı SADECE bir JSON dizisi olsun: [{{"index": 1, ...}}, {{"index": 2, ...}}]
+
+## KULLANICI AÇIKLAMALARI
+{numbered_descriptions}"""
+
+
+def build_category_types_desc(categories: dict[str, dict]) -> str:
+    """Kategori → types/fields/seçenekler listesini prompt metnine çevir."""
+    lines = []
+    for cat_name, cat_info in categories.items():
+        types_str = ", ".join(cat_info["types"])
+        fields_str = ", ".join(cat_info["fields"])
+        extras = []
+        if cat_info.get("energy_options"):
+            extras.append(f"energy_type seçenekleri: {', '.join(cat_info['energy_options'])}")
+        for key, options in cat_info.items():
+            if key.endswith("_options") and key != "energy_options" and options:
+                extras.append(f"{key.removesuffix('_options')} seçenekleri: {', '.join(options)}")
+        extras_str = f" ({'; '.join(extras)})" if extras else ""
+        lines.append(f"- {cat_name}: types=[{types_str}], fields=[{fields_str}]{extras_str}\n")
+    return "".join(lines)
+
+
+NARROWED_CATEGORIES_NOTE = (
+    "(Ürün bu kategorilerden hiçbirine uymuyorsa category_name alanını boş bırak)\n"
+)
+
+
+class PromptState:
+    """Şema kayıt defterinin bir sürümünden üretilen önek, çıktı şemaları ve ön sınıflandırıcı.
+
+    Kayıt defteri sürümü değişene kadar bir kez hesaplanır — her istekte
+    yeniden kurulmaz.
+    """
+
+    def __init__(self, registry: Registry) -> None:
+        self.registry_version = registry.version
+        self.categories = registry.prompt_categories
+        self.prefix = UNIFIED_PROMPT_PREFIX.format(
+            category_types_desc=build_category_types_desc(self.categories),
+        )
+        self.category_schemas = build_category_schemas(self.categories)
+        self.form_schema = merge_category_schemas(list(self.category_schemas.values()))
+        self.batch_form_schema = batch_schema(self.form_schema)
+        # Önek veya şema değişince yanıt önbelleği de geçersizleşsin
+        self.version = hashlib.sha256(
+            (self.prefix + json.dumps(self.form_schema, sort_keys=True)).encode("utf-8")
+        ).hexdigest()[:16]
+        self._type_labels = {
+            name: [{"value": value, "label": label} for value, label in registry.categories[name].types]
+            for name in self.categories
+        }
+        self._classifier: Optional[CategoryClassifier] = None
+        self._narrowed: dict[tuple[str, ...], tuple[str, dict[str, Any]]] = {}
+
+    @property
+    def classifier(self) -> CategoryClassifier:
+        if self._classifier is None:
+            self._classifier = build_classifier(self.categories, self._type_labels)
+        return self._classifier
+
+    def narrowed(self, categories: tuple[str, ...]) -> tuple[str, dict[str, Any]]:
+        """Sadece aday kategorilerin şemasını içeren önek ve birleşik çıktı şeması."""
+        entry = self._narrowed.get(categories)
+        if entry is None:
+            known = [c for c in categories if c in self.category_schemas]
+            if not known:
+                return self.prefix, self.form_schema
+            desc = build_category_types_desc({c: self.categories[c] for c in known})
+            desc += NARROWED_CATEGORIES_NOTE
+            entry = (
+                UNIFIED_PROMPT_PREFIX.format(category_types_desc=desc),
+                # boş kategori = hiçbiri uymadı
+                allow_no_match(merge_category_schemas([self.category_schemas[c] for c in known])),
+            )
+            self._narrowed[categories] = entry
+        return entry
+
+
+_prompt_state: Optional[PromptState] = None
+
+
+def prompt_state() -> PromptState:
+    """Geçerli kayıt defteri sürümünün prompt durumu."""
+    global _prompt_state
+    registry = get_registry()
+    state = _prompt_state
+    if state is None or state.registry_version != registry.version:
+        state = _prompt_state = PromptState(registry)
+    return state
+
+
+def build_analysis_prompt(user_description: str) -> str:
+    return prompt_state().prefix + UNIFIED_PROMPT_SUFFIX.format(user_description=user_description)
+
+
+def get_category_classifier() -> CategoryClassifier:
+    """Ön sınıflandırıcı (kayıt defteri sürümü başına bir kez kurulur)."""
+    return prompt_state().classifier
+
+
+def narrowed_prompt_prefix(categories: tuple[str, ...]) -> str:
+    """Sadece aday kategorilerin şemasını içeren önek."""
+    return prompt_state().narrowed(categories)[0]
+
+
+def narrowed_form_schema(categories: tuple[str, ...]) -> dict[str, Any]:
+    """Aday kategorilerin birleşik şeması (boş kategori = hiçbiri uymadı)."""
+    return prompt_state().narrowed(categories)[1]
+
+
+# ─── Sağlayıcı prompt adaptörleri ─────────────────────────────
+# (model, son ek, aday kategoriler, şema) → (LLM istemcisi, prompt)
+
+GROQ_OUTPUT_NOTE = """
+
+Yanıtın yalnızca tek bir JSON nesnesi olsun; açıklama veya markdown ekleme."""
+
+
+def _google_prompt(
+    model_name: str,
+    suffix: str,
+    candidates: Optional[list[str]],
+    schema: Optional[dict[str, Any]],
+):
+    """Gemini: tam önek sağlayıcıda önbelleklenmişse sadece son ek gönderilir;
+    istemci çıktı JSON Schema'sına bağlanır."""
+    state = prompt_state()
+    if candidates:
+        prefix, narrowed_schema = state.narrowed(tuple(candidates))
+        schema = schema or narrowed_schema
+        llm, prompt = get_google_llm(model=model_name), prefix + suffix
+    else:
+        schema = schema or state.form_schema
+        cache_name = get_cached_prefix(model_name, state.prefix)
+        if cache_name:
+            llm, prompt = get_google_llm(model=model_name, cached_content=cache_name), suffix
+        else:
+            llm, prompt = get_google_llm(model=model_name), state.prefix + suffix
+
+    return bind_google_json(llm, schema), prompt
+
+
+def _groq_prompt(
+    model_name: str,
+    suffix: str,
+    candidates: Optional[list[str]],
+    schema: Optional[dict[str, Any]],
+):
+    """Groq (Llama): önek önbelleği ve response_json_schema yok — önek her
+    seferinde gönderilir, şema kuralları prompt'tadır. Tek form isteniyorsa
+    JSON moduna alınır (JSON modu dizi döndüremez; toplu şema serbest metin)."""
+    state = prompt_state()
+    prefix = state.narrowed(tuple(candidates))[0] if candidates else state.prefix
+    llm = get_groq_llm(model=model_name)
+    if schema is None or schema.get("type") == "object":
+        llm = llm.bind(response_format={"type": "json_object"})
+    return llm, prefix + suffix + GROQ_OUTPUT_NOTE
+
+
+PROMPT_ADAPTERS = {"google": _google_prompt, "groq": _groq_prompt}
+
+
+# Akışta "field" olayı olarak gönderilen kök form alanları (prompt sırasıyla)
+STREAM_FORM_FIELDS = (
+    "category_name",
+    "product_type_value",
+    "name",
+    "purchase_price",
+    "sale_price",
+    "negotiation_margin",
+    "negotiation_type",
+    "material",
+    "notes",
+)
+
+
+def _estimate_tokens(text: str) -> int:
+    """Kaba token tahmini (Türkçe metin için ~3 karakter/token)."""
+    return len(text) // 3 + 1
+
+
+def chunk_for_batch(indices: list[int], descriptions: list[str]) -> list[list[int]]:
+    """Açıklamaları BATCH_MAX_ITEMS ve token bütçesine sığan parçalara böl."""
+    chunks: list[list[int]] = []
+    current: list[int] = []
+    budget = 0
+    for i in indices:
+        cost = _estimate_tokens(descriptions[i])
+        if current and (len(current) >= BATCH_MAX_ITEMS or budget + cost > BATCH_MAX_DESCRIPTION_TOKENS):
+            chunks.append(current)
+            current, budget = [], 0
+        current.append(i)
+        budget += cost
+    if current:
+        chunks.append(current)
+    return chunks
 
 
 class ProductAnalysisAgent:
@@ -197,7 +316,7 @@ class ProductAnalysisAgent:
 
         agent = ProductAnalysisAgent()
         result = agent.analyze_sync(
-            image_paths=["img.jpg"],
+            images=ingested_images,
             user_description="Tencere kazanı, 100lt, gazlı..."
         )
     """
@@ -208,170 +327,759 @@ class ProductAnalysisAgent:
 
     def analyze_sync(
         self,
-        image_paths: list[str],
+        images: list["IngestedImage"],
         user_description: str,
     ) -> dict[str, Any]:
-        """Ürün analizi — tek LLM çağrısı ile.
+        """Ürün analizi — tek LLM çağrısı ile (senkron).
 
-        1. Kategori tahmin et (keyword matching)
-        2. Şema al (product_specs)
-        3. LLM: açıklama + şema → form JSON
-        4. Doğrulama (validator)
+        1. Önbellek kontrolü (açıklama + görsel özeti)
+        2. Model sırası — fotoğrafsızsa sağlayıcı yönlendiricisinden
+        3. Yerel ön sınıflandırma — güvenliyse sadece aday kategorilerin şeması
+        4. LLM: önek + açıklama → form JSON (fallback zinciri); kategori
+           adaylar dışında kalırsa tam prompt ile bir kez daha
+        5. Sonucu frontend formatına dönüştür
         """
-        logger.info(
-            "Analiz başlatılıyor. Fotoğraf: %d, Açıklama: %d karakter",
-            len(image_paths),
-            len(user_description),
+        self._log_start(images, user_description)
+        cache_key = make_cache_key(
+            user_description, [i.data for i in images], self._cache_models(images), prompt_state().version,
         )
+        cached = get_cached_result(cache_key)
+        if cached:
+            logger.info("Analiz önbellekten döndü")
+            return {**cached, "cache_hit": True}
 
         try:
-            # ── Adım 1: Kategori ve tür bilgisini hazırla ──
-            category_types_desc = ""
-            for cat_name, cat_info in FRONTEND_CATEGORY_FIELDS.items():
-                types_str = ", ".join(cat_info["types"])
-                fields_str = ", ".join(cat_info["fields"])
-                extras = []
-                if cat_info.get("energy_options"):
-                    extras.append(f"energy_type seçenekleri: {', '.join(cat_info['energy_options'])}")
-                if cat_info.get("plate_type_options"):
-                    extras.append(f"plate_type seçenekleri: {', '.join(cat_info['plate_type_options'])}")
-                extras_str = f" ({'; '.join(extras)})" if extras else ""
-                category_types_desc += f"- {cat_name}: types=[{types_str}], fields=[{fields_str}]{extras_str}\n"
-
-            # ── Adım 2: LLM çağrısı — tek seferde form oluştur ──
-            prompt = UNIFIED_PROMPT.format(
-                category_types_desc=category_types_desc,
-                user_description=user_description,
-            )
+            models_to_try, routing = self._route(images)
+            suffix = UNIFIED_PROMPT_SUFFIX.format(user_description=user_description)
+            candidates = self._candidate_categories(user_description)
+            form, used_model, attempted = self._invoke_models(models_to_try, suffix, candidates)
+            if self._missed_candidates(form, candidates):
+                retry = self._invoke_models(models_to_try, suffix, None)
+                if retry[0]:
+                    form, used_model, _ = retry
 
-            # Google Gemini Flash ile tek çağrı — fallback zinciri
-            models_to_try = [GOOGLE_MODEL, GOOGLE_MODEL_FALLBACK]
-            raw_text = None
-            form = None
+            if not attempted:
+                return self._quota_exhausted_result()
+            result = self._build_result(form)
+            store_result(cache_key, result, model=used_model)
+            return self._with_routing(result, routing, used_model)
+
+        except Exception as e:
+            return self._error_result(e)
 
-            for model_name in models_to_try:
+    def _invoke_models(
+        self,
+        models_to_try: list[str],
+        suffix: str,
+        candidates: Optional[list[str]],
+    ) -> tuple[Optional[dict], Optional[str], bool]:
+        """Model zincirini sırayla dene → (form, kullanılan model, en az bir deneme yapıldı mı)."""
+        attempted = False
+        for hop, model_name in enumerate(models_to_try):
+            if not acquire(model_name):
+                continue
+            attempted = True
+            try:
+                logger.info("Model deneniyor: %s", model_name)
+                llm, prompt = self._llm_and_prompt(model_name, suffix, candidates)
+                started = time.monotonic()
                 try:
-                    logger.info("Model deneniyor: %s", model_name)
-                    llm = get_google_llm(model=model_name)
                     response = invoke_with_retry(
                         llm.invoke,
                         [HumanMessage(content=prompt)],
+                        ledger_site="analyze",
+                        ledger_model=model_name,
+                        ledger_hop=hop,
                     )
-                    raw_text = response.content
-                    form = self._extract_json(raw_text)
+                except Exception as e:
+                    model_router.observe(model_name, time.monotonic() - started, self._outcome(e))
+                    raise
+                form = self._extract_json(response.content)
+                model_router.observe(model_name, time.monotonic() - started, "success" if form else "error")
+                if form:
+                    logger.info("Başarılı model: %s", model_name)
+                    return form, model_name, True
+            except Exception as e:
+                if is_rate_limit_error(e):
+                    logger.warning("Model %s kota aşımı, sonraki deneniyor...", model_name)
+                    mark_rate_limited(model_name, retry_delay_seconds(e))
+                    continue
+                raise
+        return None, None, attempted
+
+    async def analyze(
+        self,
+        images: list["IngestedImage"],
+        user_description: str,
+    ) -> dict[str, Any]:
+        """analyze_sync'in async karşılığı — llm.ainvoke + bloklamayan retry.
+
+        Rate limit beklemeleri asyncio.sleep ile yapılır; threadpool'u işgal etmez.
+        Dosya okuma ve MongoDB erişimi (önbellek) thread'de çalışır.
+        """
+        self._log_start(images, user_description)
+        cache_key = await asyncio.to_thread(
+            make_cache_key,
+            user_description,
+            [i.data for i in images],
+            self._cache_models(images),
+            prompt_state().version,
+        )
+        cached = await asyncio.to_thread(get_cached_result, cache_key)
+        if cached:
+            logger.info("Analiz önbellekten döndü")
+            return {**cached, "cache_hit": True}
+
+        try:
+            models_to_try, routing = self._route(images)
+            suffix = UNIFIED_PROMPT_SUFFIX.format(user_description=user_description)
+            candidates = self._candidate_categories(user_description)
+            form, used_model, attempted = await self._ainvoke_models(models_to_try, suffix, candidates)
+            if self._missed_candidates(form, candidates):
+                retry = await self._ainvoke_models(models_to_try, suffix, None)
+                if retry[0]:
+                    form, used_model, _ = retry
+
+            if not attempted:
+                return self._quota_exhausted_result()
+            result = self._build_result(form)
+            await asyncio.to_thread(store_result, cache_key, result, used_model)
+            return self._with_routing(result, routing, used_model)
+
+        except Exception as e:
+            return self._error_result(e)
+
+    async def _ainvoke_models(
+        self,
+        models_to_try: list[str],
+        suffix: str,
+        candidates: Optional[list[str]],
+    ) -> tuple[Optional[dict], Optional[str], bool]:
+        """_invoke_models'in async karşılığı (HEDGE_ENABLED ise hedged)."""
+        if HEDGE_ENABLED and len(models_to_try) >= 2:
+            return await self._ainvoke_hedged(models_to_try, suffix, candidates)
+        return await self._ainvoke_sequential(models_to_try, suffix, candidates)
+
+    async def _ainvoke_sequential(
+        self,
+        models_to_try: list[str],
+        suffix: str,
+        candidates: Optional[list[str]],
+        first_hop: int = 0,
+    ) -> tuple[Optional[dict], Optional[str], bool]:
+        """Model zincirini sırayla dene."""
+        attempted = False
+        for hop, model_name in enumerate(models_to_try, first_hop):
+            if not await aacquire(model_name):
+                continue
+            attempted = True
+            try:
+                form = await self._acall_model(model_name, suffix, candidates, hop)
+                if form:
+                    logger.info("Başarılı model: %s", model_name)
+                    return form, model_name, True
+            except Exception as e:
+                if is_rate_limit_error(e):
+                    logger.warning("Model %s kota aşımı, sonraki deneniyor...", model_name)
+                    mark_rate_limited(model_name, retry_delay_seconds(e))
+                    continue
+                raise
+        return None, None, attempted
+
+    async def _acall_model(
+        self,
+        model_name: str,
+        suffix: str,
+        candidates: Optional[list[str]],
+        hop: int = 0,
+        request_started: Optional[float] = None,
+        record_cancelled: bool = True,
+    ) -> Optional[dict]:
+        """Tek modele tek çağrı → form.
+
+        Hedge istatistiğine sadece sağlayıcı çağrısının süresi yazılır (retry
+        beklemeleri hariç). İptal edilen birincil çağrı iptal anına kadarki
+        süreyle alt sınır örneği olarak yazılır; yoksa yavaş çağrılar hiç
+        görünmez ve hedge gecikmesi giderek kısalır. Hedge yedeği geç
+        başladığı için iptal süresi anlamsız kısalır — record_cancelled=False
+        ile yazılmaz (o modelin yüzdeliğini aşağı çekerdi).
+
+        Yönlendiriciye retry dahil süre yazılır; request_started verilirse
+        (hedge) isteğin başından — kullanıcının gördüğü uçtan uca süre.
+        """
+        logger.info("Model deneniyor: %s", model_name)
+        llm, prompt = await asyncio.to_thread(
+            self._llm_and_prompt, model_name, suffix, candidates,
+        )
+
+        async def timed_ainvoke(messages):
+            call_started = time.monotonic()
+            try:
+                response = await llm.ainvoke(messages)
+            except asyncio.CancelledError:
+                if record_cancelled:
+                    hedging.record_latency(model_name, time.monotonic() - call_started)
+                raise
+            hedging.record_latency(model_name, time.monotonic() - call_started)
+            return response
+
+        started = request_started or time.monotonic()
+        try:
+            response = await ainvoke_with_retry(
+                timed_ainvoke,
+                [HumanMessage(content=prompt)],
+                ledger_site="analyze",
+                ledger_model=model_name,
+                ledger_hop=hop,
+            )
+        except asyncio.CancelledError:
+            model_router.observe(model_name, time.monotonic() - started, "cancelled")
+            raise
+        except Exception as e:
+            model_router.observe(model_name, time.monotonic() - started, self._outcome(e))
+            raise
+        # Ayrıştırılamayan yanıt yönlendirici için hatadır (kullanılamaz çıktı)
+        form = self._extract_json(response.content)
+        model_router.observe(model_name, time.monotonic() - started, "success" if form else "error")
+        return form
+
+    async def _ainvoke_hedged(
+        self,
+        models_to_try: list[str],
+        suffix: str,
+        candidates: Optional[list[str]],
+    ) -> tuple[Optional[dict], Optional[str], bool]:
+        """Birincil model hedge gecikmesi içinde yanıt vermezse yedeği de çalıştır.
+
+        İlk geçerli form kazanır, diğer görev iptal edilir. Birincil model
+        gecikmeden önce kota hatası verirse yedek normal fallback olarak
+        başlar (hedge sayılmaz). Kotası olmayan model hiç çağrılmaz.
+
+        Yedek, birincille aynı sağlayıcıdan sıradaki modeldir (aynı şema ve
+        prompt adaptörüyle aynı çağrı); yoksa hedge yapılmaz. İki ayak da
+        sonuçsuz kalırsa kalan modeller sırayla denenir.
+        """
+        primary = models_to_try[0]
+        if not await aacquire(primary):
+            return await self._ainvoke_sequential(models_to_try[1:], suffix, candidates, first_hop=1)
+        provider = model_router.provider_of(primary)
+        secondary = next((m for m in models_to_try[1:] if model_router.provider_of(m) == provider), None)
+        if secondary is None:
+            return await self._ainvoke_sequential_from(primary, models_to_try, suffix, candidates)
+        rest = [m for m in models_to_try[1:] if m != secondary]
+
+        started = time.monotonic()
+        delay = hedging.hedge_delay(primary)
+        tasks = {asyncio.create_task(self._acall_model(primary, suffix, candidates, 0, started)): primary}
+        secondary_started = hedged = False
+        error: Optional[Exception] = None
+        try:
+            while tasks:
+                timeout = None if secondary_started else max(0.0, started + delay - time.monotonic())
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Birincil yavaş → hedge
+                    secondary_started = True
+                    if await aacquire(secondary):
+                        hedged = True
+                        logger.info("Hedge: %s %.1fs içinde yanıt vermedi, %s da deneniyor", primary, delay, secondary)
+                        tasks[asyncio.create_task(
+                            self._acall_model(secondary, suffix, candidates, 1, started, record_cancelled=False)
+                        )] = secondary
+                    continue
+
+                for task in done:
+                    model_name = tasks.pop(task)
+                    form = None
+                    try:
+                        form = task.result()
+                    except Exception as e:
+                        if not is_rate_limit_error(e):
+                            error = e
+                            continue
+                        mark_rate_limited(model_name, retry_delay_seconds(e))
                     if form:
-                        logger.info("Başarılı model: %s", model_name)
+                        hedging.record_request(hedged, primary, model_name, time.monotonic() - started)
+                        logger.info("Başarılı model: %s%s", model_name, " (hedge)" if model_name != primary else "")
+                        return form, model_name, True
+                    # Birincil kota hatası / geçersiz yanıt → yedeğe normal fallback
+                    if not secondary_started and await aacquire(secondary):
+                        secondary_started = True
+                        tasks[asyncio.create_task(
+                            self._acall_model(secondary, suffix, candidates, 1, started, record_cancelled=False)
+                        )] = secondary
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        hedging.record_request(hedged, primary, None, time.monotonic() - started)
+        if rest:
+            try:
+                form, model_name, _ = await self._ainvoke_sequential(rest, suffix, candidates, first_hop=2)
+            except Exception as e:
+                error = error or e
+            else:
+                if form:
+                    return form, model_name, True
+        if error:
+            raise error
+        return None, None, True
+
+    async def _ainvoke_sequential_from(
+        self,
+        acquired: str,
+        models_to_try: list[str],
+        suffix: str,
+        candidates: Optional[list[str]],
+    ) -> tuple[Optional[dict], Optional[str], bool]:
+        """Kotası zaten alınmış ilk modeli çağır, sonuçsuzsa kalanlara sırayla geç."""
+        try:
+            form = await self._acall_model(acquired, suffix, candidates, 0)
+        except Exception as e:
+            if not is_rate_limit_error(e):
+                raise
+            logger.warning("Model %s kota aşımı, sonraki deneniyor...", acquired)
+            mark_rate_limited(acquired, retry_delay_seconds(e))
+            form = None
+        if form:
+            logger.info("Başarılı model: %s", acquired)
+            return form, acquired, True
+        form, model_name, _ = await self._ainvoke_sequential(models_to_try[1:], suffix, candidates, first_hop=1)
+        return form, model_name, True
+
+    @staticmethod
+    def _cache_models(images: list["IngestedImage"]) -> list[str]:
+        """Önbellek anahtarına giren modeller — yönlendirilen istekte tüm adaylar
+        (sıra istekten isteğe değiştiği için anahtar ona bağlı olmamalı)."""
+        if ROUTER_ENABLED and not images:
+            return model_router.candidates()
+        return [GOOGLE_MODEL, GOOGLE_MODEL_FALLBACK]
+
+    @staticmethod
+    def _route(images: list["IngestedImage"]) -> tuple[list[str], Optional[dict[str, Any]]]:
+        """Denenecek model sırası ve yönlendirme kararı.
+
+        Fotoğraflı analiz Gemini zincirinde kalır; fotoğrafsız analizde sıra
+        canlı gecikme / hata oranı / kotaya göre model_router'dan gelir.
+        """
+        if ROUTER_ENABLED and not images:
+            models, routing = model_router.route()
+            logger.info("Yönlendirme (%s): %s", routing["reason"], " → ".join(models))
+            return models, routing
+        return [GOOGLE_MODEL, GOOGLE_MODEL_FALLBACK], None
+
+    @staticmethod
+    def _with_routing(
+        result: dict[str, Any],
+        routing: Optional[dict[str, Any]],
+        used_model: Optional[str],
+    ) -> dict[str, Any]:
+        """Yönlendirme kararını sonuca ekle (önbelleğe yazılmaz)."""
+        if not routing:
+            return result
+        return {**result, "routing": {**routing, "used_model": used_model}}
+
+    @staticmethod
+    def _candidate_categories(user_description: str) -> Optional[list[str]]:
+        """Yerel ön sınıflandırma — güvenliyse aday kategoriler, değilse None."""
+        if not PRECLASSIFIER_ENABLED:
+            return None
+        candidates = get_category_classifier().candidates(user_description, top_k=PRECLASSIFIER_TOP_K)
+        if candidates:
+            logger.info("Ön sınıflandırma adayları: %s", candidates)
+        return candidates
+
+    @staticmethod
+    def _missed_candidates(form: Optional[dict], candidates: Optional[list[str]]) -> bool:
+        """Daraltılmış prompt'la gelen kategori adaylar dışındaysa tam prompt'la tekrar denenmeli."""
+        if not candidates or not form:
+            return False
+        if form.get("category_name") in candidates:
+            return False
+        logger.info(
+            "Ön sınıflandırma tutmadı (%s ∉ %s), tam prompt ile tekrar deneniyor",
+            form.get("category_name"), candidates,
+        )
+        return True
+
+    async def analyze_stream(
+        self,
+        images: list["IngestedImage"],
+        user_description: str,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """analyze()'in akış sürümü — form alanlarını tamamlandıkça üretir.
+
+        Olaylar:
+          {"event": "field", "data": {"field": ..., "value": ...}}  — kök alan
+          {"event": "spec",  "data": {"field": ..., "value": ...}}  — extra_specs alanı
+          {"event": "result", "data": {...}}  — analyze() ile aynı son sonuç
+          {"event": "error",  "data": {...}}  — hata sonucu
+
+        Kısmi alanlar ön izlemedir; doğrulanmış form "result" olayındadır.
+        Bir model ilk alanı üretmeden hata verirse sıradaki modele geçilir.
+        """
+        self._log_start(images, user_description)
+        cache_key = await asyncio.to_thread(
+            make_cache_key,
+            user_description,
+            [i.data for i in images],
+            self._cache_models(images),
+            prompt_state().version,
+        )
+        cached = await asyncio.to_thread(get_cached_result, cache_key)
+        if cached:
+            logger.info("Analiz önbellekten döndü")
+            for event in self._form_events(cached.get("product_form") or {}):
+                yield event
+            yield {"event": "result", "data": {**cached, "cache_hit": True}}
+            return
+
+        models_to_try, routing = self._route(images)
+        suffix = UNIFIED_PROMPT_SUFFIX.format(user_description=user_description)
+        attempted = False
+        for hop, model_name in enumerate(models_to_try):
+            if not await aacquire(model_name):
+                continue
+            attempted = True
+            parser = IncrementalJSONParser()
+            text_parts: list[str] = []
+            category_name: Optional[str] = None
+            emitted = False
+            last_chunk = None
+            started = time.perf_counter()
+            try:
+                logger.info("Model deneniyor (stream): %s", model_name)
+                llm, prompt = await asyncio.to_thread(self._llm_and_prompt, model_name, suffix)
+                async for chunk in llm.astream([HumanMessage(content=prompt)]):
+                    # Gemini token kullanımını son parçada gönderir
+                    if getattr(chunk, "usage_metadata", None):
+                        last_chunk = chunk
+                    piece = chunk.content if isinstance(chunk.content, str) else ""
+                    if not piece:
+                        continue
+                    text_parts.append(piece)
+                    for path, value in parser.feed(piece):
+                        if path == ("category_name",):
+                            category_name = value
+                        event = self._path_event(path, value, category_name)
+                        if event:
+                            emitted = True
+                            yield event
+            except Exception as e:
+                call_ledger.record("analyze_stream", model_name, time.perf_counter() - started,
+                                   self._outcome(e), hop=hop, error=e)
+                model_router.observe(model_name, time.perf_counter() - started, self._outcome(e))
+                if not emitted and is_rate_limit_error(e):
+                    logger.warning("Model %s kota aşımı, sonraki deneniyor...", model_name)
+                    mark_rate_limited(model_name, retry_delay_seconds(e))
+                    continue
+                yield {"event": "error", "data": self._error_result(e)}
+                return
+
+            call_ledger.record("analyze_stream", model_name, time.perf_counter() - started,
+                               "success", hop=hop, response=last_chunk)
+            form = self._extract_json("".join(text_parts))
+            model_router.observe(model_name, time.perf_counter() - started, "success" if form else "error")
+            if not form and not emitted:
+                continue
+            result = self._build_result(form)
+            await asyncio.to_thread(store_result, cache_key, result, model_name)
+            yield {"event": "result", "data": self._with_routing(result, routing, model_name)}
+            return
+
+        if not attempted:
+            yield {"event": "error", "data": self._quota_exhausted_result()}
+        else:
+            yield {"event": "error", "data": self._build_result(None)}
+
+    @staticmethod
+    def _path_event(
+        path: tuple[str, ...], value: Any, category_name: Optional[str],
+    ) -> Optional[dict[str, Any]]:
+        """Ayrıştırıcıdan gelen (yol, değer) çiftini akış olayına çevir."""
+        if value is None or value == "" or value == "null":
+            return None
+        if len(path) == 1 and path[0] in STREAM_FORM_FIELDS:
+            return {"event": "field", "data": {"field": path[0], "value": value}}
+        if len(path) == 2 and path[0] == "extra_specs":
+            cat_info = prompt_state().categories.get(category_name or "")
+            if cat_info and path[1] not in cat_info["fields"]:
+                return None
+            return {"event": "spec", "data": {"field": path[1], "value": value}}
+        return None
+
+    @staticmethod
+    def _form_events(product_form: dict[str, Any]) -> list[dict[str, Any]]:
+        """Hazır bir formu (önbellek) akış olaylarına çevir."""
+        events = [
+            {"event": "field", "data": {"field": k, "value": product_form[k]}}
+            for k in STREAM_FORM_FIELDS
+            if product_form.get(k) not in (None, "")
+        ]
+        events += [
+            {"event": "spec", "data": {"field": k, "value": v}}
+            for k, v in (product_form.get("extra_specs") or {}).items()
+        ]
+        return events
+
+    async def analyze_batch(self, descriptions: list[str]) -> dict[str, Any]:
+        """Birden çok ürün açıklamasını az sayıda LLM çağrısıyla analiz et.
+
+        Açıklamalar bağlam penceresine sığan parçalara bölünür; her parça
+        tek çağrıda JSON dizisi olarak döner ve parçalar paralel çalışır.
+        Sonuçlar öğe bazındadır — bozuk bir öğe diğerlerini etkilemez.
+        Önbellekte olan açıklamalar LLM'e hiç gönderilmez.
+        """
+        models_to_try = [GOOGLE_MODEL, GOOGLE_MODEL_FALLBACK]
+        version = prompt_state().version
+        keys = await asyncio.to_thread(
+            lambda: [make_cache_key(d, [], models_to_try, version) for d in descriptions]
+        )
+        cached = await asyncio.to_thread(lambda: [get_cached_result(k) for k in keys])
+
+        results: list[Optional[dict[str, Any]]] = [
+            {**c, "cache_hit": True} if c else None for c in cached
+        ]
+        pending = [i for i, r in enumerate(results) if r is None]
+        chunks = chunk_for_batch(pending, descriptions)
+        logger.info(
+            "Toplu analiz: %d ürün, %d önbellekte, %d LLM çağrısı",
+            len(descriptions), len(descriptions) - len(pending), len(chunks),
+        )
+
+        await asyncio.gather(*[
+            self._analyze_chunk(chunk, descriptions, keys, results, models_to_try)
+            for chunk in chunks
+        ])
+
+        return {
+            "results": [{"index": i, **r} for i, r in enumerate(results)],
+            "llm_calls": len(chunks),
+        }
+
+    async def _analyze_chunk(
+        self,
+        chunk: list[int],
+        descriptions: list[str],
+        keys: list[str],
+        results: list[Optional[dict[str, Any]]],
+        models_to_try: list[str],
+    ) -> None:
+        """Bir parçayı tek çağrıda analiz edip sonuçları results listesine yaz."""
+        numbered = "\n".join(
+            f"[{n}] {descriptions[i].strip()}" for n, i in enumerate(chunk, 1)
+        )
+        suffix = BATCH_PROMPT_SUFFIX.format(count=len(chunk), numbered_descriptions=numbered)
+
+        try:
+            items, used_model, attempted = None, None, False
+            for hop, model_name in enumerate(models_to_try):
+                if not await aacquire(model_name):
+                    continue
+                attempted = True
+                try:
+                    llm, prompt = await asyncio.to_thread(
+                        self._llm_and_prompt, model_name, suffix, None, prompt_state().batch_form_schema,
+                    )
+                    response = await ainvoke_with_retry(
+                        llm.ainvoke,
+                        [HumanMessage(content=prompt)],
+                        ledger_site="analyze_batch",
+                        ledger_model=model_name,
+                        ledger_hop=hop,
+                    )
+                    items = self._extract_json_array(response.content)
+                    if items is not None:
+                        used_model = model_name
                         break
                 except Exception as e:
                     if is_rate_limit_error(e):
-                        logger.warning("Model %s kota aşımı, sonraki deneniyor...", model_name)
+                        mark_rate_limited(model_name, retry_delay_seconds(e))
                         continue
                     raise
+        except Exception as e:
+            for i in chunk:
+                results[i] = self._error_result(e)
+            return
+
+        if not attempted:
+            for i in chunk:
+                results[i] = self._quota_exhausted_result()
+            return
 
-            if not form:
-                return {
+        by_number: dict[int, dict] = {}
+        for item in items or []:
+            if isinstance(item, dict):
+                try:
+                    by_number[int(item.get("index"))] = item
+                except (TypeError, ValueError):
+                    continue
+
+        to_store = []
+        for n, i in enumerate(chunk, 1):
+            form = by_number.get(n)
+            if form is None:
+                results[i] = {
                     "status": "error",
                     "product_form": None,
                     "warnings": [],
-                    "errors": ["LLM yanıtından geçerli JSON çıkarılamadı"],
+                    "errors": ["Bu ürün için model yanıtı alınamadı"],
                 }
+                continue
+            results[i] = self._build_result(form)
+            to_store.append((keys[i], results[i]))
 
-            # ── Adım 3: Sonucu frontend-uyumlu formata dönüştür ──
-            category_name = form.get("category_name", "")
-            product_type_value = form.get("product_type_value", "")
-            extra_specs = form.get("extra_specs", {})
-
-            warnings = []
-
-            # Fiyat default'ları
-            purchase_price = form.get("purchase_price")
-            sale_price = form.get("sale_price")
-            if purchase_price is None or purchase_price == "":
-                purchase_price = 0
-                warnings.append("Alış fiyatı belirtilmemiş — 0 olarak ayarlandı")
-            if sale_price is None or sale_price == "":
-                sale_price = 0
-                warnings.append("Satış fiyatı belirtilmemiş — 0 olarak ayarlandı")
-
-            # Geçersiz extra_specs alanlarını filtrele
-            valid_fields = set()
-            cat_info = FRONTEND_CATEGORY_FIELDS.get(category_name)
-            if cat_info:
-                valid_fields = set(cat_info["fields"])
-
-            filtered_specs = {}
-            if isinstance(extra_specs, dict):
-                for key, val in extra_specs.items():
-                    if val is not None and val != "" and val != "null":
-                        if not valid_fields or key in valid_fields:
-                            filtered_specs[key] = val
-
-            # Frontend'in beklediği format
-            result_form = {
-                "category_name": category_name,
-                "product_type_value": product_type_value,
-                "name": form.get("name", ""),
-                "purchase_price": purchase_price,
-                "sale_price": sale_price,
-                "negotiation_margin": form.get("negotiation_margin", 0),
-                "negotiation_type": form.get("negotiation_type", "amount"),
-                "material": form.get("material", ""),
-                "notes": form.get("notes", ""),
-                "extra_specs": filtered_specs,
-            }
+        await asyncio.to_thread(
+            lambda: [store_result(k, r, model=used_model) for k, r in to_store]
+        )
 
-            return {
-                "status": "success",
-                "product_form": result_form,
-                "warnings": warnings,
-                "errors": [],
-            }
+    @staticmethod
+    def _log_start(images: list["IngestedImage"], user_description: str) -> None:
+        logger.info(
+            "Analiz başlatılıyor. Fotoğraf: %d, Açıklama: %d karakter",
+            len(images),
+            len(user_description),
+        )
 
-        except Exception as e:
-            logger.error("Analiz hatası: %s", str(e), exc_info=True)
-            error_msg = (
-                "API kota limiti aşıldı. Birkaç dakika bekleyip tekrar deneyin."
-                if is_rate_limit_error(e)
-                else f"Analiz hatası: {str(e)}"
-            )
+    @staticmethod
+    def _llm_and_prompt(
+        model_name: str,
+        suffix: str,
+        candidates: Optional[list[str]] = None,
+        schema: Optional[dict[str, Any]] = None,
+    ):
+        """Model için LLM istemcisi ve gönderilecek prompt (sağlayıcının adaptörüyle).
+
+        Aday kategoriler verilmişse sadece onların şemasıyla daraltılmış
+        önek kullanılır; schema verilmezse çıktı tek ürün formudur.
+        """
+        adapter = PROMPT_ADAPTERS[model_router.provider_of(model_name)]
+        return adapter(model_name, suffix, candidates, schema)
+
+    @staticmethod
+    def _build_result(form: Optional[dict]) -> dict[str, Any]:
+        """LLM form JSON'unu frontend-uyumlu sonuca dönüştür."""
+        if not form:
             return {
                 "status": "error",
                 "product_form": None,
                 "warnings": [],
-                "errors": [error_msg],
+                "errors": ["LLM yanıtından geçerli JSON çıkarılamadı"],
             }
 
-    def _extract_json(self, text: str) -> Optional[dict]:
-        """Metin içinden JSON bloğunu ayıkla."""
-        if not text:
-            return None
+        category_name = form.get("category_name", "")
+        product_type_value = form.get("product_type_value", "")
+        extra_specs = form.get("extra_specs", {})
 
-        try:
-            if "```json" in text:
-                json_str = text.split("```json")[1].split("```")[0].strip()
-                return json.loads(json_str)
-            elif "```" in text:
-                for block in text.split("```")[1::2]:
-                    block = block.strip()
-                    if block.startswith("json"):
-                        block = block[4:].strip()
-                    try:
-                        return json.loads(block)
-                    except json.JSONDecodeError:
-                        continue
-        except (json.JSONDecodeError, IndexError):
-            pass
+        warnings = []
+
+        # Fiyat default'ları
+        purchase_price = form.get("purchase_price")
+        sale_price = form.get("sale_price")
+        if purchase_price is None or purchase_price == "":
+            purchase_price = 0
+            warnings.append("Alış fiyatı belirtilmemiş — 0 olarak ayarlandı")
+        if sale_price is None or sale_price == "":
+            sale_price = 0
+            warnings.append("Satış fiyatı belirtilmemiş — 0 olarak ayarlandı")
+
+        # Geçersiz extra_specs alanlarını filtrele
+        valid_fields = set()
+        cat_info = prompt_state().categories.get(category_name)
+        if cat_info:
+            valid_fields = set(cat_info["fields"])
 
-        # Doğrudan JSON dene
+        filtered_specs = {}
+        if isinstance(extra_specs, dict):
+            for key, val in extra_specs.items():
+                if val is not None and val != "" and val != "null":
+                    if not valid_fields or key in valid_fields:
+                        filtered_specs[key] = val
+
+        # Frontend'in beklediği format
+        result_form = {
+            "category_name": category_name,
+            "product_type_value": product_type_value,
+            "name": form.get("name", ""),
+            "purchase_price": purchase_price,
+            "sale_price": sale_price,
+            "negotiation_margin": form.get("negotiation_margin", 0),
+            "negotiation_type": form.get("negotiation_type", "amount"),
+            "material": form.get("material", ""),
+            "notes": form.get("notes", ""),
+            "extra_specs": filtered_specs,
+        }
+
+        # Tip dönüşümü, seçenek ve aralık kontrolü (kategori/çeşit bazlı derlenmiş)
+        checked = validate_product(
+            result_form, category_name, product_type_value, partial=True, drop_invalid=True,
+        )
+        result_form = checked.data
+        for price_field in ("purchase_price", "sale_price"):
+            result_form.setdefault(price_field, 0)
+        warnings.extend(checked.dropped)
+
+        return {
+            "status": "success",
+            "product_form": result_form,
+            "warnings": warnings,
+            "errors": [],
+        }
+
+    @staticmethod
+    def _outcome(e: Exception) -> str:
+        return "rate_limited" if is_rate_limit_error(e) else "error"
+
+    @staticmethod
+    def _quota_exhausted_result() -> dict[str, Any]:
+        return {
+            "status": "error",
+            "product_form": None,
+            "warnings": [],
+            "errors": ["Tüm modellerin kotası dolu. Birkaç dakika bekleyip tekrar deneyin."],
+        }
+
+    @staticmethod
+    def _error_result(e: Exception) -> dict[str, Any]:
+        logger.error("Analiz hatası: %s", str(e), exc_info=True)
+        error_msg = (
+            "API kota limiti aşıldı. Birkaç dakika bekleyip tekrar deneyin."
+            if is_rate_limit_error(e)
+            else f"Analiz hatası: {str(e)}"
+        )
+        return {
+            "status": "error",
+            "product_form": None,
+            "warnings": [],
+            "errors": [error_msg],
+        }
+
+    @staticmethod
+    def _extract_json_array(text: str) -> Optional[list]:
+        """Toplu analiz yanıtını (Gemini JSON modu, dizi şeması) ayrıştır; dizi değilse None."""
         try:
-            return json.loads(text.strip())
-        except json.JSONDecodeError:
-            pass
+            data = json.loads(text)
+        except (TypeError, json.JSONDecodeError):
+            return None
+        return data if isinstance(data, list) else None
 
-        # Son çare: { ... } bloğunu bul
+    @staticmethod
+    def _extract_json(text: str) -> Optional[dict]:
+        """Yapılandırılmış (JSON modu) yanıtı ayrıştır; nesne değilse None."""
         try:
-            start = text.index("{")
-            end = text.rindex("}") + 1
-            return json.loads(text[start:end])
-        except (ValueError, json.JSONDecodeError):
+            data = json.loads(text)
+        except (TypeError, json.JSONDecodeError):
             return None
+        return data if isinstance(data, dict) else None
+
+
+_default_agent: Optional[ProductAnalysisAgent] = None
+
+
+def get_agent() -> ProductAnalysisAgent:
+    """Süreç genelinde paylaşılan agent örneği."""
+    global _default_agent
+    if _default_agent is None:
+        _default_agent = ProductAnalysisAgent()
+    return _default_agent
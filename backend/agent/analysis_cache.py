@@ -0,0 +1,67 @@
+"""
+Analiz Yanıt Önbelleği
+─────────────────────────────────────────────────────────────
+Aynı açıklama + aynı görseller + aynı model zinciri için LLM'i tekrar
+çağırmaz; önceki başarılı sonucu MongoDB'den döndürür.
+
+Anahtar: normalize edilmiş açıklama, (küçültülmüş) görsel byte'ları, model zinciri
+ve prompt sürümünün SHA-256 özeti. Kayıtlar TTL index ile
+ANALYSIS_CACHE_TTL_HOURS sonra kendiliğinden silinir.
+"""
+import hashlib
+import logging
+import re
+from datetime import datetime
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_description(text: str) -> str:
+    """Boşluk ve büyük/küçük harf farklarını yok sayan normal form."""
+    return _WS_RE.sub(" ", text or "").strip().casefold()
+
+
+def make_cache_key(
+    user_description: str,
+    image_data: list[bytes],
+    models: list[str],
+    prompt_version: str,
+) -> str:
+    h = hashlib.sha256()
+    h.update(prompt_version.encode())
+    h.update(b"\0")
+    h.update("|".join(models).encode())
+    h.update(b"\0")
+    h.update(normalize_description(user_description).encode("utf-8"))
+    for data in image_data:
+        h.update(b"\0img\0")
+        h.update(data)
+    return h.hexdigest()
+
+
+def get_cached_result(key: str) -> Optional[dict[str, Any]]:
+    try:
+        from database import ai_analysis_cache_col
+        doc = ai_analysis_cache_col.find_one({"key": key}, {"_id": 0, "result": 1})
+    except Exception as e:
+        logger.warning("Analiz önbelleği okunamadı: %s", e)
+        return None
+    return doc["result"] if doc else None
+
+
+def store_result(key: str, result: dict[str, Any], model: Optional[str] = None) -> None:
+    """Sadece başarılı sonuçlar saklanır."""
+    if result.get("status") != "success":
+        return
+    try:
+        from database import ai_analysis_cache_col
+        ai_analysis_cache_col.update_one(
+            {"key": key},
+            {"$set": {"result": result, "model": model, "created_at": datetime.utcnow()}},
+            upsert=True,
+        )
+    except Exception as e:
+        logger.warning("Analiz önbelleğine yazılamadı: %s", e)
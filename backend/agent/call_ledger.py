@@ -0,0 +1,253 @@
+"""
+LLM Çağrı Defteri
+─────────────────────────────────────────────────────────────
+Her LLM çağrısı (invoke_with_retry / ainvoke_with_retry, fiyat çıkarma,
+kategori asistanı, analiz akışı) yerel olarak kaydedilir:
+  site, model, gecikme, giriş/çıkış token'ı, retry sayısı,
+  fallback adımı (zincirdeki sıra: 0 = birincil), sonuç.
+
+Yazma isteği bloklamaz: kayıtlar kuyruğa atılır, arka plan thread'i
+toplu insert_many ile capped koleksiyona (ai_call_ledger) yazar.
+Kuyruk doluysa kayıt düşürülür. LangSmith'ten bağımsızdır.
+
+Sonuçlar: success | rate_limited | error | cancelled (hedge kaybeden)
+"""
+import logging
+import queue
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from agent.config import LLM_LEDGER_ENABLED
+
+logger = logging.getLogger(__name__)
+
+_BATCH_SIZE = 200
+_queue: "queue.Queue[dict]" = queue.Queue(maxsize=10000)
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+_dropped = 0
+
+
+def usage_tokens(response: Any) -> tuple[Optional[int], Optional[int]]:
+    """LangChain yanıtındaki usage_metadata → (giriş, çıkış) token."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    return usage.get("input_tokens"), usage.get("output_tokens")
+
+
+def record(
+    site: str,
+    model: Optional[str],
+    latency: float,
+    outcome: str,
+    retries: int = 0,
+    hop: int = 0,
+    response: Any = None,
+    error: Optional[BaseException] = None,
+) -> None:
+    """Bir çağrıyı deftere ekle (bloklamaz)."""
+    global _dropped
+    if not LLM_LEDGER_ENABLED:
+        return
+    input_tokens, output_tokens = usage_tokens(response)
+    doc = {
+        "ts": datetime.utcnow(),
+        "site": site,
+        "model": model or "unknown",
+        "latency_ms": round(latency * 1000, 1),
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "retries": retries,
+        "hop": hop,
+        "outcome": outcome,
+    }
+    if error is not None:
+        doc["error"] = f"{type(error).__name__}: {error}"[:300]
+    _ensure_writer()
+    try:
+        _queue.put_nowait(doc)
+    except queue.Full:
+        _dropped += 1
+
+
+def model_of(llm_call: Any) -> Optional[str]:
+    """llm.invoke / llm.ainvoke bound metodundan model adını bul (bind edilmişse de)."""
+    owner = getattr(llm_call, "__self__", None)
+    for obj in (owner, getattr(owner, "bound", None)):
+        name = getattr(obj, "model", None) or getattr(obj, "model_name", None)
+        if isinstance(name, str):
+            return name.removeprefix("models/")
+    return None
+
+
+def _ensure_writer() -> None:
+    global _writer
+    if _writer is not None:
+        return
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_write_loop, name="llm-ledger", daemon=True)
+            _writer.start()
+
+
+def _write_loop() -> None:
+    from database import ai_call_ledger_col
+
+    while True:
+        batch = [_queue.get()]
+        while len(batch) < _BATCH_SIZE:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            ai_call_ledger_col.insert_many(batch, ordered=False)
+        except Exception as e:
+            logger.warning("LLM çağrı defterine yazılamadı (%d kayıt): %s", len(batch), e)
+
+
+# ─── Raporlama ──────────────────────────────────────────────
+
+def _percentiles(values: list[float]) -> dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    values = sorted(values)
+    pick = lambda p: values[min(len(values) - 1, round(p / 100 * (len(values) - 1)))]  # noqa: E731
+    return {"p50": pick(50), "p95": pick(95), "p99": pick(99)}
+
+
+def _summarize(docs: list[dict]) -> dict[str, Any]:
+    latencies = [d["latency_ms"] for d in docs if d["outcome"] == "success"]
+    outcomes: dict[str, int] = {}
+    for d in docs:
+        outcomes[d["outcome"]] = outcomes.get(d["outcome"], 0) + 1
+    calls = len(docs)
+    return {
+        "calls": calls,
+        "latency_ms": _percentiles(latencies),
+        "input_tokens": sum(d.get("input_tokens") or 0 for d in docs),
+        "output_tokens": sum(d.get("output_tokens") or 0 for d in docs),
+        "retries": sum(d.get("retries") or 0 for d in docs),
+        "retry_rate": round(sum(1 for d in docs if d.get("retries")) / calls, 3) if calls else 0.0,
+        "fallback_rate": round(sum(1 for d in docs if d.get("hop")) / calls, 3) if calls else 0.0,
+        "outcomes": outcomes,
+    }
+
+
+# $percentile desteklemeyen sunucularda (MongoDB < 7.0) Python'da özetlenecek en yeni kayıt sayısı
+_FALLBACK_MAX_DOCS = 20000
+_PERCENTILES = (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+
+
+def _group_stages(key: Optional[str]) -> tuple[list[dict], list[dict]]:
+    """Bir boyut (None = toplam) için özet ve sonuç dağılımı $group'ları."""
+    group_id = {"$ifNull": [f"${key}", "unknown"]} if key else None
+    positive = lambda field: {"$cond": [{"$gt": [{"$ifNull": [f"${field}", 0]}, 0]}, 1, 0]}  # noqa: E731
+    summary = [{"$group": {
+        "_id": group_id,
+        "calls": {"$sum": 1},
+        "input_tokens": {"$sum": {"$ifNull": ["$input_tokens", 0]}},
+        "output_tokens": {"$sum": {"$ifNull": ["$output_tokens", 0]}},
+        "retries": {"$sum": {"$ifNull": ["$retries", 0]}},
+        "retried": {"$sum": positive("retries")},
+        "fallbacks": {"$sum": positive("hop")},
+        # Sayısal olmayan (null) değerleri $percentile yok sayar → yalnız başarılı çağrılar
+        "latency": {"$percentile": {
+            "input": {"$cond": [{"$eq": ["$outcome", "success"]}, "$latency_ms", None]},
+            "p": [p for _, p in _PERCENTILES],
+            "method": "approximate",
+        }},
+    }}]
+    outcomes = [{"$group": {"_id": {"group": group_id, "outcome": "$outcome"}, "n": {"$sum": 1}}}]
+    return summary, outcomes
+
+
+def _from_groups(summary: list[dict], outcomes: list[dict]) -> dict[Any, dict]:
+    by_group: dict[Any, dict[str, int]] = {}
+    for o in outcomes:
+        by_group.setdefault(o["_id"]["group"], {})[o["_id"]["outcome"]] = o["n"]
+    result = {}
+    for g in summary:
+        calls = g["calls"]
+        latency = g.get("latency") or [None] * len(_PERCENTILES)
+        result[g["_id"]] = {
+            "calls": calls,
+            "latency_ms": {
+                name: round(v, 1) if v is not None else None
+                for (name, _), v in zip(_PERCENTILES, latency)
+            },
+            "input_tokens": g["input_tokens"],
+            "output_tokens": g["output_tokens"],
+            "retries": g["retries"],
+            "retry_rate": round(g["retried"] / calls, 3) if calls else 0.0,
+            "fallback_rate": round(g["fallbacks"] / calls, 3) if calls else 0.0,
+            "outcomes": by_group.get(g["_id"], {}),
+        }
+    return result
+
+
+def _aggregate(since: datetime) -> dict[str, Any]:
+    """Özetleri sunucuda tek $facet aggregation'ı ile hesapla."""
+    from database import ai_call_ledger_col
+
+    facets = {}
+    for name, key in (("total", None), ("by_model", "model"), ("by_site", "site")):
+        facets[name], facets[f"{name}_outcomes"] = _group_stages(key)
+    row = next(ai_call_ledger_col.aggregate([{"$match": {"ts": {"$gte": since}}}, {"$facet": facets}]))
+
+    total = _from_groups(row["total"], row["total_outcomes"]).get(None) or _summarize([])
+    return {
+        "total": total,
+        **{
+            name: dict(sorted(_from_groups(row[name], row[f"{name}_outcomes"]).items()))
+            for name in ("by_model", "by_site")
+        },
+        "sampled": False,
+    }
+
+
+def _sample(since: datetime) -> dict[str, Any]:
+    """$percentile yoksa: en yeni _FALLBACK_MAX_DOCS kaydı Python'da özetle."""
+    from database import ai_call_ledger_col
+
+    docs = list(ai_call_ledger_col.find(
+        {"ts": {"$gte": since}},
+        {"_id": 0, "site": 1, "model": 1, "latency_ms": 1, "input_tokens": 1,
+         "output_tokens": 1, "retries": 1, "hop": 1, "outcome": 1},
+    ).sort("ts", -1).limit(_FALLBACK_MAX_DOCS))
+
+    def grouped(key: str) -> dict[str, dict]:
+        groups: dict[str, list[dict]] = {}
+        for d in docs:
+            groups.setdefault(d.get(key) or "unknown", []).append(d)
+        return {name: _summarize(items) for name, items in sorted(groups.items())}
+
+    return {
+        "total": _summarize(docs),
+        "by_model": grouped("model"),
+        "by_site": grouped("site"),
+        "sampled": len(docs) >= _FALLBACK_MAX_DOCS,
+    }
+
+
+def metrics(hours: float = 24) -> dict[str, Any]:
+    """Son `hours` saatin çağrı istatistikleri: toplam, model ve site bazında.
+
+    Hesap sunucuda $group ile yapılır; $percentile desteklenmiyorsa en yeni
+    _FALLBACK_MAX_DOCS kayıt okunur ("sampled": true → pencere kesildi).
+    """
+    from pymongo.errors import OperationFailure
+
+    since = datetime.utcnow() - timedelta(hours=hours)
+    try:
+        summary = _aggregate(since)
+    except OperationFailure as e:
+        logger.info("Defter aggregation'ı desteklenmiyor, örneklem kullanılacak: %s", e)
+        summary = _sample(since)
+
+    return {
+        "window_hours": hours,
+        **summary,
+        "pending_writes": _queue.qsize(),
+        "dropped": _dropped,
+    }
@@ -0,0 +1,337 @@
+"""
+Kategori Asistanı — Prompt'lar ve Patch Modu
+─────────────────────────────────────────────────────────────
+Tam mod: model kategori JSON'unun tamamını yeniden üretir
+(CATEGORY_ASSIST_PROMPT).
+
+Patch modu: tek alanlık bir değişiklik için modelin tüm kategori JSON'unu
+(her ürün çeşidi ve alanıyla) yeniden üretmesi yerine kısa bir
+işlem listesi döndürmesi istenir; işlemler sunucuda
+current_category'ye uygulanır.
+
+İşlemler (düz yapı — yapılandırılmış çıktı şemasına uygun):
+  set_name      {value}
+  set_description {value}
+  add_type      {type, label}
+  add_field     {type, field, label, field_type, unit, options}
+  update_field  {type, field, label?, field_type?, unit?, options?, clear?}
+  rename        {type, field?, value?, label?}   (field boşsa çeşit yeniden adlandırılır)
+  remove        {type, field?}                   (field boşsa çeşit silinir)
+
+type = "" → kategori geneli alanlar (default_fields).
+Boş unit / options değişiklik sayılmaz (yapılandırılmış çıktı boş
+varsayılanlar üretebilir); silmek için clear: ["unit"] / ["options"].
+Geçersiz işlemler atlanır ve nedenleriyle birlikte döndürülür.
+"""
+import copy
+from typing import Any, Optional
+
+from agent.text_utils import to_snake
+
+PATCH_OPS = (
+    "set_name", "set_description", "add_type", "add_field",
+    "update_field", "rename", "remove",
+)
+FIELD_TYPES = ("text", "number", "select")
+CLEARABLE_ATTRS = ("unit", "options")
+
+OPERATIONS_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "operations": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "op": {"type": "string", "enum": list(PATCH_OPS)},
+                    "type": {"type": "string"},
+                    "field": {"type": "string"},
+                    "value": {"type": "string"},
+                    "label": {"type": "string"},
+                    "field_type": {"type": "string", "enum": list(FIELD_TYPES)},
+                    "unit": {"type": "string"},
+                    "options": {"type": "array", "items": {"type": "string"}},
+                    "clear": {"type": "array", "items": {"type": "string", "enum": list(CLEARABLE_ATTRS)}},
+                },
+                "required": ["op"],
+            },
+        },
+        "message": {"type": "string"},
+    },
+    "required": ["operations", "message"],
+}
+
+_CATEGORY_FIELD_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "label": {"type": "string"},
+        "type": {"type": "string", "enum": list(FIELD_TYPES)},
+        "unit": {"type": "string"},
+        "options": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["name", "label", "type"],
+}
+
+# Tam mod: kategorinin tamamı + özet mesaj
+CATEGORY_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "description": {"type": "string"},
+        "product_types": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "value": {"type": "string"},
+                    "label": {"type": "string"},
+                    "fields": {"type": "array", "items": _CATEGORY_FIELD_SCHEMA},
+                },
+                "required": ["value", "label"],
+            },
+        },
+        "default_fields": {"type": "array", "items": _CATEGORY_FIELD_SCHEMA},
+        "message": {"type": "string"},
+    },
+    "required": ["name", "description", "product_types", "default_fields", "message"],
+}
+
+CATEGORY_ASSIST_PROMPT = """Sen endüstriyel mutfak ekipmanları kategori yönetim asistanısın. Kullanıcının doğal dilde yazdığı talimatları anlayıp kategori verisini güncelleyeceksin.
+
+## MEVCUT KATEGORİ VERİSİ
+{current_data}
+
+## KULLANICI TALİMATI
+{user_message}
+
+## KURALLAR
+1. Kullanıcının talebini analiz et ve mevcut kategori verisini buna göre güncelle.
+2. Ürün çeşidi (product_types) eklerken value alanı snake_case olmalı (Türkçe karakterler dönüştürülmeli: ş→s, ç→c, ğ→g, ü→u, ö→o, ı→i).
+3. Teknik alan (fields) eklerken name alanı snake_case olmalı.
+4. Teknik alan tipi "text", "number" veya "select" olabilir.
+5. Select tipindeki alanlar için options listesi sağla.
+6. Birim (unit) varsa ekle: cm, mm, kg, L, HP vb.
+7. Mevcut verileri koruyarak sadece talep edilen değişiklikleri yap.
+8. Eğer kullanıcı sadece ürün çeşidi ekliyorsa, diğer alanları olduğu gibi bırak.
+9. Eğer kullanıcı sadece teknik alan ekliyorsa, diğer alanları olduğu gibi bırak.
+10. "message" alanında yaptığın değişiklikleri kısa özetle (Türkçe).
+
+## ÇIKTI (SADECE JSON, başka bir şey yazma)
+{{
+    "name": "Kategori adı",
+    "description": "Kategori açıklaması",
+    "product_types": [
+        {{
+            "value": "snake_case_deger",
+            "label": "Görünen Ad",
+            "fields": [
+                {{
+                    "name": "alan_adi",
+                    "label": "Alan Başlığı",
+                    "type": "number|text|select",
+                    "unit": "cm",
+                    "options": ["seçenek1", "seçenek2"]
+                }}
+            ]
+        }}
+    ],
+    "default_fields": [
+        {{
+            "name": "alan_adi",
+            "label": "Alan Başlığı",
+            "type": "number|text|select",
+            "unit": "birim",
+            "options": []
+        }}
+    ],
+    "message": "Yapılan değişikliklerin kısa özeti"
+}}"""
+
+# Patch modu: model sadece işlem listesi döndürür
+CATEGORY_PATCH_PROMPT = """Sen endüstriyel mutfak ekipmanları kategori yönetim asistanısın. Kullanıcının talimatını, mevcut kategori verisine uygulanacak KISA bir işlem listesine çevir. Kategoriyi baştan yazma; sadece değişen kısımlar için işlem üret.
+
+## MEVCUT KATEGORİ VERİSİ
+{current_data}
+
+## KULLANICI TALİMATI
+{user_message}
+
+## İŞLEMLER
+- {{"op": "set_name", "value": "Yeni ad"}}
+- {{"op": "set_description", "value": "Yeni açıklama"}}
+- {{"op": "add_type", "type": "snake_case_deger", "label": "Görünen Ad"}}
+- {{"op": "add_field", "type": "cesit_degeri", "field": "alan_adi", "label": "Alan Başlığı", "field_type": "number|text|select", "unit": "cm", "options": []}}
+- {{"op": "update_field", "type": "cesit_degeri", "field": "alan_adi", "label": "...", "field_type": "...", "unit": "...", "options": [...]}} (sadece değişen anahtarları yaz)
+- {{"op": "update_field", "type": "cesit_degeri", "field": "alan_adi", "clear": ["unit", "options"]}} (birimi / seçenekleri kaldırmak için)
+- {{"op": "rename", "type": "cesit_degeri", "field": "alan_adi (çeşit için boş bırak)", "value": "yeni_snake_case", "label": "Yeni Görünen Ad"}}
+- {{"op": "remove", "type": "cesit_degeri", "field": "alan_adi (çeşidin tamamı için boş bırak)"}}
+
+## KURALLAR
+1. "type" mevcut veya bu listede daha önce eklenen bir ürün çeşidinin value değeridir; kategori geneli alanlar (default_fields) için "type": "" kullan.
+2. value ve field değerleri snake_case olmalı (ş→s, ç→c, ğ→g, ü→u, ö→o, ı→i).
+3. field_type "text", "number" veya "select" olabilir; select için options ver.
+4. Yeni bir çeşide alan eklemek için önce add_type, sonra add_field işlemleri yaz.
+5. "message" alanında yaptığın değişiklikleri kısa özetle (Türkçe).
+
+## ÇIKTI (SADECE JSON, başka bir şey yazma)
+{{"operations": [...], "message": "Yapılan değişikliklerin kısa özeti"}}"""
+
+
+class PatchError(ValueError):
+    pass
+
+
+def _find_type(category: dict, value: str) -> Optional[dict]:
+    for pt in category["product_types"]:
+        if pt.get("value") == value:
+            return pt
+    return None
+
+
+def _field_list(category: dict, type_value: str, create: bool = False) -> list[dict]:
+    """Alan listesi: type boşsa default_fields, değilse çeşidin fields'ı."""
+    if not type_value:
+        return category["default_fields"]
+    pt = _find_type(category, type_value)
+    if pt is None:
+        raise PatchError(f"ürün çeşidi bulunamadı: {type_value}")
+    if pt.get("fields") is None:
+        if not create:
+            return []
+        pt["fields"] = []
+    return pt["fields"]
+
+
+def _find_field(fields: list[dict], name: str) -> Optional[dict]:
+    for f in fields:
+        if f.get("name") == name:
+            return f
+    return None
+
+
+def _field_changes(op: dict) -> dict:
+    changes: dict[str, Any] = {}
+    if op.get("label"):
+        changes["label"] = op["label"]
+    if op.get("field_type"):
+        if op["field_type"] not in FIELD_TYPES:
+            raise PatchError(f"geçersiz alan tipi: {op['field_type']}")
+        changes["type"] = op["field_type"]
+    # Boş unit / options "değişiklik yok" demektir; silme clear ile açıkça istenir
+    if op.get("unit"):
+        changes["unit"] = op["unit"]
+    if op.get("options"):
+        changes["options"] = [str(o) for o in op["options"]]
+    for attr in op.get("clear") or []:
+        if attr not in CLEARABLE_ATTRS:
+            raise PatchError(f"temizlenemeyen özellik: {attr}")
+        changes[attr] = None if attr == "unit" else []
+    return changes
+
+
+def _apply(category: dict, op: dict) -> None:
+    kind = op.get("op")
+    type_value = to_snake(op.get("type") or "")
+    field_name = to_snake(op.get("field") or "")
+
+    if kind == "set_name":
+        if not op.get("value"):
+            raise PatchError("ad boş olamaz")
+        category["name"] = op["value"]
+
+    elif kind == "set_description":
+        category["description"] = op.get("value") or ""
+
+    elif kind == "add_type":
+        if not type_value:
+            raise PatchError("çeşit değeri boş")
+        if _find_type(category, type_value):
+            raise PatchError(f"çeşit zaten var: {type_value}")
+        category["product_types"].append({
+            "value": type_value,
+            "label": op.get("label") or op.get("type"),
+            "fields": None,
+        })
+
+    elif kind == "add_field":
+        if not field_name:
+            raise PatchError("alan adı boş")
+        fields = _field_list(category, type_value, create=True)
+        if _find_field(fields, field_name):
+            raise PatchError(f"alan zaten var: {field_name}")
+        field = {"name": field_name, "label": op.get("label") or op.get("field"), "type": "text"}
+        field.update(_field_changes(op))
+        fields.append(field)
+
+    elif kind == "update_field":
+        field = _find_field(_field_list(category, type_value), field_name)
+        if field is None:
+            raise PatchError(f"alan bulunamadı: {field_name}")
+        field.update(_field_changes(op))
+
+    elif kind == "rename":
+        new_value = to_snake(op.get("value") or "")
+        if field_name:
+            fields = _field_list(category, type_value)
+            target = _find_field(fields, field_name)
+            if target is None:
+                raise PatchError(f"alan bulunamadı: {field_name}")
+            if new_value and new_value != field_name and _find_field(fields, new_value):
+                raise PatchError(f"alan zaten var: {new_value}")
+            key = "name"
+        else:
+            target = _find_type(category, type_value)
+            if target is None:
+                raise PatchError(f"ürün çeşidi bulunamadı: {type_value}")
+            if new_value and new_value != type_value and _find_type(category, new_value):
+                raise PatchError(f"çeşit zaten var: {new_value}")
+            key = "value"
+        if new_value:
+            target[key] = new_value
+        if op.get("label"):
+            target["label"] = op["label"]
+
+    elif kind == "remove":
+        if field_name:
+            fields = _field_list(category, type_value)
+            field = _find_field(fields, field_name)
+            if field is None:
+                raise PatchError(f"alan bulunamadı: {field_name}")
+            fields.remove(field)
+        else:
+            pt = _find_type(category, type_value)
+            if pt is None:
+                raise PatchError(f"ürün çeşidi bulunamadı: {type_value}")
+            category["product_types"].remove(pt)
+
+    else:
+        raise PatchError(f"bilinmeyen işlem: {kind}")
+
+
+def apply_operations(category: dict, operations: list[dict]) -> tuple[dict, list[str]]:
+    """İşlemleri kategorinin kopyasına sırayla uygula.
+
+    Returns:
+        (güncellenmiş kategori, atlanan işlemlerin açıklamaları)
+    """
+    result = copy.deepcopy(category)
+    result.setdefault("name", "")
+    result.setdefault("description", "")
+    result["product_types"] = result.get("product_types") or []
+    result["default_fields"] = result.get("default_fields") or []
+
+    skipped: list[str] = []
+    for i, op in enumerate(operations, 1):
+        if not isinstance(op, dict):
+            skipped.append(f"{i}. işlem geçersiz")
+            continue
+        try:
+            _apply(result, op)
+        except PatchError as e:
+            skipped.append(f"{i}. işlem ({op.get('op')}): {e}")
+
+    for pt in result["product_types"]:
+        if not pt.get("fields"):
+            pt["fields"] = None
+    return result, skipped
@@ -0,0 +1,150 @@
+"""
+Yerel Kategori Ön Sınıflandırıcı
+─────────────────────────────────────────────────────────────
+Açıklamaların çoğu ürünü açıkça adlandırır ("pilav arabası",
+"buzdolabı"). LLM'e 24 kategorinin tamamını göndermek yerine
+BM25 ile en olası 2–3 kategori seçilir ve prompt'a sadece onların
+şeması konur.
+
+Her kategori bir "belge"dir: kategori adı + ürün çeşidi etiketleri
+(şema kayıt defterinden) + type değerleri + eş anlamlılar. Metin Türkçe
+karakterler ASCII'ye katlanarak normalize edilir ve kelimeler ilk
+5 harfe kesilir (Türkçe ekler için basit ve etkili kök bulma:
+"buzdolabı", "buzdolapları" → "buzdo").
+
+Güven düşükse None döner; çağıran taraf tam prompt'u kullanır.
+"""
+import math
+import re
+from collections import Counter
+from typing import Optional
+
+STEM_LENGTH = 5
+
+_TR_FOLD = str.maketrans({
+    "ı": "i", "İ": "i", "I": "i",
+    "ş": "s", "Ş": "s",
+    "ğ": "g", "Ğ": "g",
+    "ü": "u", "Ü": "u",
+    "ö": "o", "Ö": "o",
+    "ç": "c", "Ç": "c",
+    "â": "a", "î": "i", "û": "u",
+})
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+# Açıklamalarda ürünü niteleyen ama kategori ayırt etmeyen kelimeler
+_STOPWORDS = {
+    "ve", "ile", "icin", "bir", "cok", "az", "var", "yok", "gibi", "olan", "adet",
+    "tl", "lira", "bin", "fiyat", "fiyati", "alis", "satis", "sifir", "ikinci", "el",
+    "temiz", "saglam", "kullanilmis", "marka", "model", "cm", "mm", "lt", "litre", "kg",
+}
+
+# Kategori → eş anlamlı / günlük dilde kullanılan adlar
+CATEGORY_SYNONYMS: dict[str, list[str]] = {
+    "Evyeler": ["eviye", "lavabo", "bulaşık teknesi", "yıkama teknesi"],
+    "Arabalar": ["seyyar araba", "tezgahlı araba", "el arabası", "servis"],
+    "Fırınlar": ["konveksiyon", "pasta fırını", "ekmek fırını", "buharlı fırın", "kombi fırın"],
+    "Ocaklar": ["set üstü", "bek", "brülör", "kuzine", "ocağı"],
+    "Tezgahlar": ["çalışma masası", "hazırlık masası", "paslanmaz masa", "tezgâh"],
+    "Buzdolapları": ["soğutucu", "teşhir dolabı", "içecek dolabı", "soğuk dolap", "reach-in"],
+    "Dondurucular": ["derin dondurucu", "sandık tipi", "buzluk", "şok dondurucu"],
+    "Aspiratörler": ["davlumbaz", "egzoz", "hood", "havalandırma"],
+    "Kazanlar": ["kazan", "tencere", "haşlama kazanı"],
+    "Kesme Makineleri": ["kıyma", "dilimleme", "doğrama", "rende", "kesici", "salam"],
+    "Mikserler": ["mikser", "hamur", "yoğurma", "çırpıcı", "blender"],
+    "Fritözler": ["fritöz", "patates kızartma", "yağ haznesi"],
+    "Izgaralar": ["mangal", "ızgara", "grill", "kontakt"],
+    "Tost Makineleri": ["tost", "sandviç", "panini"],
+    "Kahve Makineleri": ["espresso", "kahve", "barista", "cappuccino"],
+    "Çay Kazanları": ["semaver", "çaycı", "demlik", "çay makinesi"],
+    "Bulaşık Makineleri": ["bulaşık", "yıkama makinesi", "giyotin"],
+    "Ekmek Kızartma Makineleri": ["toaster", "ekmek kızartma", "konveyörlü"],
+    "Döner Makineleri": ["döner", "gyro", "kebap", "döner ocağı"],
+    "Pizza Fırınları": ["pizza", "lahmacun", "pide", "taş fırın", "odun fırını"],
+    "Krep Makineleri": ["krep", "crepe", "gözleme"],
+    "Waffle Makineleri": ["waffle", "gofret", "bubble"],
+    "Raflar": ["raf", "rafı", "depo rafı", "kiler"],
+    "Benmari": ["benmari", "bain marie", "sıcak tutucu", "self servis"],
+}
+
+
+def normalize(text: str) -> str:
+    """Türkçe karakterleri ASCII'ye katla, küçük harfe çevir."""
+    return (text or "").translate(_TR_FOLD).lower()
+
+
+def tokenize(text: str) -> list[str]:
+    """Normalize edilmiş, 5 harfe kesilmiş ve durak kelimelerden arındırılmış terimler."""
+    return [
+        tok[:STEM_LENGTH]
+        for tok in _TOKEN_RE.findall(normalize(text).replace("_", " "))
+        if len(tok) > 1 and tok not in _STOPWORDS
+    ]
+
+
+class CategoryClassifier:
+    """Kategori belgeleri üzerinde BM25 (Okapi) puanlayıcı."""
+
+    def __init__(self, documents: dict[str, list[str]], k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.categories = list(documents)
+        self._tf: list[Counter] = [Counter(tokenize(" ".join(texts))) for texts in documents.values()]
+        self._len = [sum(tf.values()) for tf in self._tf]
+        self._avg_len = sum(self._len) / max(len(self._len), 1)
+
+        df: Counter = Counter()
+        for tf in self._tf:
+            df.update(tf.keys())
+        n = len(self._tf)
+        self._idf = {t: math.log(1 + (n - d + 0.5) / (d + 0.5)) for t, d in df.items()}
+
+    def scores(self, text: str) -> list[tuple[str, float]]:
+        """Tüm kategoriler için (kategori, puan) — büyükten küçüğe."""
+        terms = set(tokenize(text))
+        result = []
+        for cat, tf, length in zip(self.categories, self._tf, self._len):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self._avg_len)
+            for term in terms:
+                f = tf.get(term)
+                if f:
+                    score += self._idf[term] * f * (self.k1 + 1) / (f + norm)
+            result.append((cat, score))
+        result.sort(key=lambda x: x[1], reverse=True)
+        return result
+
+    def candidates(
+        self,
+        text: str,
+        top_k: int = 3,
+        min_score: float = 2.0,
+        margin: float = 1.5,
+    ) -> Optional[list[str]]:
+        """Güvenilir aday kategoriler veya None (→ tam prompt).
+
+        Güvenli sayılması için: en iyi puan min_score üstünde olmalı ve
+        top_k'nın dışında kalan en iyi kategoriden margin kat yüksek olmalı.
+        Adaylar, en iyi puanın üçte birinden zayıf olanlar elenerek döner.
+        """
+        ranked = self.scores(text)
+        if not ranked or ranked[0][1] < min_score:
+            return None
+        best = ranked[0][1]
+        runner_up = ranked[top_k][1] if len(ranked) > top_k else 0.0
+        if runner_up * margin > best:
+            return None
+        return [cat for cat, score in ranked[:top_k] if score >= best / 3]
+
+
+def build_classifier(
+    categories: dict[str, dict],
+    type_labels: Optional[dict[str, list[dict]]] = None,
+) -> CategoryClassifier:
+    """Prompt kategorileri (+ ürün çeşidi etiketleri) ile sınıflandırıcı kur."""
+    documents: dict[str, list[str]] = {}
+    for cat_name, cat_info in categories.items():
+        texts = [cat_name, *cat_info.get("types", []), *CATEGORY_SYNONYMS.get(cat_name, [])]
+        texts += [t.get("label", "") for t in (type_labels or {}).get(cat_name, [])]
+        documents[cat_name] = texts
+    return CategoryClassifier(documents)
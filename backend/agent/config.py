@@ -26,6 +26,29 @@ GOOGLE_MODEL_FALLBACK: str = os.getenv("GOOGLE_MODEL_FALLBACK", "gemini-2.5-flas
 GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
 GROQ_MODEL: str = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
 
+# ─── Ses çevirme (Groq Whisper) ─────────────────────────────
+TRANSCRIBE_MODEL: str = os.getenv("TRANSCRIBE_MODEL", "whisper-large-v3-turbo")
+TRANSCRIBE_LANGUAGE: str = os.getenv("TRANSCRIBE_LANGUAGE", "tr")
+# Uzun kayıtlar sessizlik noktalarından yaklaşık bu uzunlukta parçalara bölünür
+TRANSCRIBE_CHUNK_SECONDS: float = float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "90"))
+TRANSCRIBE_CONCURRENCY: int = int(os.getenv("TRANSCRIBE_CONCURRENCY", "4"))
+TRANSCRIBE_MAX_UPLOAD_MB: int = int(os.getenv("TRANSCRIBE_MAX_UPLOAD_MB", "50"))
+# ffmpeg çözme süresi sınırı; aşılırsa ses tek parça gönderilir
+TRANSCRIBE_DECODE_TIMEOUT_SECONDS: float = float(os.getenv("TRANSCRIBE_DECODE_TIMEOUT_SECONDS", "60"))
+# Çevrilmiş metinlerin MongoDB'de tutulma süresi
+TRANSCRIPTION_CACHE_TTL_HOURS: int = int(os.getenv("TRANSCRIPTION_CACHE_TTL_HOURS", "720"))
+
+# ─── Sağlayıcı kayıt/tekrar (benchmark ve yük testi) ────────
+# live: gerçek API | record: gerçek API + yanıtları kasete yaz | replay: kasetten oynat
+AI_PROVIDER_MODE: str = os.getenv("AI_PROVIDER_MODE", "live").lower()
+AI_CASSETTE_PATH: str = os.getenv(
+    "AI_CASSETTE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts", "fixtures", "ai_cassette.jsonl"),
+)
+# Replay gecikme dağılımları: '{"gemini-2.5-flash": "lognormal:2.0:0.4", "tavily": "uniform:0.5:1.5"}'
+# Tanımsızsa kasetteki kayıtlı gecikme kullanılır
+AI_FAKE_LATENCY: str = os.getenv("AI_FAKE_LATENCY", "")
+
 # ─── LangSmith ──────────────────────────────────────────────
 LANGSMITH_TRACING: str = os.getenv("LANGSMITH_TRACING", "true")
 LANGSMITH_ENDPOINT: str = os.getenv("LANGSMITH_ENDPOINT", "https://api.smith.langchain.com")
@@ -35,29 +58,154 @@ LANGSMITH_PROJECT: str = os.getenv("LANGSMITH_PROJECT", "ayhanticaret")
 # ─── Agent Ayarları ──────────────────────────────────────────
 AGENT_TEMPERATURE: float = float(os.getenv("AGENT_TEMPERATURE", "0.1"))
 
+# ─── Kota (istemci tarafı hız sınırlama) ─────────────────────
+# model → (RPM, RPD). Free tier değerleri: docs/ai-sistem-analizi.md
+# Tanımsız modeller sınırlanmaz. LLM_QUOTAS='{"model": [rpm, rpd]}' ile ezilebilir.
+MODEL_QUOTAS: dict[str, tuple[int, int]] = {
+    "gemini-2.5-flash": (10, 250),
+    "gemini-2.5-flash-lite": (15, 1000),
+    "llama-3.3-70b-versatile": (30, 1000),
+}
+if os.getenv("LLM_QUOTAS"):
+    import json as _json
+    MODEL_QUOTAS.update({k: tuple(v) for k, v in _json.loads(os.environ["LLM_QUOTAS"]).items()})
+# Günlük kotanın bu oranı kalınca fallback modele geç (birincil tamamen bitmesin)
+QUOTA_DAILY_RESERVE: float = float(os.getenv("QUOTA_DAILY_RESERVE", "0.05"))
+
+# ─── Toplu analiz ───────────────────────────────────────────
+# Tek LLM çağrısına konacak en fazla ürün ve tahmini açıklama token'ı
+BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "20"))
+BATCH_MAX_DESCRIPTION_TOKENS: int = int(os.getenv("BATCH_MAX_DESCRIPTION_TOKENS", "12000"))
+
+# ─── Hedged istekler (opsiyonel) ────────────────────────────
+# Birincil model son gecikmelerinin HEDGE_PERCENTILE yüzdeliğinde yanıt
+# vermezse aynı prompt yedek modele de gönderilir; ilk geçerli yanıt kazanır.
+HEDGE_ENABLED: bool = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+HEDGE_PERCENTILE: float = float(os.getenv("HEDGE_PERCENTILE", "90"))
+# Yeterli ölçüm yokken kullanılacak bekleme süresi
+HEDGE_DEFAULT_DELAY_SECONDS: float = float(os.getenv("HEDGE_DEFAULT_DELAY_SECONDS", "8"))
+HEDGE_MIN_SAMPLES: int = int(os.getenv("HEDGE_MIN_SAMPLES", "10"))
+
+# ─── Sağlayıcı yönlendirme (fotoğrafsız analiz) ─────────────
+# Metin-only analizde model sırası canlı gecikme, hata oranı ve kalan
+# kotaya göre her istekte yeniden belirlenir (agent/model_router.py).
+ROUTER_ENABLED: bool = os.getenv("ROUTER_ENABLED", "true").lower() == "true"
+# Aday modeller (virgülle); boşsa GOOGLE_MODEL, GOOGLE_MODEL_FALLBACK, GROQ_MODEL
+ROUTER_MODELS: list[str] = [m.strip() for m in os.getenv("ROUTER_MODELS", "").split(",") if m.strip()]
+# Yeterli ölçüm yokken varsayılan gecikme; eşitlikte liste sırası korunur
+ROUTER_PRIOR_SECONDS: float = float(os.getenv("ROUTER_PRIOR_SECONDS", "6"))
+ROUTER_MIN_SAMPLES: int = int(os.getenv("ROUTER_MIN_SAMPLES", "5"))
+# İsteklerin bu oranı rastgele bir adayla başlar (istatistikler eskimesin)
+ROUTER_EXPLORE_RATE: float = float(os.getenv("ROUTER_EXPLORE_RATE", "0.05"))
+ROUTER_ERROR_PENALTY: float = float(os.getenv("ROUTER_ERROR_PENALTY", "4"))
+ROUTER_QUOTA_WEIGHT: float = float(os.getenv("ROUTER_QUOTA_WEIGHT", "1"))
+
+# ─── Yapılandırılmış çıktı ──────────────────────────────────
+# Form JSON Schema'sını Gemini'ye response_json_schema olarak ver; kapalıysa
+# şema gönderilmez ama yanıt yine JSON modundadır (tek json.loads ile ayrışır)
+GOOGLE_STRUCTURED_OUTPUT: bool = os.getenv("GOOGLE_STRUCTURED_OUTPUT", "true").lower() == "true"
+
+# ─── Kategori ön sınıflandırma ──────────────────────────────
+# Açıklamadan en olası kategoriler yerel olarak (BM25) seçilir ve
+# prompt'a sadece onların şeması konur; güven düşükse tam prompt.
+PRECLASSIFIER_ENABLED: bool = os.getenv("PRECLASSIFIER_ENABLED", "true").lower() == "true"
+PRECLASSIFIER_TOP_K: int = int(os.getenv("PRECLASSIFIER_TOP_K", "3"))
 
-def get_google_llm(model: str | None = None, temperature: float | None = None):
-    """Google Gemini LLM instance döndür."""
+# ─── Kategori şema kayıt defteri ────────────────────────────
+# mongo: categories koleksiyonu (boşsa/erişilemezse seed_fields) | seed: sadece seed_fields
+SCHEMA_REGISTRY_SOURCE: str = os.getenv("SCHEMA_REGISTRY_SOURCE", "mongo").lower()
+# Diğer worker'lardaki kategori değişiklikleri bu aralıkla arka planda alınır (0 = kapalı)
+SCHEMA_REGISTRY_REFRESH_SECONDS: float = float(os.getenv("SCHEMA_REGISTRY_REFRESH_SECONDS", "60"))
+
+# ─── LLM çağrı defteri ──────────────────────────────────────
+# Her LLM çağrısı (model, gecikme, token, retry, fallback) ai_call_ledger'a yazılır
+LLM_LEDGER_ENABLED: bool = os.getenv("LLM_LEDGER_ENABLED", "true").lower() == "true"
+
+# ─── Önbellek ───────────────────────────────────────────────
+# Sabit prompt önekini Gemini tarafında cached content olarak kaydet
+# (ücretli tier gerektirebilir; başarısız olursa tam prompt gönderilir)
+GOOGLE_PROMPT_CACHE: bool = os.getenv("GOOGLE_PROMPT_CACHE", "false").lower() == "true"
+GOOGLE_PROMPT_CACHE_TTL_SECONDS: int = int(os.getenv("GOOGLE_PROMPT_CACHE_TTL_SECONDS", "3600"))
+# Analiz yanıtlarının MongoDB'de tutulma süresi
+ANALYSIS_CACHE_TTL_HOURS: int = int(os.getenv("ANALYSIS_CACHE_TTL_HOURS", "72"))
+
+
+def new_google_llm(model: str | None = None, temperature: float | None = None, **kwargs):
+    """Yeni bir Google Gemini LLM instance oluştur (kayıt defterini atlar)."""
+    model = model or GOOGLE_MODEL
+    if AI_PROVIDER_MODE != "live":
+        from agent.fake_providers import chat_model
+        return chat_model("google", model, lambda: _real_google_llm(model, temperature, **kwargs))
+    return _real_google_llm(model, temperature, **kwargs)
+
+
+def _real_google_llm(model: str, temperature: float | None, **kwargs):
     from langchain_google_genai import ChatGoogleGenerativeAI
     return ChatGoogleGenerativeAI(
-        model=model or GOOGLE_MODEL,
+        model=model,
         google_api_key=GOOGLE_API_KEY,
         temperature=temperature if temperature is not None else AGENT_TEMPERATURE,
+        **kwargs,
     )
 
 
-def get_groq_llm(model: str | None = None, temperature: float | None = None):
-    """Groq LLM instance döndür (yedek)."""
+def new_groq_llm(model: str | None = None, temperature: float | None = None):
+    """Yeni bir Groq LLM instance oluştur (kayıt defterini atlar)."""
+    model = model or GROQ_MODEL
+    if AI_PROVIDER_MODE != "live":
+        from agent.fake_providers import chat_model
+        return chat_model("groq", model, lambda: _real_groq_llm(model, temperature))
+    return _real_groq_llm(model, temperature)
+
+
+def _real_groq_llm(model: str, temperature: float | None):
     from langchain_groq import ChatGroq
     return ChatGroq(
-        model=model or GROQ_MODEL,
+        model=model,
         api_key=GROQ_API_KEY,
         temperature=temperature if temperature is not None else AGENT_TEMPERATURE,
     )
 
 
+def get_google_llm(model: str | None = None, temperature: float | None = None, **kwargs):
+    """Paylaşılan Google Gemini LLM instance döndür."""
+    from agent.llm_registry import get_or_create
+    model = model or GOOGLE_MODEL
+    temperature = temperature if temperature is not None else AGENT_TEMPERATURE
+    return get_or_create(
+        "google", model, temperature,
+        lambda: new_google_llm(model=model, temperature=temperature, **kwargs),
+        **kwargs,
+    )
+
+
+def bind_google_json(llm, schema: dict):
+    """Gemini istemcisini JSON çıktıya bağla (GOOGLE_STRUCTURED_OUTPUT ise şemayla)."""
+    if GOOGLE_STRUCTURED_OUTPUT:
+        return llm.bind(response_mime_type="application/json", response_json_schema=schema)
+    return llm.bind(response_mime_type="application/json")
+
+
+def get_groq_llm(model: str | None = None, temperature: float | None = None):
+    """Paylaşılan Groq LLM instance döndür (yedek)."""
+    from agent.llm_registry import get_or_create
+    model = model or GROQ_MODEL
+    temperature = temperature if temperature is not None else AGENT_TEMPERATURE
+    return get_or_create(
+        "groq", model, temperature,
+        lambda: new_groq_llm(model=model, temperature=temperature),
+    )
+
+
+_langsmith_configured = False
+
+
 def configure_langsmith() -> None:
-    """LangSmith environment değişkenlerini aktif et."""
+    """LangSmith environment değişkenlerini aktif et (süreç başına bir kez)."""
+    global _langsmith_configured
+    if _langsmith_configured:
+        return
+    _langsmith_configured = True
     os.environ["LANGSMITH_TRACING"] = LANGSMITH_TRACING
     os.environ["LANGSMITH_ENDPOINT"] = LANGSMITH_ENDPOINT
     os.environ["LANGSMITH_PROJECT"] = LANGSMITH_PROJECT
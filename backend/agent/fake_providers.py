@@ -0,0 +1,375 @@
+"""
+Sağlayıcı Kayıt / Tekrar (Record & Replay)
+─────────────────────────────────────────────────────────────
+AI endpoint'lerini Gemini, Groq ve Tavily kotası harcamadan
+benchmark / yük testi yapabilmek için sağlayıcı yerine geçenler.
+
+AI_PROVIDER_MODE:
+  live   — gerçek sağlayıcılar (varsayılan)
+  record — gerçek sağlayıcılar; her yanıt gecikmesiyle birlikte kasete yazılır
+  replay — ağa çıkmadan kasetteki yanıtlar oynatılır
+
+Yüzey: chat model'ler için invoke / ainvoke / astream / bind
+(agent.py, price_agent.py, category_assist), Tavily için
+TavilyClient.search (search_web).
+
+Kaset (JSONL) satırları:
+  {"provider", "model", "key", "site", "response", "latency", "usage"}  — kayıttan
+  {"provider", "contains": "...", "response"}                            — elle yazılmış
+Eşleştirme sırası: tam prompt özeti → "contains" kuralları → aynı çağrı
+noktası (prompt'un ilk 160 karakteri) → aynı sağlayıcının herhangi bir
+kaydı (sırayla).
+
+Gecikme: AI_FAKE_LATENCY model/sağlayıcı → dağılım
+("fixed:1.2", "uniform:0.5:2", "normal:1.2:0.3", "lognormal:<medyan>:<sigma>");
+tanımsızsa kayıttaki gecikme kullanılır.
+
+provider_timer() ile bir isteğin sağlayıcıda geçen süresi ölçülür
+(benchmark, toplam süreden bunu çıkarıp kendi ek yükümüzü raporlar).
+Eşzamanlı çağrılar (hedge, paralel parçalar) toplanmaz; meşgul
+aralıkların birleşimi sayılır.
+"""
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+from agent.config import AI_CASSETTE_PATH, AI_FAKE_LATENCY, AI_PROVIDER_MODE
+
+logger = logging.getLogger(__name__)
+
+_SITE_CHARS = 160
+_STREAM_CHUNK_CHARS = 80
+
+class ProviderTime:
+    """Sağlayıcının meşgul olduğu aralıkların birleşimi (perf_counter saniyesi)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._intervals: list[tuple[float, float]] = []  # sıralı, ayrık
+        self.seconds = 0.0
+
+    def add(self, start: float, end: float) -> None:
+        with self._lock:
+            merged: list[tuple[float, float]] = []
+            for s, e in sorted(self._intervals + [(start, end)]):
+                if merged and s <= merged[-1][1]:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+                else:
+                    merged.append((s, e))
+            self._intervals = merged
+            self.seconds = sum(e - s for s, e in merged)
+
+
+_provider_time: contextvars.ContextVar[Optional[ProviderTime]] = contextvars.ContextVar(
+    "provider_time", default=None,
+)
+
+
+@contextmanager
+def provider_timer() -> Iterator[ProviderTime]:
+    """Bu bağlamda (ve açtığı task/thread'lerde) sağlayıcıda geçen süreyi ölç: acc.seconds."""
+    acc = ProviderTime()
+    token = _provider_time.set(acc)
+    try:
+        yield acc
+    finally:
+        _provider_time.reset(token)
+
+
+def _add_provider_time(start: float) -> None:
+    """start'tan (perf_counter) şimdiye kadarki aralığı meşgul say."""
+    acc = _provider_time.get()
+    if acc is not None:
+        acc.add(start, time.perf_counter())
+
+
+# ─── Gecikme dağılımları ────────────────────────────────────
+
+class LatencyDistribution:
+    """"tür:parametreler" biçiminde tanımlanan gecikme dağılımı (saniye)."""
+
+    def __init__(self, spec: str):
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Bilinmeyen gecikme dağılımı: {spec}")
+
+    def sample(self) -> float:
+        p = self.params
+        if self.kind == "fixed":
+            value = p[0]
+        elif self.kind == "uniform":
+            value = random.uniform(p[0], p[1])
+        elif self.kind == "normal":
+            value = random.gauss(p[0], p[1])
+        else:
+            value = random.lognormvariate(math.log(p[0]), p[1])
+        return max(0.0, value)
+
+
+def _parse_latencies(raw: str) -> dict[str, LatencyDistribution]:
+    if not raw:
+        return {}
+    return {k: LatencyDistribution(v) for k, v in json.loads(raw).items()}
+
+
+_latencies = _parse_latencies(AI_FAKE_LATENCY)
+
+
+def _latency(provider: str, model: str, recorded: Optional[float]) -> float:
+    dist = _latencies.get(model) or _latencies.get(provider) or _latencies.get("*")
+    if dist is not None:
+        return dist.sample()
+    return recorded or 0.0
+
+
+# ─── Kaset ──────────────────────────────────────────────────
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def messages_text(messages: Any) -> str:
+    """Mesajlardaki metin parçaları (görseller hariç)."""
+    if isinstance(messages, str):
+        return messages
+    parts: list[str] = []
+    for m in messages:
+        content = getattr(m, "content", m)
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts += [c.get("text", "") for c in content if isinstance(c, dict) and c.get("type") == "text"]
+    return "\n".join(parts)
+
+
+class Cassette:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._by_key: dict[tuple[str, str], dict] = {}
+        self._rules: list[dict] = []
+        self._by_site: dict[tuple[str, str], list[dict]] = {}
+        self._by_provider: dict[str, list[dict]] = {}
+        self._cursor: dict[Any, int] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("//"):
+                    self._index(json.loads(line))
+
+    def _index(self, entry: dict) -> None:
+        provider = entry["provider"]
+        if "contains" in entry:
+            self._rules.append(entry)
+        else:
+            self._by_key[(provider, entry["key"])] = entry
+            self._by_site.setdefault((provider, entry.get("site", "")), []).append(entry)
+        self._by_provider.setdefault(provider, []).append(entry)
+
+    def _next(self, bucket_key: Any, entries: list[dict]) -> dict:
+        with self._lock:
+            i = self._cursor.get(bucket_key, 0)
+            self._cursor[bucket_key] = i + 1
+        return entries[i % len(entries)]
+
+    def lookup(self, provider: str, text: str) -> Optional[dict]:
+        entry = self._by_key.get((provider, _digest(text)))
+        if entry:
+            return entry
+        for rule in self._rules:
+            if rule["provider"] == provider and rule["contains"] in text:
+                return rule
+        site = _digest(text[:_SITE_CHARS])
+        entries = self._by_site.get((provider, site))
+        if entries:
+            return self._next((provider, site), entries)
+        entries = self._by_provider.get(provider)
+        if entries:
+            return self._next(provider, entries)
+        return None
+
+    def record(self, provider: str, model: str, text: str, response: Any,
+               latency: float, usage: Optional[dict] = None) -> None:
+        entry = {
+            "provider": provider,
+            "model": model,
+            "key": _digest(text),
+            "site": _digest(text[:_SITE_CHARS]),
+            "response": response,
+            "latency": round(latency, 3),
+        }
+        if usage:
+            entry["usage"] = usage
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            self._index(entry)
+
+
+_cassette: Optional[Cassette] = None
+
+
+def get_cassette() -> Cassette:
+    global _cassette
+    if _cassette is None:
+        _cassette = Cassette(AI_CASSETTE_PATH)
+    return _cassette
+
+
+# ─── Chat model ─────────────────────────────────────────────
+
+class ReplayChatModel:
+    """Kasetten yanıt oynatan chat model (invoke / ainvoke / astream / bind)."""
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+
+    def bind(self, **kwargs: Any) -> "ReplayChatModel":
+        return self
+
+    def _reply(self, messages: Any) -> tuple[str, float, Optional[dict]]:
+        entry = get_cassette().lookup(self.provider, messages_text(messages))
+        if entry is None:
+            logger.warning("Kasette yanıt yok (%s/%s), boş JSON dönülüyor", self.provider, self.model)
+            return "{}", _latency(self.provider, self.model, None), None
+        content = entry["response"]
+        if not isinstance(content, str):
+            content = json.dumps(content, ensure_ascii=False)
+        return content, _latency(self.provider, self.model, entry.get("latency")), entry.get("usage")
+
+    def _message(self, content: str, usage: Optional[dict]):
+        from langchain_core.messages import AIMessage
+        return AIMessage(content=content, usage_metadata=usage) if usage else AIMessage(content=content)
+
+    def invoke(self, messages: Any, *args: Any, **kwargs: Any):
+        content, delay, usage = self._reply(messages)
+        start = time.perf_counter()
+        time.sleep(delay)
+        _add_provider_time(start)
+        return self._message(content, usage)
+
+    async def ainvoke(self, messages: Any, *args: Any, **kwargs: Any):
+        content, delay, usage = self._reply(messages)
+        start = time.perf_counter()
+        await asyncio.sleep(delay)
+        _add_provider_time(start)
+        return self._message(content, usage)
+
+    async def astream(self, messages: Any, *args: Any, **kwargs: Any):
+        from langchain_core.messages import AIMessageChunk
+
+        content, delay, _ = self._reply(messages)
+        pieces = [content[i:i + _STREAM_CHUNK_CHARS] for i in range(0, len(content), _STREAM_CHUNK_CHARS)] or [""]
+        # İlk parça gecikmenin yarısında, kalanlar eşit aralıklarla
+        first = delay / 2
+        rest = (delay - first) / max(len(pieces) - 1, 1)
+        for i, piece in enumerate(pieces):
+            start = time.perf_counter()
+            await asyncio.sleep(first if i == 0 else rest)
+            _add_provider_time(start)
+            yield AIMessageChunk(content=piece)
+
+
+class RecordingChatModel:
+    """Gerçek chat model'i sarar; yanıtları kasete yazar."""
+
+    def __init__(self, provider: str, model: str, llm: Any):
+        self.provider = provider
+        self.model = model
+        self._llm = llm
+
+    def bind(self, **kwargs: Any) -> "RecordingChatModel":
+        return RecordingChatModel(self.provider, self.model, self._llm.bind(**kwargs))
+
+    def _record(self, messages: Any, response: Any, start: float) -> None:
+        elapsed = time.perf_counter() - start
+        _add_provider_time(start)
+        get_cassette().record(
+            self.provider, self.model, messages_text(messages),
+            response.content, elapsed, getattr(response, "usage_metadata", None),
+        )
+
+    def invoke(self, messages: Any, *args: Any, **kwargs: Any):
+        start = time.perf_counter()
+        response = self._llm.invoke(messages, *args, **kwargs)
+        self._record(messages, response, start)
+        return response
+
+    async def ainvoke(self, messages: Any, *args: Any, **kwargs: Any):
+        start = time.perf_counter()
+        response = await self._llm.ainvoke(messages, *args, **kwargs)
+        self._record(messages, response, start)
+        return response
+
+    async def astream(self, messages: Any, *args: Any, **kwargs: Any):
+        start = time.perf_counter()
+        full = None
+        async for chunk in self._llm.astream(messages, *args, **kwargs):
+            full = chunk if full is None else full + chunk
+            yield chunk
+        if full is not None:
+            self._record(messages, full, start)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._llm, name)
+
+
+def chat_model(provider: str, model: str, real_factory: Callable[[], Any]) -> Any:
+    """AI_PROVIDER_MODE'a göre replay / recording chat model."""
+    if AI_PROVIDER_MODE == "replay":
+        return ReplayChatModel(provider, model)
+    return RecordingChatModel(provider, model, real_factory())
+
+
+# ─── Tavily ─────────────────────────────────────────────────
+
+class ReplayTavilyClient:
+    def search(self, **kwargs: Any) -> dict:
+        text = json.dumps(kwargs, ensure_ascii=False, sort_keys=True)
+        entry = get_cassette().lookup("tavily", text)
+        delay = _latency("tavily", "tavily", entry.get("latency") if entry else None)
+        start = time.perf_counter()
+        time.sleep(delay)
+        _add_provider_time(start)
+        if entry is None:
+            logger.warning("Kasette Tavily yanıtı yok, boş sonuç dönülüyor")
+            return {"results": []}
+        return entry["response"]
+
+
+class RecordingTavilyClient:
+    def __init__(self, client: Any):
+        self._client = client
+
+    def search(self, **kwargs: Any) -> dict:
+        start = time.perf_counter()
+        response = self._client.search(**kwargs)
+        elapsed = time.perf_counter() - start
+        _add_provider_time(start)
+        text = json.dumps(kwargs, ensure_ascii=False, sort_keys=True)
+        get_cassette().record("tavily", "tavily", text, response, elapsed)
+        return response
+
+
+def search_client(real_factory: Callable[[], Any]) -> Any:
+    if AI_PROVIDER_MODE == "replay":
+        return ReplayTavilyClient()
+    return RecordingTavilyClient(real_factory())
@@ -0,0 +1,300 @@
+"""
+Derlenmiş Ürün Formu Doğrulayıcıları
+─────────────────────────────────────────────────────────────
+Şema kayıt defterinin birleşik alan tanımlarından (genel alanlar +
+product_specs + kategori formu) her (kategori, ürün çeşidi) için bir
+kez doğrulayıcı derlenir ve önbelleklenir. Her alan için tek bir
+kontrol fonksiyonu üretilir:
+  - tip dönüşümü  ("4.500" → 4500.0, "evet" → True, "3" → 3; spec'te
+    birim varsa "80 cm" → 80.0)
+  - seçenek listesi (büyük/küçük harf duyarsız, kanonik değere çevrilir)
+  - sayısal aralık (spec'te min/max; yoksa negatif olamaz, °C hariç)
+
+AI çıktısı (agent._build_result), manuel ProductCreate/ProductUpdate ve
+toplu içe aktarma aynı doğrulayıcıyı kullanır. Satır başına sadece
+sözlük dolaşır — saniyede on binlerce satır.
+
+Genel alanlardaki hatalar (tip, seçenek, aralık) ve teknik alanlardaki
+tip/aralık hataları `errors`'a; teknik alanlardaki seçenek dışı değerler
+`warnings`'e yazılır (eski kayıtlardaki serbest değerler korunur).
+"""
+import functools
+import re
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Optional
+
+from agent.schema_registry import TypeSchema, get_registry
+
+# Spec'te min/max yoksa kullanılan aralıklar
+_FIELD_RANGES: dict[str, tuple[Optional[float], Optional[float]]] = {
+    "production_year": (1950, 2100),
+}
+_SIGNED_UNITS = {"°C"}
+
+_TRUE_WORDS = {"true", "evet", "var", "1", "yes", "e"}
+_FALSE_WORDS = {"false", "hayır", "hayir", "yok", "0", "no", "h"}
+
+_THOUSANDS_RE = re.compile(r"^-?\d{1,3}(\.\d{3})+(,\d+)?$")
+_NUMBER_JUNK_RE = re.compile(r"\s|tl|₺|try", re.IGNORECASE)
+
+
+class FieldError(ValueError):
+    pass
+
+
+# ─── Tip dönüşümleri ────────────────────────────────────────
+
+def _strip_unit(value: str, unit: Optional[str]) -> str:
+    """Sondaki alan birimini at ("80 cm" → "80"; büyük/küçük harf duyarsız)."""
+    value = value.strip()
+    if unit and value.casefold().endswith(unit.casefold()):
+        return value[:-len(unit)]
+    return value
+
+
+def _to_number(value: Any, unit: Optional[str] = None) -> float:
+    if isinstance(value, bool):
+        raise FieldError("sayı olmalıdır")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        s = _NUMBER_JUNK_RE.sub("", _strip_unit(value, unit))
+        if _THOUSANDS_RE.match(s):
+            s = s.replace(".", "")
+        s = s.replace(",", ".")
+        try:
+            return float(s)
+        except ValueError:
+            pass
+    raise FieldError("sayı olmalıdır")
+
+
+def _to_integer(value: Any, unit: Optional[str] = None) -> int:
+    try:
+        number = _to_number(value, unit)
+    except FieldError:
+        raise FieldError("tam sayı olmalıdır") from None
+    if not number.is_integer():
+        raise FieldError("tam sayı olmalıdır")
+    return int(number)
+
+
+def _to_boolean(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        word = value.strip().lower()
+        if word in _TRUE_WORDS:
+            return True
+        if word in _FALSE_WORDS:
+            return False
+    raise FieldError("evet/hayır olmalıdır")
+
+
+def _to_string(value: Any) -> str:
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise FieldError("metin olmalıdır")
+
+
+_COERCERS: dict[str, Callable[[Any], Any]] = {
+    "number": _to_number,
+    "integer": _to_integer,
+    "boolean": _to_boolean,
+    "string": _to_string,
+}
+
+
+# ─── Alan derleme ───────────────────────────────────────────
+
+@dataclass(frozen=True)
+class _CompiledField:
+    check: Callable[[Any], Any]
+    options: Optional[dict[str, str]]  # normalize edilmiş → kanonik
+    option_list: tuple[str, ...]
+    strict_options: bool
+
+
+def _range_for(name: str, spec: dict[str, Any]) -> tuple[Optional[float], Optional[float]]:
+    if "min" in spec or "max" in spec:
+        return spec.get("min"), spec.get("max")
+    if name in _FIELD_RANGES:
+        return _FIELD_RANGES[name]
+    if spec.get("unit") in _SIGNED_UNITS:
+        return None, None
+    return 0, None
+
+
+def _compile_field(name: str, spec: dict[str, Any], strict_options: bool) -> _CompiledField:
+    coerce = _COERCERS.get(spec.get("type", "string"), _to_string)
+
+    if spec.get("type") in ("number", "integer"):
+        low, high = _range_for(name, spec)
+        # Eski kayıtlar / içe aktarma değeri birimiyle yazmış olabilir ("80 cm")
+        if spec.get("unit"):
+            coerce = functools.partial(coerce, unit=spec["unit"])
+
+        def check(value: Any) -> Any:
+            number = coerce(value)
+            if low is not None and number < low:
+                raise FieldError(f"{low} değerinden küçük olamaz")
+            if high is not None and number > high:
+                raise FieldError(f"{high} değerinden büyük olamaz")
+            return number
+    else:
+        check = coerce
+
+    options = spec.get("options")
+    return _CompiledField(
+        check=check,
+        options={o.casefold(): o for o in options} if options else None,
+        option_list=tuple(options or ()),
+        strict_options=strict_options,
+    )
+
+
+# ─── Doğrulayıcı ────────────────────────────────────────────
+
+@dataclass
+class ValidationResult:
+    data: dict[str, Any]
+    errors: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+    dropped: list[str] = field(default_factory=list)  # drop_invalid=True iken atlanan değerler
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+class CompiledValidator:
+    """Bir (kategori, ürün çeşidi) için derlenmiş alan kontrolleri."""
+
+    __slots__ = ("category_name", "product_type", "general", "technical", "required", "defaults")
+
+    def __init__(self, schema: TypeSchema):
+        self.category_name = schema.category_name
+        self.product_type = schema.product_type
+        self.general = {
+            name: _compile_field(name, spec, strict_options=True)
+            for name, spec in schema.general_fields.items()
+        }
+        self.technical = {
+            name: _compile_field(name, spec, strict_options=False)
+            for name, spec in schema.technical_fields.items()
+        }
+        self.required = tuple(n for n, s in schema.general_fields.items() if s.get("required"))
+        self.defaults = {n: s["default"] for n, s in schema.general_fields.items() if "default" in s}
+
+    def validate(
+        self,
+        data: dict[str, Any],
+        partial: bool = False,
+        drop_invalid: bool = False,
+    ) -> ValidationResult:
+        """Ürün verisini doğrula ve dönüştürülmüş kopyasını döndür.
+
+        partial=True → eksik zorunlu alanlar kontrol edilmez (güncelleme).
+        drop_invalid=True → geçersiz değerler atlanır (genel alanlarda
+        varsayılana döner), hatalar `dropped` listesine yazılır (AI çıktısı).
+        """
+        result = ValidationResult(data=dict(data))
+        out = result.data
+        problems = result.dropped if drop_invalid else result.errors
+
+        if not partial:
+            for name in self.required:
+                if out.get(name) is None:
+                    result.errors.append(f"{name}: zorunlu alan eksik")
+
+        for name, compiled in self.general.items():
+            value = out.get(name)
+            if value is None:
+                continue
+            ok, value = self._check(name, compiled, value, problems, result.warnings, drop_invalid)
+            if ok:
+                out[name] = value
+            elif name in self.defaults:
+                out[name] = self.defaults[name]
+            else:
+                out.pop(name, None)
+
+        specs = out.get("extra_specs")
+        if isinstance(specs, dict) and specs:
+            cleaned = {}
+            for key, value in specs.items():
+                compiled = self.technical.get(key)
+                if compiled is None or value is None or value == "":
+                    cleaned[key] = value
+                    continue
+                ok, value = self._check(f"extra_specs.{key}", compiled, value, problems,
+                                        result.warnings, drop_invalid)
+                if ok:
+                    cleaned[key] = value
+            out["extra_specs"] = cleaned
+        elif specs is not None and not isinstance(specs, dict):
+            problems.append("extra_specs: nesne olmalıdır")
+            out["extra_specs"] = None
+
+        return result
+
+    @staticmethod
+    def _check(
+        label: str,
+        compiled: _CompiledField,
+        value: Any,
+        problems: list[str],
+        warnings: list[str],
+        drop_invalid: bool,
+    ) -> tuple[bool, Any]:
+        suffix = " — değer atlandı" if drop_invalid else ""
+        try:
+            value = compiled.check(value)
+        except FieldError as e:
+            problems.append(f"{label}: {e} ({value!r}){suffix}")
+            return False, None
+        if compiled.options is not None:
+            canonical = compiled.options.get(str(value).casefold())
+            if canonical is not None:
+                return True, canonical
+            message = f"{label}: '{value}' geçerli seçeneklerden biri değil {list(compiled.option_list)}"
+            if compiled.strict_options:
+                problems.append(message + suffix)
+                return False, None
+            warnings.append(message)
+        return True, value
+
+
+@functools.lru_cache(maxsize=1024)
+def _compiled(schema: TypeSchema) -> CompiledValidator:
+    # Anahtar şema nesnesinin kimliği: kayıt defteri yenilenince yeni şemalar yeniden derlenir
+    return CompiledValidator(schema)
+
+
+def compile_validator(category_name: Optional[str], product_type: Optional[str] = None) -> CompiledValidator:
+    """(kategori, ürün çeşidi) için önbellekli doğrulayıcı (ürün çeşidi değeri veya etiketi)."""
+    return _compiled(get_registry().type_schema(category_name, product_type))
+
+
+def validate_product(
+    data: dict[str, Any],
+    category_name: Optional[str],
+    product_type: Optional[str] = None,
+    partial: bool = False,
+    drop_invalid: bool = False,
+) -> ValidationResult:
+    return compile_validator(category_name, product_type).validate(
+        data, partial=partial, drop_invalid=drop_invalid,
+    )
+
+
+def clear_cache() -> None:
+    """Derlenmiş doğrulayıcıları at (benchmark)."""
+    _compiled.cache_clear()
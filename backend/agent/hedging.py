@@ -0,0 +1,90 @@
+"""
+Hedged LLM İstekleri — gecikme takibi ve istatistikler
+─────────────────────────────────────────────────────────────
+Birincil model son gecikmelerinin HEDGE_PERCENTILE yüzdeliği içinde
+yanıt vermezse aynı prompt yedek modele de gönderilir; ilk geçerli
+yanıt kazanır, diğeri iptal edilir (ProductAnalysisAgent._ainvoke_hedged).
+Yedek her zaman birincille aynı sağlayıcıdandır (Gemini ↔ Gemini).
+
+Bu modül model başına son sağlayıcı çağrı sürelerini tutar (retry
+beklemeleri hariç), hedge gecikmesini hesaplar ve hedge oranı /
+kazanılan süre istatistiklerini toplar. Kaybeden birincil çağrı iptal
+anındaki süresiyle (alt sınır) yazılır; yazılmasa yüzdelik sadece hızlı
+çağrılardan hesaplanır ve hedge gecikmesi giderek kısalırdı. Geç başlayan
+yedeğin iptal süresi yazılmaz: o modelin yüzdeliğini aşağı çekerdi.
+Kazanılan süre tahminidir: birincil modelin bu istekten daha uzun
+sürmüş geçmiş çağrılarının ortalamasından hedge yanıt süresi çıkarılır.
+"""
+import threading
+from collections import deque
+from typing import Optional
+
+from agent.config import HEDGE_DEFAULT_DELAY_SECONDS, HEDGE_MIN_SAMPLES, HEDGE_PERCENTILE
+
+_WINDOW = 200
+# Hedge çok erken tetiklenip her isteği ikiye katlamasın
+_MIN_DELAY_SECONDS = 0.5
+
+_lock = threading.Lock()
+_latencies: dict[str, deque] = {}
+_stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "saved_seconds": 0.0}
+
+
+def record_latency(model: str, seconds: float) -> None:
+    """Bir sağlayıcı çağrısının süresini kaydet.
+
+    İptal edilen birincil çağrılar iptal anındaki süreyle (alt sınır) yazılır.
+    """
+    with _lock:
+        _latencies.setdefault(model, deque(maxlen=_WINDOW)).append(seconds)
+
+
+def percentile(model: str, p: float) -> Optional[float]:
+    with _lock:
+        samples = sorted(_latencies.get(model, ()))
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+    idx = min(len(samples) - 1, max(0, round(p / 100 * (len(samples) - 1))))
+    return samples[idx]
+
+
+def hedge_delay(model: str) -> float:
+    """Yedek modelin ateşleneceği süre (saniye)."""
+    p = percentile(model, HEDGE_PERCENTILE)
+    return max(_MIN_DELAY_SECONDS, p if p is not None else HEDGE_DEFAULT_DELAY_SECONDS)
+
+
+def _tail_mean(model: str, above: float) -> Optional[float]:
+    with _lock:
+        tail = [s for s in _latencies.get(model, ()) if s > above]
+    return sum(tail) / len(tail) if tail else None
+
+
+def record_request(hedged: bool, primary: str, winner: Optional[str], elapsed: float) -> None:
+    """Hedge modunda tamamlanan bir isteği istatistiklere ekle."""
+    saved = 0.0
+    if hedged and winner and winner != primary:
+        expected = _tail_mean(primary, elapsed)
+        saved = max(0.0, expected - elapsed) if expected else 0.0
+    with _lock:
+        _stats["requests"] += 1
+        if hedged:
+            _stats["hedged"] += 1
+            if winner and winner != primary:
+                _stats["hedge_wins"] += 1
+                _stats["saved_seconds"] += saved
+
+
+def stats() -> dict:
+    with _lock:
+        s = dict(_stats)
+        models = {m: len(v) for m, v in _latencies.items()}
+    requests = s["requests"] or 1
+    return {
+        **s,
+        "saved_seconds": round(s["saved_seconds"], 2),
+        "hedge_rate": round(s["hedged"] / requests, 3),
+        "hedge_win_rate": round(s["hedge_wins"] / max(s["hedged"], 1), 3),
+        "delay_seconds": {m: round(hedge_delay(m), 2) for m in models},
+        "samples": models,
+    }
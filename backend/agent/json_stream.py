@@ -0,0 +1,128 @@
+"""
+Artımlı JSON Ayrıştırıcı
+─────────────────────────────────────────────────────────────
+LLM yanıtı token token gelirken JSON nesnesinin tamamlanan
+alanlarını hemen yakalar. Tüm metni beklemeden
+("category_name",) veya ("extra_specs", "capacity_liters") gibi
+yol + değer çiftleri üretir.
+
+Açılış '{' öncesindeki metin (```json gibi) atlanır. Kök nesne
+kapandıktan sonra gelen karakterler yok sayılır. Dizi elemanları
+ayrı ayrı raporlanmaz; dizi bir bütün olarak kapandığında
+üst alanın değeri olarak döner.
+"""
+import json
+from typing import Any, Iterator, Optional
+
+_WHITESPACE = " \t\r\n"
+
+
+class _Frame:
+    __slots__ = ("kind", "key", "expect", "key_start", "value_start")
+
+    def __init__(self, kind: str) -> None:
+        self.kind = kind                    # "obj" | "arr"
+        self.key: Optional[str] = None      # değeri okunan alan (sadece obj)
+        self.expect = "key" if kind == "obj" else "value"
+        self.key_start = -1
+        self.value_start = -1               # skaler/konteyner değerin başlangıcı
+
+
+class IncrementalJSONParser:
+    """feed() ile parça parça beslenir; tamamlanan (path, value) çiftlerini üretir.
+
+    max_depth: raporlanacak en derin nesne seviyesi (1 = sadece kök alanlar).
+    """
+
+    def __init__(self, max_depth: int = 2) -> None:
+        self.max_depth = max_depth
+        self._buf = ""
+        self._pos = 0
+        self._stack: list[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self.done = False
+
+    def feed(self, chunk: str) -> Iterator[tuple[tuple[str, ...], Any]]:
+        if self.done or not chunk:
+            return
+        self._buf += chunk
+        buf = self._buf
+
+        while self._pos < len(buf) and not self.done:
+            i = self._pos
+            ch = buf[i]
+            self._pos += 1
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._stack.append(_Frame("obj"))
+                continue
+
+            top = self._stack[-1]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if top.kind == "obj" and top.expect == "key":
+                        top.key = json.loads(buf[top.key_start:i + 1])
+                        top.expect = "colon"
+                    elif top.value_start >= 0:
+                        yield from self._complete(top, buf[top.value_start:i + 1])
+                continue
+
+            if ch in _WHITESPACE:
+                continue
+            if ch == '"':
+                self._in_string = True
+                if top.kind == "obj" and top.expect == "key":
+                    top.key_start = i
+                elif top.expect == "value":
+                    top.value_start = i
+            elif ch == ":":
+                top.expect = "value"
+                top.value_start = -1
+            elif ch in "{[":
+                if top.expect == "value":
+                    top.value_start = i
+                self._stack.append(_Frame("obj" if ch == "{" else "arr"))
+            elif ch in "}]":
+                yield from self._flush_scalar(top, i)
+                self._stack.pop()
+                if not self._stack:
+                    self.done = True
+                    break
+                parent = self._stack[-1]
+                if parent.value_start >= 0:
+                    yield from self._complete(parent, buf[parent.value_start:i + 1])
+            elif ch == ",":
+                yield from self._flush_scalar(top, i)
+                top.expect = "key" if top.kind == "obj" else "value"
+                top.key = None if top.kind == "obj" else top.key
+            elif top.expect == "value" and top.value_start < 0:
+                # Sayı / true / false / null başlangıcı
+                top.value_start = i
+
+    def _flush_scalar(self, frame: _Frame, end: int) -> Iterator[tuple[tuple[str, ...], Any]]:
+        """',' veya kapanış parantezi öncesi bekleyen skaler değeri tamamla."""
+        if frame.expect == "value" and frame.value_start >= 0:
+            yield from self._complete(frame, self._buf[frame.value_start:end].strip())
+
+    def _complete(self, frame: _Frame, raw: str) -> Iterator[tuple[tuple[str, ...], Any]]:
+        frame.value_start = -1
+        frame.expect = "after"
+        if frame.kind != "obj" or len(self._stack) > self.max_depth:
+            return
+        if any(f.kind != "obj" for f in self._stack):
+            return
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        yield tuple(f.key for f in self._stack), value
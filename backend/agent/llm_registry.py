@@ -0,0 +1,65 @@
+"""
+LLM İstemci Kayıt Defteri
+─────────────────────────────────────────────────────────────
+Süreç genelinde paylaşılan LLM istemcileri.
+
+ChatGoogleGenerativeAI / ChatGroq oluşturmak pahalıdır (SDK istemcisi,
+auth, yeni TLS bağlantısı). İstemciler (provider, model, temperature,
+ek parametreler) anahtarıyla bir kez oluşturulur ve tüm istekler
+aynı örneği kullanır. LangChain chat model'leri invoke/ainvoke için
+thread-safe'tir; durum tutmazlar.
+"""
+import logging
+import threading
+from typing import Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_clients: dict[Hashable, Any] = {}
+
+
+def _freeze(kwargs: dict[str, Any]) -> tuple:
+    return tuple(sorted((k, repr(v)) for k, v in kwargs.items()))
+
+
+def get_or_create(
+    provider: str,
+    model: str,
+    temperature: float,
+    factory: Callable[[], Any],
+    **kwargs: Any,
+) -> Any:
+    """Anahtara karşılık gelen istemciyi döndür; yoksa factory() ile oluştur."""
+    key = (provider, model, temperature, _freeze(kwargs))
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = factory()
+            _clients[key] = client
+            logger.info("LLM istemcisi oluşturuldu: %s/%s (t=%s)", provider, model, temperature)
+    return client
+
+
+def warm_up(models: list[str]) -> None:
+    """Verilen Gemini modelleri için istemcileri önceden oluştur."""
+    from agent.config import get_google_llm
+
+    for model in models:
+        try:
+            get_google_llm(model=model)
+        except Exception as e:
+            logger.warning("LLM istemcisi hazırlanamadı (%s): %s", model, e)
+
+
+def clear() -> None:
+    with _lock:
+        _clients.clear()
+
+
+def size() -> int:
+    return len(_clients)
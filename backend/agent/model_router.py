@@ -0,0 +1,145 @@
+"""
+Sağlayıcı Yönlendirici — fotoğrafsız analiz için model sırası
+─────────────────────────────────────────────────────────────
+Metin-only analizde model zinciri sabit (flash → flash-lite) değildir;
+Gemini flash, flash-lite ve Groq Llama her istekte canlı istatistiklerle
+sıralanır:
+
+  beklenen süre = p50 gecikme × (1 + ROUTER_ERROR_PENALTY × hata oranı)
+  skor          = beklenen süre × (1 + ROUTER_QUOTA_WEIGHT × (1 − kalan kota))
+
+En düşük skorlu model birincil olur, kalanlar fallback sırasıdır. Kotası
+dolu / 429 ile bloklu model sona atılır (acquire onu zaten atlar).
+ROUTER_MIN_SAMPLES'tan az ölçümü olan modelin gecikmesi ROUTER_PRIOR_SECONDS,
+hata oranı 0 sayılır; isteklerin ROUTER_EXPLORE_RATE kadarı rastgele bir
+adayla başlar ki yavaş görünen modelin istatistiği eskimesin.
+
+Ölçümler analiz çağrılarından gelir (agent.py → observe) ve retry
+beklemeleri dahil kullanıcının gördüğü süredir; süreç içidir.
+  - İptal edilen hedge kaybedeni iptal anındaki süresiyle (alt sınır)
+    yazılır. Yazılmasa hep hedge'e kalan yavaş model sadece hızlı
+    çağrılarıyla ölçülür ve birinci tercih olarak kalırdı.
+  - Hedge'de iki ayağın süresi isteğin başından ölçülür: yedeğin kendi
+    başlangıcından ölçülen süresi, kullanıcının gördüğü uçtan uca
+    süreden kısa olurdu.
+
+Her sağlayıcının prompt adaptörü agent.PROMPT_ADAPTERS'tadır; karar
+analiz sonucuna `routing` olarak eklenir.
+"""
+import random
+import threading
+from collections import deque
+from typing import Any
+
+from agent import rate_limiter
+from agent.config import (
+    AI_PROVIDER_MODE,
+    GOOGLE_MODEL,
+    GOOGLE_MODEL_FALLBACK,
+    GROQ_API_KEY,
+    GROQ_MODEL,
+    ROUTER_ERROR_PENALTY,
+    ROUTER_EXPLORE_RATE,
+    ROUTER_MIN_SAMPLES,
+    ROUTER_MODELS,
+    ROUTER_PRIOR_SECONDS,
+    ROUTER_QUOTA_WEIGHT,
+)
+
+_WINDOW = 50
+
+_lock = threading.Lock()
+_latencies: dict[str, deque] = {}
+_outcomes: dict[str, deque] = {}
+_stats: dict[str, Any] = {"routed": 0, "explored": 0, "first_choice": {}}
+
+
+def provider_of(model: str) -> str:
+    return "google" if model.startswith("gemini") else "groq"
+
+
+def candidates() -> list[str]:
+    """Yönlendirilebilir modeller (yapılandırma sırasıyla, tekrarsız).
+
+    Canlı modda GROQ_API_KEY yoksa Groq modelleri aday olmaz.
+    """
+    models = ROUTER_MODELS or [GOOGLE_MODEL, GOOGLE_MODEL_FALLBACK, GROQ_MODEL]
+    if AI_PROVIDER_MODE == "live" and not GROQ_API_KEY:
+        models = [m for m in models if provider_of(m) != "groq"]
+    return list(dict.fromkeys(models)) or [GOOGLE_MODEL, GOOGLE_MODEL_FALLBACK]
+
+
+def observe(model: str, latency: float, outcome: str) -> None:
+    """Bir analiz çağrısını istatistiklere ekle.
+
+    outcome: success | rate_limited | error | cancelled. Yanıt gelip form
+    olarak ayrıştırılamadıysa çağıran error yazar. İptal edilen çağrı hata
+    sayılmaz ama süresi (alt sınır) gecikme örneğidir.
+    """
+    with _lock:
+        if outcome != "cancelled":
+            _outcomes.setdefault(model, deque(maxlen=_WINDOW)).append(outcome == "success")
+        if outcome in ("success", "cancelled"):
+            _latencies.setdefault(model, deque(maxlen=_WINDOW)).append(latency)
+
+
+def _score(model: str) -> dict[str, Any]:
+    with _lock:
+        samples = sorted(_latencies.get(model, ()))
+        outcomes = list(_outcomes.get(model, ()))
+
+    p50 = samples[len(samples) // 2] if len(samples) >= ROUTER_MIN_SAMPLES else None
+    error_rate = outcomes.count(False) / len(outcomes) if len(outcomes) >= ROUTER_MIN_SAMPLES else 0.0
+    headroom = rate_limiter.headroom(model)
+    latency = p50 if p50 is not None else ROUTER_PRIOR_SECONDS
+    score = (
+        latency * (1 + ROUTER_ERROR_PENALTY * error_rate) * (1 + ROUTER_QUOTA_WEIGHT * (1 - headroom))
+        if headroom > 0 else None
+    )
+    return {
+        "model": model,
+        "provider": provider_of(model),
+        "p50_seconds": round(p50, 2) if p50 is not None else None,
+        "samples": len(samples),
+        "error_rate": round(error_rate, 3),
+        "quota_headroom": round(headroom, 3),
+        "score": round(score, 3) if score is not None else None,
+    }
+
+
+def route() -> tuple[list[str], dict[str, Any]]:
+    """Bu istek için model sırası ve karar özeti.
+
+    Karar: {"model", "provider", "reason", "order", "scores"}; reason
+    latency | explore | quota_exhausted (hiçbir adayda kota yok).
+    """
+    scores = [_score(m) for m in candidates()]
+    # sorted kararlıdır: skor eşitse yapılandırma sırası korunur
+    ranked = sorted(scores, key=lambda s: s["score"] if s["score"] is not None else float("inf"))
+    available = [s for s in ranked if s["score"] is not None]
+
+    reason = "latency" if available else "quota_exhausted"
+    if len(available) > 1 and random.random() < ROUTER_EXPLORE_RATE:
+        pick = random.choice(available[1:])
+        ranked.remove(pick)
+        ranked.insert(0, pick)
+        reason = "explore"
+
+    order = [s["model"] for s in ranked]
+    with _lock:
+        _stats["routed"] += 1
+        _stats["explored"] += reason == "explore"
+        _stats["first_choice"][order[0]] = _stats["first_choice"].get(order[0], 0) + 1
+    return order, {
+        "model": order[0],
+        "provider": provider_of(order[0]),
+        "reason": reason,
+        "order": order,
+        "scores": scores,
+    }
+
+
+def stats() -> dict[str, Any]:
+    with _lock:
+        s = {**_stats, "first_choice": dict(_stats["first_choice"])}
+    return {**s, "candidates": [_score(m) for m in candidates()]}
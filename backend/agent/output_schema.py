@@ -0,0 +1,144 @@
+"""
+Yapılandırılmış Çıktı Şemaları
+─────────────────────────────────────────────────────────────
+Analiz formunun JSON Schema'sı kategori kayıtlarından üretilir
+ve Gemini'ye response_json_schema olarak verilir. Model bu şemaya
+uymayan çıktı üretemez; serbest metinden JSON ayıklama ve
+ayrıştırma hatası yüzünden fallback modele geçme ortadan kalkar.
+
+Kaynaklar:
+  - şema kayıt defteri (prompt_categories) → kategori adı, type enum'u,
+    alan listesi, seçimli alanların seçenekleri
+  - product_specs → alan tipleri (number / integer / boolean / seçenekler)
+
+Birden çok kategori için şemalar düz birleştirilir (enum'lar ve
+extra_specs alanları birleşimi); kategori–tip tutarlılığını
+_build_result kontrol eder. Bu, 24 dallı anyOf'tan daha basit
+ve sağlayıcı şema karmaşıklık sınırına takılmaz.
+"""
+from typing import Any
+
+from agent.product_specs import CATEGORY_SPECS, COMMON_SPECS
+
+_JSON_TYPES = {"number", "integer", "boolean", "string"}
+
+# Ölçü/sayı bildiren alan adı sonekleri — product_specs'te tanımı olmayanlar için
+_NUMERIC_SUFFIXES = ("_cm", "_mm", "_kg", "_kw", "_liters", "_lt", "_c", "_h", "_diameter_cm")
+_INTEGER_SUFFIXES = ("_count", "_capacity")
+
+
+def _spec_definition(category: str, field: str) -> dict[str, Any]:
+    """Alanın product_specs tanımı: önce kendi kategorisi, sonra ortak, sonra herhangi bir kategori."""
+    spec = CATEGORY_SPECS.get(category, {}).get(field) or COMMON_SPECS.get(field)
+    if spec:
+        return spec
+    for specs in CATEGORY_SPECS.values():
+        if field in specs:
+            return specs[field]
+    return {}
+
+
+def field_schema(category: str, field: str, cat_info: dict) -> dict[str, Any]:
+    """Tek bir extra_specs alanının JSON Schema'sı."""
+    # Select seçenekleri frontend'in değerleriyle aynı olmalı ("Gazlı", "Elektrikli" ...)
+    options = cat_info.get("energy_options" if field == "energy_type" else f"{field}_options")
+    if options:
+        return {"type": "string", "enum": list(options)}
+
+    spec = _spec_definition(category, field)
+    json_type = spec.get("type")
+    if json_type not in _JSON_TYPES:
+        if field.endswith(_INTEGER_SUFFIXES):
+            json_type = "integer"
+        elif field.endswith(_NUMERIC_SUFFIXES):
+            json_type = "number"
+        else:
+            json_type = "string"
+
+    schema: dict[str, Any] = {"type": json_type}
+    if spec.get("label"):
+        schema["description"] = spec["label"]
+    if json_type in ("number", "integer"):
+        schema["minimum"] = 0
+    return schema
+
+
+def build_category_schema(category: str, cat_info: dict) -> dict[str, Any]:
+    """Bir kategorinin form şeması. Özellik sırası prompt'taki çıktı sırasıyla aynıdır."""
+    spec_props = {f: field_schema(category, f, cat_info) for f in cat_info["fields"]}
+    return {
+        "type": "object",
+        "properties": {
+            "category_name": {"type": "string", "enum": [category]},
+            "product_type_value": {"type": "string", "enum": list(cat_info["types"])},
+            "name": {"type": "string"},
+            "purchase_price": {"type": "number", "minimum": 0},
+            "sale_price": {"type": "number", "minimum": 0},
+            "negotiation_margin": {"type": "number", "minimum": 0},
+            "negotiation_type": {"type": "string", "enum": ["amount", "percentage"]},
+            "material": {"type": "string"},
+            "notes": {"type": "string"},
+            "extra_specs": {
+                "type": "object",
+                "properties": spec_props,
+                "additionalProperties": False,
+            },
+        },
+        "required": ["category_name", "product_type_value", "name"],
+        "additionalProperties": False,
+    }
+
+
+def build_category_schemas(categories: dict[str, dict]) -> dict[str, dict[str, Any]]:
+    return {name: build_category_schema(name, info) for name, info in categories.items()}
+
+
+def merge_category_schemas(schemas: list[dict[str, Any]]) -> dict[str, Any]:
+    """Kategori şemalarını tek düz şemada birleştir (enum ve extra_specs birleşimi)."""
+    if len(schemas) == 1:
+        return schemas[0]
+
+    categories: list[str] = []
+    types: list[str] = []
+    spec_props: dict[str, dict[str, Any]] = {}
+    for schema in schemas:
+        props = schema["properties"]
+        categories += props["category_name"]["enum"]
+        types += [t for t in props["product_type_value"]["enum"] if t not in types]
+        for field, fs in props["extra_specs"]["properties"].items():
+            existing = spec_props.get(field)
+            if existing is None:
+                spec_props[field] = dict(fs)
+            elif "enum" in existing and "enum" in fs:
+                existing["enum"] = existing["enum"] + [o for o in fs["enum"] if o not in existing["enum"]]
+            elif existing.get("type") != fs.get("type"):
+                # Kategoriler arasında farklı tip → serbest metin
+                spec_props[field] = {"type": "string"}
+
+    merged = {**schemas[0], "properties": dict(schemas[0]["properties"])}
+    merged["properties"]["category_name"] = {"type": "string", "enum": categories}
+    merged["properties"]["product_type_value"] = {"type": "string", "enum": types}
+    merged["properties"]["extra_specs"] = {
+        "type": "object",
+        "properties": spec_props,
+        "additionalProperties": False,
+    }
+    return merged
+
+
+def allow_no_match(schema: dict[str, Any]) -> dict[str, Any]:
+    """Daraltılmış prompt için: kategori/tip boş bırakılabilsin (→ tam prompt ile tekrar)."""
+    props = dict(schema["properties"])
+    for key in ("category_name", "product_type_value"):
+        props[key] = {**props[key], "enum": [*props[key]["enum"], ""]}
+    return {**schema, "properties": props}
+
+
+def batch_schema(item_schema: dict[str, Any]) -> dict[str, Any]:
+    """Toplu analiz için: her öğesi "index" alanı taşıyan form dizisi."""
+    item = {
+        **item_schema,
+        "properties": {"index": {"type": "integer", "minimum": 1}, **item_schema["properties"]},
+        "required": ["index", *item_schema["required"]],
+    }
+    return {"type": "array", "items": item}
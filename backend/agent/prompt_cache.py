@@ -0,0 +1,86 @@
+"""
+Gemini Context Cache (sağlayıcı tarafı prompt önbelleği)
+─────────────────────────────────────────────────────────────
+Sabit prompt önekini (kategori listesi + kurallar) Gemini'de
+cached content olarak bir kez kaydeder; sonraki çağrılar sadece
+kullanıcıya özgü son eki gönderir.
+
+GOOGLE_PROMPT_CACHE=true değilse veya sağlayıcı desteklemiyorsa
+None döner ve çağıran taraf tam prompt'u gönderir. Gemini 2.5
+modelleri ortak öneki ayrıca örtük (implicit) olarak da önbellekler;
+bu yüzden sabit kısım her zaman prompt'un başında tutulur.
+"""
+import hashlib
+import logging
+import threading
+import time
+from typing import Optional
+
+from agent.config import (
+    AI_PROVIDER_MODE,
+    GOOGLE_API_KEY,
+    GOOGLE_PROMPT_CACHE,
+    GOOGLE_PROMPT_CACHE_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Başarısız denemeden sonra tekrar denemeden önce beklenecek süre
+_RETRY_AFTER_FAILURE_SECONDS = 600
+
+_lock = threading.Lock()
+# (model, prefix_hash) → (cache_name | None, expires_at)
+_caches: dict[tuple[str, str], tuple[Optional[str], float]] = {}
+# Oluşturulmakta olan anahtarlar (anahtar başına tek create çağrısı)
+_creating: set[tuple[str, str]] = set()
+
+
+def _create_cache(model: str, prefix: str) -> str:
+    from google import genai
+    from google.genai import types
+
+    client = genai.Client(api_key=GOOGLE_API_KEY)
+    cache = client.caches.create(
+        model=model,
+        config=types.CreateCachedContentConfig(
+            display_name="product-analysis-prefix",
+            contents=[types.Content(role="user", parts=[types.Part(text=prefix)])],
+            ttl=f"{GOOGLE_PROMPT_CACHE_TTL_SECONDS}s",
+        ),
+    )
+    return cache.name
+
+
+def get_cached_prefix(model: str, prefix: str) -> Optional[str]:
+    """Önek için cached content adını döndürür (gerekirse oluşturur).
+
+    Oluşturma (ağ çağrısı) kilit dışında ve anahtar başına tek thread'de
+    yapılır; aynı anahtar için oluşturma sürerken gelen istekler beklemez,
+    None alıp tam prompt'u gönderir. Kilit sadece sonucu yayınlarken tutulur.
+    """
+    if not GOOGLE_PROMPT_CACHE or not GOOGLE_API_KEY or AI_PROVIDER_MODE == "replay":
+        return None
+
+    key = (model, hashlib.sha256(prefix.encode("utf-8")).hexdigest())
+    with _lock:
+        entry = _caches.get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        if key in _creating:
+            return None
+        _creating.add(key)
+
+    name: Optional[str] = None
+    ttl: float = _RETRY_AFTER_FAILURE_SECONDS
+    try:
+        name = _create_cache(model, prefix)
+        # Sunucu tarafı TTL dolmadan biraz önce yenile
+        ttl = GOOGLE_PROMPT_CACHE_TTL_SECONDS * 0.9
+        logger.info("Gemini context cache oluşturuldu: %s (%s)", name, model)
+    except Exception as e:
+        logger.warning("Gemini context cache oluşturulamadı (%s): %s", model, str(e)[:200])
+    finally:
+        with _lock:
+            _caches[key] = (name, time.monotonic() + ttl)
+            _creating.discard(key)
+    return name
@@ -0,0 +1,195 @@
+"""
+Kota Bilinçli Hız Sınırlayıcı
+─────────────────────────────────────────────────────────────
+Her model için iki katmanlı istemci tarafı limit:
+
+  1. Dakikalık token bucket (RPM) — süreç içi, bloklamaz
+  2. Günlük sayaç (RPD) — MongoDB'de, tüm worker'lar aynı bütçeyi paylaşır
+
+Model zincirinde bir model limitine yaklaşmışsa çağrı yapılmadan
+sıradaki modele geçilir; 429 alıp beklemek yerine.
+Sağlayıcı yine de 429 dönerse model kısa süre "dolu" işaretlenir.
+Kalan kota oranı (headroom) model yönlendiricisinin skoruna girer.
+
+Google günlük kotaları Pasifik saatiyle gece yarısı sıfırlanır.
+"""
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from agent.config import MODEL_QUOTAS, QUOTA_DAILY_RESERVE
+
+logger = logging.getLogger(__name__)
+
+QUOTA_DAY_TZ = ZoneInfo("America/Los_Angeles")
+# 429 sonrası modelin atlanacağı varsayılan süre
+DEFAULT_COOLDOWN_SECONDS = 30.0
+
+
+class TokenBucket:
+    """Dakikada `rpm` istek — saniyede rpm/60 token dolan kova."""
+
+    def __init__(self, rpm: int) -> None:
+        self.capacity = float(rpm)
+        self.tokens = float(rpm)
+        self.rate = rpm / 60.0
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return False
+            self._refill(now)
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            return False
+
+    def available(self) -> float:
+        """Harcamadan mevcut token sayısı (bloklu ise 0)."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return 0.0
+            self._refill(now)
+            return self.tokens
+
+    def refund(self) -> None:
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + 1.0)
+
+    def block(self, seconds: float) -> None:
+        with self._lock:
+            self.tokens = 0.0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+# Son acquire'da görülen günlük kullanım: model → (gün anahtarı, sayaç)
+_daily_seen: dict[str, tuple[str, int]] = {}
+
+
+def _bucket(model: str, rpm: int) -> TokenBucket:
+    with _buckets_lock:
+        bucket = _buckets.get(model)
+        if bucket is None:
+            bucket = _buckets[model] = TokenBucket(rpm)
+        return bucket
+
+
+def _day_key(model: str) -> tuple[str, datetime]:
+    """Günlük sayaç belge id'si ve sıfırlanma anı (naive UTC)."""
+    now_local = datetime.now(QUOTA_DAY_TZ)
+    next_midnight = datetime.combine(
+        now_local.date() + timedelta(days=1), datetime.min.time(), tzinfo=QUOTA_DAY_TZ,
+    )
+    expires = next_midnight.astimezone(ZoneInfo("UTC")).replace(tzinfo=None) + timedelta(hours=1)
+    return f"{model}:{now_local.date().isoformat()}", expires
+
+
+def _try_acquire_daily(model: str, rpd: int) -> bool:
+    """Günlük sayacı atomik olarak artır; limit (rezerv dahil) doluysa False.
+
+    MongoDB erişilemezse sadece dakikalık limit uygulanır.
+    """
+    limit = max(1, int(rpd * (1.0 - QUOTA_DAILY_RESERVE)))
+    key, expires = _day_key(model)
+    try:
+        from pymongo.errors import DuplicateKeyError
+        from database import llm_quota_col
+    except Exception as e:
+        logger.warning("Günlük kota sayacı kullanılamıyor: %s", e)
+        return True
+
+    try:
+        before = llm_quota_col.find_one_and_update(
+            {"_id": key, "count": {"$lt": limit}},
+            {
+                "$inc": {"count": 1},
+                "$setOnInsert": {"model": model, "limit": rpd, "expires_at": expires},
+            },
+            upsert=True,
+        )
+        _daily_seen[model] = (key, (before or {}).get("count", 0) + 1)
+        return True
+    except DuplicateKeyError:
+        # Belge var ama count >= limit → upsert çakıştı
+        _daily_seen[model] = (key, limit)
+        return False
+    except Exception as e:
+        logger.warning("Günlük kota sayacı güncellenemedi: %s", e)
+        return True
+
+
+def acquire(model: str) -> bool:
+    """Model için bir istek hakkı al. False → bu modeli atla."""
+    quota = MODEL_QUOTAS.get(model)
+    if not quota:
+        return True
+    rpm, rpd = quota
+
+    bucket = _bucket(model, rpm)
+    if not bucket.try_acquire():
+        logger.info("Model %s dakikalık limite yakın, atlanıyor", model)
+        return False
+    if not _try_acquire_daily(model, rpd):
+        bucket.refund()
+        logger.info("Model %s günlük kotaya yakın, atlanıyor", model)
+        return False
+    return True
+
+
+async def aacquire(model: str) -> bool:
+    """acquire'ın async sürümü (MongoDB erişimi thread'de)."""
+    return await asyncio.to_thread(acquire, model)
+
+
+def mark_rate_limited(model: str, retry_after: Optional[float] = None) -> None:
+    """Sağlayıcı 429 döndü — modeli bir süre atla."""
+    quota = MODEL_QUOTAS.get(model)
+    if not quota:
+        return
+    _bucket(model, quota[0]).block(retry_after or DEFAULT_COOLDOWN_SECONDS)
+
+
+def headroom(model: str) -> float:
+    """Modelin kalan kota oranı (0–1): dakikalık kova ile günlük sayaçtan küçüğü.
+
+    MongoDB'ye gitmez; günlük kullanım bu süreçteki son acquire'dan bilinir
+    (diğer worker'ların harcaması bir sonraki acquire'da görünür).
+    """
+    quota = MODEL_QUOTAS.get(model)
+    if not quota:
+        return 1.0
+    rpm, rpd = quota
+    minute = _bucket(model, rpm).available() / rpm
+    key, _ = _day_key(model)
+    seen_key, used = _daily_seen.get(model, (key, 0))
+    if seen_key != key:
+        used = 0
+    limit = max(1, int(rpd * (1.0 - QUOTA_DAILY_RESERVE)))
+    return max(0.0, min(minute, 1.0 - used / limit))
+
+
+def usage_today() -> list[dict]:
+    """Bugünkü günlük kota kullanımı (model başına)."""
+    from database import llm_quota_col
+
+    result = []
+    for model, (rpm, rpd) in MODEL_QUOTAS.items():
+        key, _ = _day_key(model)
+        doc = llm_quota_col.find_one({"_id": key}, {"count": 1}) or {}
+        result.append({"model": model, "rpm": rpm, "rpd": rpd, "used_today": doc.get("count", 0)})
+    return result
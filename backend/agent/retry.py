@@ -10,10 +10,13 @@ Retry akışı:
   3. Yine 429 → fallback modele geç
   4. Tüm modeller tükendiyse → kullanıcıya hata dön
 """
+import asyncio
 import logging
 import re
 import time
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable, Optional
+
+from agent import call_ledger
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +36,17 @@ def _extract_retry_delay(error_message: str) -> float:
     return DEFAULT_WAIT_SECONDS
 
 
+def retry_delay_seconds(error: Exception) -> float:
+    """Hatadaki sağlayıcı önerisi (retry in Xs / retryDelay), yoksa varsayılan."""
+    return _extract_retry_delay(str(error))
+
+
+def _retry_wait_seconds(error: Exception) -> float:
+    """Sağlayıcının önerdiği bekleme süresi (+2sn pay), 5-60sn aralığında."""
+    wait = _extract_retry_delay(str(error))
+    return max(5.0, min(wait + 2.0, 60.0))
+
+
 def is_rate_limit_error(error: Exception) -> bool:
     """429 / RESOURCE_EXHAUSTED hatası mı kontrol et."""
     err_str = str(error).lower()
@@ -48,6 +62,9 @@ def invoke_with_retry(
     llm_invoke: Callable[..., Any],
     *args: Any,
     max_retries: int = MAX_RETRIES_PER_MODEL,
+    ledger_site: str = "llm",
+    ledger_model: Optional[str] = None,
+    ledger_hop: int = 0,
     **kwargs: Any,
 ) -> Any:
     """LLM invoke çağrısını rate limit retry ile sarmala.
@@ -56,6 +73,9 @@ def invoke_with_retry(
         llm_invoke: Çağrılacak fonksiyon (örn. llm.invoke)
         *args: Fonksiyona aktarılacak argümanlar
         max_retries: Maksimum deneme sayısı
+        ledger_site: Çağrı defterindeki çağrı noktası adı
+        ledger_model: Model adı (verilmezse llm_invoke'tan bulunur)
+        ledger_hop: Fallback zincirindeki sıra (0 = birincil)
         **kwargs: Fonksiyona aktarılacak keyword argümanlar
 
     Returns:
@@ -65,15 +85,19 @@ def invoke_with_retry(
         Son deneme de başarısız olursa orijinal exception.
     """
     last_error = None
+    model = ledger_model or call_ledger.model_of(llm_invoke)
+    started = time.perf_counter()
 
     for attempt in range(1, max_retries + 1):
         try:
-            return llm_invoke(*args, **kwargs)
+            response = llm_invoke(*args, **kwargs)
+            call_ledger.record(ledger_site, model, time.perf_counter() - started, "success",
+                               retries=attempt - 1, hop=ledger_hop, response=response)
+            return response
         except Exception as e:
             last_error = e
             if is_rate_limit_error(e) and attempt < max_retries:
-                wait = _extract_retry_delay(str(e))
-                wait = max(5.0, min(wait + 2.0, 60.0))
+                wait = _retry_wait_seconds(e)
                 logger.warning(
                     "Rate limit aşıldı (deneme %d/%d). %.1f saniye bekleniyor...",
                     attempt,
@@ -82,6 +106,57 @@ def invoke_with_retry(
                 )
                 time.sleep(wait)
             else:
+                call_ledger.record(ledger_site, model, time.perf_counter() - started,
+                                   "rate_limited" if is_rate_limit_error(e) else "error",
+                                   retries=attempt - 1, hop=ledger_hop, error=e)
+                raise
+
+    raise last_error  # type: ignore[misc]
+
+
+async def ainvoke_with_retry(
+    llm_ainvoke: Callable[..., Awaitable[Any]],
+    *args: Any,
+    max_retries: int = MAX_RETRIES_PER_MODEL,
+    ledger_site: str = "llm",
+    ledger_model: Optional[str] = None,
+    ledger_hop: int = 0,
+    **kwargs: Any,
+) -> Any:
+    """invoke_with_retry'nin async karşılığı (örn. llm.ainvoke için).
+
+    Bekleme asyncio.sleep ile yapılır — event loop ve threadpool bloklanmaz.
+    """
+    last_error = None
+    model = ledger_model or call_ledger.model_of(llm_ainvoke)
+    started = time.perf_counter()
+
+    for attempt in range(1, max_retries + 1):
+        try:
+            response = await llm_ainvoke(*args, **kwargs)
+            call_ledger.record(ledger_site, model, time.perf_counter() - started, "success",
+                               retries=attempt - 1, hop=ledger_hop, response=response)
+            return response
+        except asyncio.CancelledError:
+            # Hedge'i kaybeden çağrı
+            call_ledger.record(ledger_site, model, time.perf_counter() - started, "cancelled",
+                               retries=attempt - 1, hop=ledger_hop)
+            raise
+        except Exception as e:
+            last_error = e
+            if is_rate_limit_error(e) and attempt < max_retries:
+                wait = _retry_wait_seconds(e)
+                logger.warning(
+                    "Rate limit aşıldı (deneme %d/%d). %.1f saniye bekleniyor...",
+                    attempt,
+                    max_retries,
+                    wait,
+                )
+                await asyncio.sleep(wait)
+            else:
+                call_ledger.record(ledger_site, model, time.perf_counter() - started,
+                                   "rate_limited" if is_rate_limit_error(e) else "error",
+                                   retries=attempt - 1, hop=ledger_hop, error=e)
                 raise
 
     raise last_error  # type: ignore[misc]
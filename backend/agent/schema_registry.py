@@ -0,0 +1,410 @@
+"""
+Kategori Şema Kayıt Defteri
+─────────────────────────────────────────────────────────────
+Kategori, ürün çeşidi ve alan tanımlarının tek kaynağı.
+
+Katmanlar (sonraki öncekinin üzerine yazar):
+  1. product_specs — alan tipleri, birimler, aralıklar
+     (common + kategori + çeşit)
+  2. Kategori belgeleri — default_fields ve product_types[].fields;
+     frontend formu bunları gösterir. Kategori listesi ve id'ler her zaman
+     MongoDB categories koleksiyonundan gelir. Ürün çeşidi / alan tanımı
+     olmayan kategori için seed_fields.SEED_DATA'daki aynı adlı tanım alan
+     katmanı olarak kullanılır (belge değişmez). SCHEMA_REGISTRY_SOURCE=seed
+     ise (DB'siz script/benchmark) sadece SEED_DATA okunur.
+
+MongoDB okunamazsa son başarılı kayıt defteri korunur; hiç yüklenmemişse
+RegistryUnavailable yükseltilir (API 503 döner).
+
+Yükleme sırasında her (kategori, ürün çeşidi) için donmuş birleşik
+şema (TypeSchema) bir kez hesaplanır; sorgular sözlük erişimidir.
+Kategori yazan endpoint'ler invalidate() çağırır. Başka worker'larda
+yapılan değişiklikler SCHEMA_REGISTRY_REFRESH_SECONDS'ta bir arka
+planda yeniden yüklenerek alınır (istek beklemez).
+
+Kullananlar: analiz prompt'u ve çıktı şeması (agent.py), form
+doğrulayıcıları (form_validator), kategori ve ürün endpoint'leri.
+"""
+import copy
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+from agent.config import SCHEMA_REGISTRY_REFRESH_SECONDS, SCHEMA_REGISTRY_SOURCE
+from agent.product_specs import TYPE_SPECIFIC_SPECS, get_product_schema
+from agent.text_utils import to_snake
+
+logger = logging.getLogger(__name__)
+
+# ürün çeşidi değeri (snake_case) → TYPE_SPECIFIC_SPECS anahtarı (etiket)
+_SPEC_TYPE_KEYS = {to_snake(label): label for label in TYPE_SPECIFIC_SPECS}
+
+# Sürüm özetine girmeyen belge alanları
+_VOLATILE_KEYS = ("created_at", "updated_at")
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Donmuş şemanın düz (JSON'a yazılabilir) kopyası."""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+# ─── Şemalar ────────────────────────────────────────────────
+
+@dataclass(frozen=True, eq=False)
+class TypeSchema:
+    """Bir (kategori, ürün çeşidi) için birleşik alan tanımları."""
+
+    category_name: Optional[str]
+    product_type: Optional[str]
+    label: Optional[str]
+    general_fields: Mapping[str, Mapping[str, Any]]
+    technical_fields: Mapping[str, Mapping[str, Any]]
+    form_fields: tuple[str, ...]  # formda gösterilen extra_specs alanları (sıralı)
+
+    def as_dict(self) -> dict[str, Any]:
+        """get_product_schema ile aynı yapıda düz kopya."""
+        return {
+            "general_fields": thaw(self.general_fields),
+            "technical_fields": thaw(self.technical_fields),
+            "category_name": self.category_name,
+            "product_type": self.product_type,
+        }
+
+
+@dataclass(frozen=True, eq=False)
+class CategorySchema:
+    id: Optional[int]
+    name: str
+    is_active: bool
+    types: tuple[tuple[str, str], ...]  # (değer, etiket)
+    fields: tuple[str, ...]  # kategori geneli alanlar (default_fields)
+    options: Mapping[str, tuple[str, ...]]  # seçimli alan → seçenekler (çeşitler dahil)
+    schemas: Mapping[Optional[str], TypeSchema]  # None → kategori geneli
+    doc: dict[str, Any]  # API'nin döndürdüğü belge — değiştirilmemeli
+
+    def schema_for(self, product_type: Optional[str]) -> TypeSchema:
+        if product_type:
+            schema = self.schemas.get(product_type) or self.schemas.get(to_snake(product_type))
+            if schema is not None:
+                return schema
+        return self.schemas[None]
+
+    def prompt_info(self) -> dict[str, Any]:
+        """Analiz prompt'u ve çıktı şeması için types / fields / <alan>_options."""
+        info: dict[str, Any] = {
+            "types": [value for value, _ in self.types],
+            "fields": list(self.fields),
+            "energy_options": list(self.options.get("energy_type", ())),
+        }
+        for name, opts in self.options.items():
+            if name != "energy_type" and name in self.fields:
+                info[f"{name}_options"] = list(opts)
+        return info
+
+
+@dataclass(frozen=True, eq=False)
+class Registry:
+    version: str
+    source: str  # "mongo" | "seed"
+    categories: Mapping[str, CategorySchema]
+    by_id: Mapping[int, CategorySchema]
+
+    def type_schema(self, category_name: Optional[str], product_type: Optional[str] = None) -> TypeSchema:
+        category = self.categories.get(category_name or "")
+        if category is not None:
+            return category.schema_for(product_type)
+        return _static_schema(category_name or None, product_type or None)
+
+    def category_id(self, name: Optional[str]) -> Optional[int]:
+        category = self.categories.get(name or "")
+        return category.id if category else None
+
+    def category_docs(self, include_inactive: bool = False) -> list[dict[str, Any]]:
+        """Kategori belgeleri, ada göre sıralı."""
+        return [c.doc for c in self.categories.values() if include_inactive or c.is_active]
+
+    @functools.cached_property
+    def prompt_categories(self) -> dict[str, dict[str, Any]]:
+        """Aktif ve ürün çeşidi tanımlı kategoriler → prompt bilgisi."""
+        return {
+            name: c.prompt_info()
+            for name, c in self.categories.items()
+            if c.is_active and c.types
+        }
+
+
+# ─── Derleme ────────────────────────────────────────────────
+
+def _spec_type_key(value: Optional[str], label: Optional[str]) -> Optional[str]:
+    if label and label in TYPE_SPECIFIC_SPECS:
+        return label
+    return _SPEC_TYPE_KEYS.get(to_snake(value or label or "")) if (value or label) else None
+
+
+def _merge_form_field(field: dict[str, Any], spec: Optional[Mapping[str, Any]]) -> dict[str, Any]:
+    """Form alanı tanımını (SpecFieldItem) product_specs tanımının üzerine yaz."""
+    merged = dict(spec or {})
+    if field.get("label"):
+        merged["label"] = field["label"]
+    if field.get("unit"):
+        merged["unit"] = field["unit"]
+
+    form_type = field.get("type") or "text"
+    if form_type == "select" and field.get("options"):
+        merged["type"] = "string"
+        merged["options"] = list(field["options"])
+    elif form_type == "number":
+        if merged.get("type") not in ("number", "integer"):
+            merged["type"] = "number"
+        merged.pop("options", None)
+    elif form_type == "boolean":
+        merged["type"] = "boolean"
+        merged.pop("options", None)
+    else:
+        merged["type"] = "string"
+        merged.pop("options", None)
+    return merged
+
+
+def _type_schema(
+    category_name: Optional[str],
+    value: Optional[str],
+    label: Optional[str],
+    default_fields: list[dict],
+    type_fields: Optional[list[dict]],
+) -> TypeSchema:
+    base = get_product_schema(category_name or "", _spec_type_key(value, label))
+    technical = dict(base["technical_fields"])
+    for field in [*default_fields, *(type_fields or [])]:
+        technical[field["name"]] = _merge_form_field(field, technical.get(field["name"]))
+    form = type_fields or default_fields
+    return TypeSchema(
+        category_name=category_name,
+        product_type=value,
+        label=label,
+        general_fields=_freeze(dict(base["general_fields"])),
+        technical_fields=_freeze(technical),
+        form_fields=tuple(f["name"] for f in form),
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _static_schema(category_name: Optional[str], product_type: Optional[str]) -> TypeSchema:
+    """Kayıt defterinde olmayan kategori için sadece product_specs katmanları."""
+    return _type_schema(category_name, product_type, product_type, [], None)
+
+
+class RegistryUnavailable(RuntimeError):
+    """Kategori tanımları okunamadı ve elde önceki kayıt defteri yok."""
+
+
+@functools.lru_cache(maxsize=1)
+def _seed_layers() -> Mapping[str, dict[str, Any]]:
+    from seed_fields import SEED_DATA
+
+    return MappingProxyType(copy.deepcopy(SEED_DATA))
+
+
+def _build_category(doc: dict[str, Any]) -> CategorySchema:
+    name = doc["name"]
+    # Belgede tanım yoksa aynı adlı seed kategorisinin alanları (sadece şema katmanı)
+    seed = _seed_layers().get(name) or {}
+    default_fields = doc.get("default_fields") or seed.get("default_fields") or []
+    product_types = doc.get("product_types") or seed.get("product_types") or []
+
+    options: dict[str, list[str]] = {}
+    for field in [*default_fields, *(f for pt in product_types for f in (pt.get("fields") or []))]:
+        for option in field.get("options") or []:
+            bucket = options.setdefault(field["name"], [])
+            if option not in bucket:
+                bucket.append(option)
+
+    schemas: dict[Optional[str], TypeSchema] = {None: _type_schema(name, None, None, default_fields, None)}
+    for pt in product_types:
+        schemas[pt["value"]] = _type_schema(name, pt["value"], pt.get("label"), default_fields, pt.get("fields"))
+
+    return CategorySchema(
+        id=doc.get("id"),
+        name=name,
+        is_active=doc.get("is_active", True),
+        types=tuple((pt["value"], pt.get("label") or pt["value"]) for pt in product_types),
+        fields=tuple(f["name"] for f in default_fields),
+        options=MappingProxyType({k: tuple(v) for k, v in options.items()}),
+        schemas=MappingProxyType(schemas),
+        doc=doc,
+    )
+
+
+def _version(docs: list[dict[str, Any]]) -> str:
+    stable = [{k: v for k, v in d.items() if k not in _VOLATILE_KEYS} for d in docs]
+    payload = json.dumps(stable, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def build_registry(docs: list[dict[str, Any]], source: str) -> Registry:
+    docs = sorted(docs, key=lambda d: d["name"])
+    categories = {d["name"]: _build_category(d) for d in docs}
+    return Registry(
+        version=_version(docs),
+        source=source,
+        categories=MappingProxyType(categories),
+        by_id=MappingProxyType({c.id: c for c in categories.values() if c.id is not None}),
+    )
+
+
+# ─── Yükleme ────────────────────────────────────────────────
+
+def _seed_docs() -> list[dict[str, Any]]:
+    from seed_fields import SEED_DATA
+
+    return [
+        {
+            "id": None,
+            "name": name,
+            "description": None,
+            "is_active": True,
+            "product_types": copy.deepcopy(seed["product_types"]),
+            "default_fields": copy.deepcopy(seed["default_fields"]),
+        }
+        for name, seed in SEED_DATA.items()
+    ]
+
+
+def _load_docs() -> tuple[list[dict[str, Any]], str]:
+    if SCHEMA_REGISTRY_SOURCE == "seed":
+        return _seed_docs(), "seed"
+    from database import categories_col
+    return list(categories_col.find({}, {"_id": 0})), "mongo"
+
+
+_registry: Optional[Registry] = None
+_lock = threading.Lock()
+_load_lock = threading.Lock()
+_next_refresh = 0.0
+# Okuma hatasından sonra yeniden deneme aralığı
+_RETRY_SECONDS = 5.0
+_refreshing = False
+# Bilinmeyen id'lerin tetiklediği yeniden yüklemeler arası en kısa süre
+_MISS_RELOAD_SECONDS = 5.0
+_last_miss_reload = float("-inf")
+
+
+def load() -> Registry:
+    """Tanımları yükle ve derle. İçerik değişmediyse mevcut kayıt defteri korunur.
+
+    Okuma başarısızsa son başarılı kayıt defteri döner (sonraki
+    get_registry tekrar dener); hiç yoksa RegistryUnavailable.
+    """
+    global _registry, _next_refresh
+    with _load_lock:
+        try:
+            docs, source = _load_docs()
+        except Exception as e:
+            with _lock:
+                current = _registry
+                _next_refresh = time.monotonic() + min(_RETRY_SECONDS, SCHEMA_REGISTRY_REFRESH_SECONDS)
+            if current is None:
+                raise RegistryUnavailable(f"Kategori tanımları okunamadı: {e}") from e
+            logger.warning("Kategori tanımları okunamadı, önceki kayıt defteri kullanılıyor: %s", e)
+            return current
+        version = _version(sorted(docs, key=lambda d: d["name"]))
+        with _lock:
+            current = _registry
+        if current is None or current.version != version or current.source != source:
+            registry = build_registry(docs, source)
+            logger.info(
+                "Şema kayıt defteri yüklendi (%s): %d kategori, sürüm %s",
+                source, len(registry.categories), registry.version,
+            )
+        else:
+            registry = current
+        with _lock:
+            _registry = registry
+            _next_refresh = time.monotonic() + SCHEMA_REGISTRY_REFRESH_SECONDS
+        return registry
+
+
+def _refresh_in_background() -> None:
+    global _refreshing, _next_refresh
+    with _lock:
+        if _refreshing:
+            return
+        _refreshing = True
+        _next_refresh = time.monotonic() + SCHEMA_REGISTRY_REFRESH_SECONDS
+
+    def run() -> None:
+        global _refreshing
+        try:
+            load()
+        except Exception as e:
+            logger.warning("Şema kayıt defteri yenilenemedi: %s", e)
+        finally:
+            _refreshing = False
+
+    threading.Thread(target=run, name="schema-registry-refresh", daemon=True).start()
+
+
+def get_registry() -> Registry:
+    """Geçerli kayıt defteri (ilk çağrıda yüklenir)."""
+    registry = _registry
+    if registry is None:
+        return load()
+    if (
+        SCHEMA_REGISTRY_SOURCE != "seed"
+        and SCHEMA_REGISTRY_REFRESH_SECONDS > 0
+        and time.monotonic() >= _next_refresh
+    ):
+        _refresh_in_background()
+    return registry
+
+
+def invalidate() -> None:
+    """Kategori yazıldıktan sonra çağrılır — tanımlar hemen yeniden yüklenir."""
+    try:
+        load()
+    except Exception as e:
+        logger.warning("Şema kayıt defteri yeniden yüklenemedi: %s", e)
+
+
+def type_schema(category_name: Optional[str], product_type: Optional[str] = None) -> TypeSchema:
+    return get_registry().type_schema(category_name, product_type)
+
+
+def category_by_id(category_id: Optional[int]) -> Optional[CategorySchema]:
+    """ID ile kategori. Bulunamazsa (başka worker'da yeni eklenmiş olabilir) yeniden yüklenir.
+
+    Bilinmeyen id'ler en fazla _MISS_RELOAD_SECONDS'ta bir yükleme tetikler;
+    aradaki istekler yeniden yüklemeden None alır (istemci rastgele id'lerle
+    koleksiyon taraması yaptıramaz).
+    """
+    global _last_miss_reload
+    if not category_id:
+        return None
+    registry = get_registry()
+    category = registry.by_id.get(category_id)
+    if category is None and registry.source == "mongo":
+        now = time.monotonic()
+        with _lock:
+            if now - _last_miss_reload < _MISS_RELOAD_SECONDS:
+                return None
+            _last_miss_reload = now
+        category = load().by_id.get(category_id)
+    return category
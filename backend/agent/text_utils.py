@@ -0,0 +1,15 @@
+"""
+Metin Yardımcıları
+─────────────────────────────────────────────────────────────
+Kategori / ürün çeşidi / alan adlarının ortak normalizasyonu.
+Şema kayıt defteri ve kategori asistanı aynı kuralı kullanır.
+"""
+import re
+
+_TR_MAP = str.maketrans("İıŞşÇçÜüÖöĞğÂâÎîÛû", "IiSsCcUuOoGgAaIiUu")
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def to_snake(text: str) -> str:
+    """Türkçe karakterleri dönüştürüp snake_case yap."""
+    return _NON_WORD_RE.sub("_", (text or "").translate(_TR_MAP).lower()).strip("_")
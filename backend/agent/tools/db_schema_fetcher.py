@@ -4,8 +4,8 @@ Tool 2 — DB Schema Fetcher
 Girdi  : kategori adı + ürün çeşidi
 Çıktı  : genel ürün alanları + teknik (extra_specs) alanları
 
-Veritabanından kategori bilgisini doğrular,
-product_specs modülünden teknik alan şemasını çeker.
+Kategori ve ürün çeşidini şema kayıt defterinden doğrular,
+birleşik alan şemasını (product_specs + kategori formu) döndürür.
 """
 import json
 import os
@@ -51,60 +51,43 @@ def fetch_product_schema(category_name: str, product_type: str) -> str:
         "technical_fields": {},
     }
 
-    # ── 1. Veritabanından kategori bilgisi ──
+    # ── 1. Kategori ve ürün çeşitleri (şema kayıt defteri) ──
     try:
-        from database import SessionLocal, Category
-
-        db = SessionLocal()
-        try:
-            category = db.query(Category).filter(
-                Category.name == category_name,
-                Category.is_active == True,
-            ).first()
-
-            if category:
-                result["category_id"] = category.id
-                result["category_exists"] = True
-            else:
-                # Fuzzy arama: benzer kategori var mı?
-                all_cats = db.query(Category).filter(Category.is_active == True).all()
-                similar = [
-                    c.name for c in all_cats
-                    if category_name.lower() in c.name.lower()
-                    or c.name.lower() in category_name.lower()
+        from agent.schema_registry import get_registry
+
+        registry = get_registry()
+        category = registry.categories.get(category_name)
+        if category is not None and category.is_active:
+            result["category_id"] = category.id
+            result["category_exists"] = True
+            available_types = [label for _, label in category.types]
+            result["available_product_types"] = available_types
+            result["product_type_valid"] = any(
+                product_type in (value, label) for value, label in category.types
+            )
+            if not result["product_type_valid"] and product_type:
+                # Benzer ürün çeşidi öner
+                similar_types = [
+                    t for t in available_types
+                    if product_type.lower() in t.lower()
+                    or t.lower() in product_type.lower()
                 ]
-                if similar:
-                    result["suggested_categories"] = similar
-        finally:
-            db.close()
-    except Exception as e:
-        result["db_error"] = f"Veritabanı hatası: {str(e)}"
-
-    # ── 2. Ürün çeşitlerini al ──
-    try:
-        from seed_data import PRODUCTS
-
-        available_types = PRODUCTS.get(category_name, [])
-        result["available_product_types"] = available_types
-        result["product_type_valid"] = product_type in available_types
-
-        if not result["product_type_valid"] and product_type:
-            # Benzer ürün çeşidi öner
-            similar_types = [
-                t for t in available_types
-                if product_type.lower() in t.lower()
-                or t.lower() in product_type.lower()
+                if similar_types:
+                    result["suggested_product_types"] = similar_types
+        else:
+            # Fuzzy arama: benzer kategori var mı?
+            similar = [
+                name for name, c in registry.categories.items()
+                if c.is_active and (
+                    category_name.lower() in name.lower()
+                    or name.lower() in category_name.lower()
+                )
             ]
-            if similar_types:
-                result["suggested_product_types"] = similar_types
-    except Exception:
-        pass
-
-    # ── 3. Şema tanımlarını al ──
-    try:
-        from agent.product_specs import get_product_schema
+            if similar:
+                result["suggested_categories"] = similar
 
-        schema = get_product_schema(category_name, product_type)
+        # ── 2. Birleşik alan şeması ──
+        schema = registry.type_schema(category_name, product_type).as_dict()
         result["general_fields"] = schema["general_fields"]
         result["technical_fields"] = schema["technical_fields"]
     except Exception as e:
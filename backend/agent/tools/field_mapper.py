@@ -158,7 +158,7 @@ def map_to_product_form(analysis_result: str, product_schema: str) -> str:
     llm = get_groq_llm()
 
     try:
-        response = invoke_with_retry(llm.invoke, [HumanMessage(content=prompt)])
+        response = invoke_with_retry(llm.invoke, [HumanMessage(content=prompt)], ledger_site="field_mapper")
         result_text = response.content
 
         if "```json" in result_text:
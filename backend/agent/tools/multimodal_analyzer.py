@@ -92,53 +92,29 @@ Sadece geçerli JSON döndür, başka açıklama ekleme.
 
 
 def _encode_image(image_path: str) -> tuple[str, str]:
-    """Görsel dosyasını base64 olarak kodla ve MIME tipini belirle."""
-    ext = os.path.splitext(image_path)[1].lower()
-    mime_map = {
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".png": "image/png",
-        ".gif": "image/gif",
-        ".webp": "image/webp",
-        ".bmp": "image/bmp",
-    }
-    mime_type = mime_map.get(ext, "image/jpeg")
+    """Görseli modele uygun boyuta küçültüp base64 olarak kodla, MIME tipini döndür."""
+    from image_ingest import downscale_image
 
     with open(image_path, "rb") as f:
-        data = base64.b64encode(f.read()).decode("utf-8")
+        img = downscale_image(f.read())
 
-    return data, mime_type
+    return base64.b64encode(img.data).decode("utf-8"), img.mime_type
 
 
 def _get_categories_and_types() -> tuple[list[str], dict[str, list[str]]]:
-    """Veritabanı ve seed_data'dan kategori ve ürün çeşitlerini al."""
+    """Şema kayıt defterinden aktif kategoriler ve ürün çeşidi etiketleri."""
     import sys
     backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
     if backend_dir not in sys.path:
         sys.path.insert(0, backend_dir)
 
-    try:
-        from database import SessionLocal, Category
-        db = SessionLocal()
-        try:
-            categories = db.query(Category).filter(Category.is_active == True).all()
-            category_names = [c.name for c in categories]
-        finally:
-            db.close()
-    except Exception:
-        category_names = []
+    from agent.schema_registry import get_registry
 
-    try:
-        from seed_data import PRODUCTS
-        product_types = PRODUCTS
-    except Exception:
-        product_types = {}
-
-    if not category_names:
-        from agent.product_specs import get_all_category_names
-        category_names = get_all_category_names()
-
-    return category_names, product_types
+    categories = {
+        name: c for name, c in get_registry().categories.items() if c.is_active
+    }
+    product_types = {name: [label for _, label in c.types] for name, c in categories.items()}
+    return list(categories), product_types
 
 
 @tool
@@ -196,7 +172,7 @@ def analyze_product_images(image_paths: str, user_description: str) -> str:
         content = [{"type": "text", "text": prompt_text}]
 
     try:
-        response = invoke_with_retry(llm.invoke, [HumanMessage(content=content)])
+        response = invoke_with_retry(llm.invoke, [HumanMessage(content=content)], ledger_site="multimodal")
         result_text = response.content
 
         # JSON bloğunu ayıkla
@@ -222,7 +198,9 @@ def analyze_product_images(image_paths: str, user_description: str) -> str:
             try:
                 llm = get_groq_llm()
                 text_content = [{"type": "text", "text": prompt_text}]
-                response = invoke_with_retry(llm.invoke, [HumanMessage(content=text_content)])
+                response = invoke_with_retry(
+                    llm.invoke, [HumanMessage(content=text_content)], ledger_site="multimodal", ledger_hop=1,
+                )
                 result_text = response.content
                 if "```json" in result_text:
                     result_text = result_text.split("```json")[1].split("```")[0].strip()
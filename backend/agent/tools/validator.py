@@ -4,7 +4,8 @@ Tool 4 — Validator
 Girdi  : doldurulmuş ürün formu (JSON)
 Çıktı  : doğrulama sonucu (geçerli/geçersiz + hata detayları)
 
-Kural tabanlı JSON şema kontrolü yapar.
+Kural tabanlı JSON şema kontrolü yapar (alan kontrolleri
+agent.form_validator'daki derlenmiş doğrulayıcılarla).
 LLM çağrısı yapmaz — saf mantık ile doğrulama.
 """
 import json
@@ -12,39 +13,18 @@ from typing import Any
 
 from langchain_core.tools import tool
 
+from agent.form_validator import validate_product
+
 
 # ─── Doğrulama Kuralları ──────────────────────────────────────
+# Tip, seçenek ve aralık kontrolleri agent.form_validator'da
+# (kategori/çeşit bazlı derlenmiş); burada sadece form düzeyi kurallar.
 
 REQUIRED_PRODUCT_FIELDS = ["name"]
 
-PRICE_FIELDS = ["purchase_price", "sale_price", "negotiation_margin"]
-
-VALID_STATUS = ["working", "broken", "repair"]
-VALID_STOCK_STATUS = ["available", "sold", "reserved"]
-VALID_NEGOTIATION_TYPE = ["amount", "percentage"]
-VALID_CONDITIONS = ["sıfır", "ikinci el", "yenilenmiş"]
-
-# Tip doğrulama haritası
-TYPE_VALIDATORS: dict[str, type | tuple[type, ...]] = {
-    "string": (str,),
-    "number": (int, float),
-    "integer": (int,),
-    "boolean": (bool,),
-}
-
-
-def _validate_field_type(value: Any, expected_type: str) -> bool:
-    """Değerin beklenen tipte olup olmadığını kontrol et."""
-    if value is None:
-        return True  # null her zaman geçerli
-    valid_types = TYPE_VALIDATORS.get(expected_type)
-    if not valid_types:
-        return True  # bilinmeyen tip, kabul et
-    return isinstance(value, valid_types)
-
 
 def _validate_product_data(product_data: dict[str, Any], extra_specs: dict[str, Any] | None = None) -> tuple[list[str], list[str]]:
-    """Genel ürün alanlarını doğrula."""
+    """Genel ürün alanlarında form düzeyi kurallar (ad, eksik fiyatlar, tutarlılık)."""
     errors: list[str] = []
     warnings: list[str] = []
 
@@ -68,41 +48,12 @@ def _validate_product_data(product_data: dict[str, Any], extra_specs: dict[str,
         elif isinstance(product_data[field], str) and not product_data[field].strip():
             warnings.append(f"Zorunlu alan boş: {field} — kullanıcı tarafından girilmeli")
 
-    # 2. Fiyat kontrolleri
+    # 2. Eksik fiyatlar
     for price_field in ["purchase_price", "sale_price"]:
-        val = product_data.get(price_field)
-        if val is not None:
-            if not isinstance(val, (int, float)):
-                errors.append(f"{price_field} sayısal bir değer olmalıdır")
-            elif val < 0:
-                errors.append(f"{price_field} negatif olamaz")
-        else:
+        if product_data.get(price_field) is None:
             warnings.append(f"{price_field} belirtilmemiş — kullanıcıdan istenecek")
 
-    # negotiation_margin
-    margin = product_data.get("negotiation_margin")
-    if margin is not None and isinstance(margin, (int, float)) and margin < 0:
-        errors.append("negotiation_margin negatif olamaz")
-
-    # 3. Enum alanları
-    status = product_data.get("status")
-    if status is not None and status not in VALID_STATUS:
-        errors.append(f"Geçersiz status değeri: '{status}'. Geçerli: {VALID_STATUS}")
-
-    stock_status = product_data.get("stock_status")
-    if stock_status is not None and stock_status not in VALID_STOCK_STATUS:
-        errors.append(
-            f"Geçersiz stock_status değeri: '{stock_status}'. Geçerli: {VALID_STOCK_STATUS}"
-        )
-
-    negotiation_type = product_data.get("negotiation_type")
-    if negotiation_type is not None and negotiation_type not in VALID_NEGOTIATION_TYPE:
-        errors.append(
-            f"Geçersiz negotiation_type: '{negotiation_type}'. "
-            f"Geçerli: {VALID_NEGOTIATION_TYPE}"
-        )
-
-    # 4. Mantıksal kontroller
+    # 3. Mantıksal kontroller
     purchase = product_data.get("purchase_price")
     sale = product_data.get("sale_price")
     if (
@@ -116,43 +67,6 @@ def _validate_product_data(product_data: dict[str, Any], extra_specs: dict[str,
                 f"Satış fiyatı ({sale}) alış fiyatından ({purchase}) düşük — emin misiniz?"
             )
 
-    # 5. category_id tipi
-    cat_id = product_data.get("category_id")
-    if cat_id is not None and not isinstance(cat_id, int):
-        errors.append("category_id integer olmalıdır")
-
-    return errors, warnings
-
-
-def _validate_extra_specs(extra_specs: dict[str, Any]) -> tuple[list[str], list[str]]:
-    """Teknik alanları (extra_specs) doğrula."""
-    errors: list[str] = []
-    warnings: list[str] = []
-
-    if not extra_specs or not isinstance(extra_specs, dict):
-        return errors, warnings
-
-    for key, value in extra_specs.items():
-        if value is None:
-            continue  # null değerler OK
-
-        # Boyut alanları pozitif olmalı
-        if key.endswith("_cm") or key.endswith("_kg") or key.endswith("_lt"):
-            if isinstance(value, (int, float)) and value <= 0:
-                warnings.append(f"{key} değeri pozitif olmalıdır (şu an: {value})")
-
-        # Sayı alanları
-        if key.endswith("_count") and value is not None:
-            if not isinstance(value, int):
-                errors.append(f"{key} tam sayı (integer) olmalıdır")
-            elif value < 0:
-                errors.append(f"{key} negatif olamaz")
-
-        # Yıl alanı
-        if key == "production_year" and value is not None:
-            if isinstance(value, int) and (value < 1950 or value > 2030):
-                warnings.append(f"Üretim yılı şüpheli: {value}")
-
     return errors, warnings
 
 
@@ -223,16 +137,23 @@ def validate_product_form(product_form_json: str) -> str:
                 "validated_form": None,
             }, ensure_ascii=False, indent=2)
 
-    # ── 1. Genel alan doğrulama ──
+    # ── 1. Tip / seçenek / aralık (kategori ve çeşide göre derlenmiş) ──
+    checked = validate_product(
+        {**product_data, "extra_specs": extra_specs},
+        form.get("category_name") or product_data.get("category_name"),
+        product_data.get("product_type") or form.get("product_type_value"),
+        partial=True,
+    )
+    extra_specs = checked.data.pop("extra_specs") or {}
+    product_data = checked.data
+    all_errors.extend(checked.errors)
+    all_warnings.extend(checked.warnings)
+
+    # ── 2. Form düzeyi kurallar ──
     errors, warnings = _validate_product_data(product_data, extra_specs)
     all_errors.extend(errors)
     all_warnings.extend(warnings)
 
-    # ── 2. Teknik alan doğrulama ──
-    errors, warnings = _validate_extra_specs(extra_specs)
-    all_errors.extend(errors)
-    all_warnings.extend(warnings)
-
     # ── 3. Confidence kontrolü ──
     low_confidence = _validate_confidence(field_confidence)
     if low_confidence:
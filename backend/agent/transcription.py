@@ -0,0 +1,224 @@
+"""
+Ses Çevirme (Groq Whisper) — parçalı ve paralel
+─────────────────────────────────────────────────────────────
+Akış:
+  1. Ses belleğe okunur (geçici dosya yok), içerik özeti ile önbelleğe bakılır
+  2. ffmpeg tek geçişte sesi 16 kHz mono PCM'e çözer ve silencedetect
+     ile sessiz aralıkları bulur (stdin/stdout pipe)
+  3. Kısa kayıtlar tek istekle, uzun kayıtlar sessizlik noktalarından
+     ~TRANSCRIBE_CHUNK_SECONDS'lık WAV parçalarına bölünüp AsyncGroq ile
+     eşzamanlı (TRANSCRIBE_CONCURRENCY) çevrilir
+  4. Metinler sırayla birleştirilir, sonuç MongoDB'de saklanır
+
+ffmpeg yoksa, ses pipe'tan çözülemiyorsa (örn. moov atom'u sonda olan
+m4a) veya çözme TRANSCRIBE_DECODE_TIMEOUT_SECONDS'ı aşarsa dosya eskisi
+gibi tek istekle gönderilir.
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import re
+import shutil
+import subprocess
+import wave
+from datetime import datetime
+from typing import Optional
+
+from agent.config import (
+    GROQ_API_KEY,
+    TRANSCRIBE_CHUNK_SECONDS,
+    TRANSCRIBE_CONCURRENCY,
+    TRANSCRIBE_DECODE_TIMEOUT_SECONDS,
+    TRANSCRIBE_LANGUAGE,
+    TRANSCRIBE_MODEL,
+)
+from agent.retry import ainvoke_with_retry
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+_BYTES_PER_SECOND = SAMPLE_RATE * 2  # s16le mono
+
+# Parça sınırı: hedefin yarısı ile 1.5 katı arasındaki en uygun sessizlik
+_MAX_CHUNK_SECONDS = TRANSCRIBE_CHUNK_SECONDS * 1.5
+_MIN_CHUNK_SECONDS = TRANSCRIBE_CHUNK_SECONDS * 0.5
+_SILENCE_NOISE_DB = -35
+_SILENCE_MIN_SECONDS = 0.4
+
+_SILENCE_START_RE = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END_RE = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+_client = None
+
+
+def _get_client():
+    """Paylaşılan AsyncGroq istemcisi (bağlantı havuzu istekler arasında korunur)."""
+    global _client
+    if _client is None:
+        from groq import AsyncGroq
+        _client = AsyncGroq(api_key=GROQ_API_KEY)
+    return _client
+
+
+def audio_cache_key(data: bytes) -> str:
+    h = hashlib.sha256()
+    h.update(f"{TRANSCRIBE_MODEL}\0{TRANSCRIBE_LANGUAGE}\0".encode())
+    h.update(data)
+    return h.hexdigest()
+
+
+def _get_cached(key: str) -> Optional[str]:
+    try:
+        from database import ai_transcription_cache_col
+        doc = ai_transcription_cache_col.find_one({"key": key}, {"_id": 0, "text": 1})
+    except Exception as e:
+        logger.warning("Ses çeviri önbelleği okunamadı: %s", e)
+        return None
+    return doc["text"] if doc else None
+
+
+def _store(key: str, text: str, chunks: int) -> None:
+    try:
+        from database import ai_transcription_cache_col
+        ai_transcription_cache_col.update_one(
+            {"key": key},
+            {"$set": {
+                "text": text,
+                "model": TRANSCRIBE_MODEL,
+                "chunks": chunks,
+                "created_at": datetime.utcnow(),
+            }},
+            upsert=True,
+        )
+    except Exception as e:
+        logger.warning("Ses çeviri önbelleğine yazılamadı: %s", e)
+
+
+# ─── Çözme ve bölme ─────────────────────────────────────────
+
+def parse_silences(ffmpeg_log: str) -> list[tuple[float, float]]:
+    """silencedetect çıktısından (başlangıç, bitiş) aralıkları."""
+    silences: list[tuple[float, float]] = []
+    start: Optional[float] = None
+    for line in ffmpeg_log.splitlines():
+        m = _SILENCE_START_RE.search(line)
+        if m:
+            start = max(0.0, float(m.group(1)))
+            continue
+        m = _SILENCE_END_RE.search(line)
+        if m and start is not None:
+            silences.append((start, float(m.group(1))))
+            start = None
+    return silences
+
+
+def decode_audio(data: bytes) -> Optional[tuple[bytes, list[tuple[float, float]]]]:
+    """Sesi 16 kHz mono PCM'e çöz ve sessiz aralıkları bul. ffmpeg yoksa/çözemezse/zaman aşımında None."""
+    if shutil.which("ffmpeg") is None:
+        return None
+    try:
+        proc = subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-nostats", "-i", "pipe:0",
+                "-af", f"silencedetect=noise={_SILENCE_NOISE_DB}dB:d={_SILENCE_MIN_SECONDS}",
+                "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "pipe:1",
+            ],
+            input=data,
+            capture_output=True,
+            timeout=TRANSCRIBE_DECODE_TIMEOUT_SECONDS,
+        )
+    except subprocess.TimeoutExpired:
+        # run() zaman aşımında süreci öldürüp bekler
+        logger.info("ffmpeg %ss içinde çözemedi, tek parça gönderilecek",
+                    TRANSCRIBE_DECODE_TIMEOUT_SECONDS)
+        return None
+    if proc.returncode != 0 or not proc.stdout:
+        logger.info("ffmpeg sesi çözemedi, tek parça gönderilecek: %s",
+                    proc.stderr.decode(errors="replace").strip().splitlines()[-1:])
+        return None
+    return proc.stdout, parse_silences(proc.stderr.decode(errors="replace"))
+
+
+def plan_chunks(duration: float, silences: list[tuple[float, float]]) -> list[tuple[float, float]]:
+    """Kaydı sessizlik ortalarından kesilen (başlangıç, bitiş) parçalarına böl."""
+    cut_points = [(s + e) / 2 for s, e in silences]
+    chunks: list[tuple[float, float]] = []
+    start = 0.0
+    while duration - start > _MAX_CHUNK_SECONDS:
+        target = start + TRANSCRIBE_CHUNK_SECONDS
+        window = [c for c in cut_points if start + _MIN_CHUNK_SECONDS <= c <= start + _MAX_CHUNK_SECONDS]
+        # Uygun sessizlik yoksa sert kes
+        cut = min(window, key=lambda c: abs(c - target)) if window else start + _MAX_CHUNK_SECONDS
+        chunks.append((start, cut))
+        start = cut
+    chunks.append((start, duration))
+    return chunks
+
+
+def pcm_to_wav(pcm: bytes) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(pcm)
+    return buf.getvalue()
+
+
+def _slice_pcm(pcm: bytes, start: float, end: float) -> bytes:
+    # Örnek sınırına hizala (2 byte)
+    a = int(start * SAMPLE_RATE) * 2
+    b = int(end * SAMPLE_RATE) * 2
+    return pcm[a:b]
+
+
+# ─── Çeviri ─────────────────────────────────────────────────
+
+async def _transcribe_file(filename: str, data: bytes, sem: asyncio.Semaphore) -> str:
+    async with sem:
+        result = await ainvoke_with_retry(
+            _get_client().audio.transcriptions.create,
+            file=(filename, data),
+            model=TRANSCRIBE_MODEL,
+            language=TRANSCRIBE_LANGUAGE,
+            response_format="text",
+            ledger_site="transcribe",
+            ledger_model=TRANSCRIBE_MODEL,
+        )
+    return result.strip() if isinstance(result, str) else str(result).strip()
+
+
+async def transcribe(data: bytes, filename: str = "audio.webm") -> dict:
+    """Sesi yazıya çevir.
+
+    Returns:
+        {"text": str, "chunks": int, "cached": bool}
+    """
+    key = audio_cache_key(data)
+    cached = await asyncio.to_thread(_get_cached, key)
+    if cached is not None:
+        return {"text": cached, "chunks": 0, "cached": True}
+
+    decoded = await asyncio.to_thread(decode_audio, data)
+    sem = asyncio.Semaphore(TRANSCRIBE_CONCURRENCY)
+
+    if decoded is None:
+        parts = [await _transcribe_file(filename, data, sem)]
+    else:
+        pcm, silences = decoded
+        spans = plan_chunks(len(pcm) / _BYTES_PER_SECOND, silences)
+        if len(spans) == 1:
+            # Kısa kayıt: orijinal (sıkıştırılmış) dosya WAV'dan küçüktür
+            parts = [await _transcribe_file(filename, data, sem)]
+        else:
+            logger.info("Ses %d parçaya bölündü (%.0f sn)", len(spans), spans[-1][1])
+            parts = await asyncio.gather(*(
+                _transcribe_file(f"chunk_{i:03d}.wav", pcm_to_wav(_slice_pcm(pcm, s, e)), sem)
+                for i, (s, e) in enumerate(spans)
+            ))
+
+    text = " ".join(p for p in parts if p)
+    if text:
+        await asyncio.to_thread(_store, key, text, len(parts))
+    return {"text": text, "chunks": len(parts), "cached": False}
@@ -6,84 +6,108 @@ Multimodal ürün analizi ve otomatik form oluşturma.
 Endpoints:
   POST /analyze        — Fotoğraf + metin → ürün formu
   POST /analyze-and-save — Analiz et + doğrudan veritabanına kaydet
+  POST /analyze-batch  — Çok sayıda açıklamayı toplu analiz et
+  POST /analyze-stream — Analiz alanlarını tamamlandıkça SSE ile gönder
+  GET  /jobs/{job_id}  — Arka plan analyze-and-save işinin durumu
+  GET  /jobs/{job_id}/events — İş durumunu SSE ile izle
+  GET  /metrics        — LLM çağrı metrikleri (gecikme, token, fallback, kota)
   GET  /status         — Agent durumu ve konfigürasyon kontrolü
 """
 import asyncio
 import json
 import os
-import shutil
 import uuid
 import logging
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel as _PydanticBaseModel
 
-from database import products_col, categories_col, get_next_id
+from bson import Binary
+
+from database import products_col, get_next_id
+from agent.schema_registry import category_by_id, get_registry
+from image_ingest import IngestedImage, ingest_uploads, read_upload, remove_images, save_images
+import image_hash
+import cache
+import job_queue
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Upload dizini
-AGENT_UPLOAD_DIR = os.path.join(
-    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-    "uploads",
-    "agent_temp",
-)
-os.makedirs(AGENT_UPLOAD_DIR, exist_ok=True)
-
-
-def _save_uploaded_images(
-    images: List[UploadFile], session_id: str
-) -> list[str]:
-    """Yüklenen görselleri geçici dizine kaydet, dosya yollarını döndür."""
-    session_dir = os.path.join(AGENT_UPLOAD_DIR, session_id)
-    os.makedirs(session_dir, exist_ok=True)
-
-    paths: list[str] = []
-    for img in images:
-        if not img.filename:
-            continue
-
-        # Güvenli dosya adı oluştur
-        ext = os.path.splitext(img.filename)[1].lower()
-        if ext not in (".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp"):
-            continue
-
-        safe_name = f"{uuid.uuid4().hex[:8]}{ext}"
-        file_path = os.path.join(session_dir, safe_name)
 
-        with open(file_path, "wb") as f:
-            shutil.copyfileobj(img.file, f)
+async def _hash_images(images: list[IngestedImage]) -> list[Optional[image_hash.ImageHash]]:
+    return list(await asyncio.gather(*(asyncio.to_thread(image_hash.hash_image, i.data) for i in images)))
 
-        paths.append(file_path)
 
-    return paths
+def _product_form(doc: dict) -> dict:
+    """Kayıtlı ürün belgesinden /analyze yanıtındaki product_form."""
+    category = category_by_id(doc.get("category_id"))
+    return {
+        "category_name": category.name if category else None,
+        "product_type_value": doc.get("product_type"),
+        "name": doc.get("name", ""),
+        "purchase_price": doc.get("purchase_price", 0),
+        "sale_price": doc.get("sale_price", 0),
+        "negotiation_margin": doc.get("negotiation_margin", 0),
+        "negotiation_type": doc.get("negotiation_type", "amount"),
+        "material": doc.get("material") or "",
+        "notes": doc.get("notes") or "",
+        "extra_specs": doc.get("extra_specs") or {},
+    }
 
 
-def _cleanup_session(session_id: str) -> None:
-    """Geçici oturum dosyalarını temizle."""
-    session_dir = os.path.join(AGENT_UPLOAD_DIR, session_id)
-    if os.path.exists(session_dir):
-        try:
-            shutil.rmtree(session_dir)
-        except Exception as e:
-            logger.warning("Geçici dosya temizleme hatası: %s", str(e))
+def _duplicate_result(
+    hashes: list[Optional[image_hash.ImageHash]],
+    exclude_product_id: Optional[int] = None,
+) -> Optional[dict]:
+    """Görseller kayıtlı bir ürünle eşleşiyorsa o ürünün formu (/analyze yanıtı yapısında)."""
+    if not image_hash.IMAGE_DEDUP_ENABLED:
+        return None
+    match = image_hash.find_match(hashes, exclude_product_id=exclude_product_id)
+    if match is None:
+        return None
+    doc = products_col.find_one({"id": match.product_id}, {"_id": 0})
+    if doc is None:
+        return None
+    logger.info("Fotoğraf kayıtlı ürünle eşleşti, AI atlandı. Ürün: %d, mesafe: %d", match.product_id, match.distance)
+    return {
+        "status": "success",
+        "product_form": _product_form(doc),
+        "warnings": [
+            f"Fotoğraf kayıtlı ürünle eşleşti (#{match.product_id} {doc.get('name', '')}) — "
+            "form bu üründen dolduruldu, AI analizi yapılmadı"
+        ],
+        "errors": [],
+        "duplicate_of": {
+            "product_id": match.product_id,
+            "name": doc.get("name"),
+            "stock_status": doc.get("stock_status"),
+            "image": match.image,
+            "distance": match.distance,
+        },
+    }
 
 
 @router.post("/analyze")
 async def analyze_product(
     images: List[UploadFile] = File(default=[], description="Ürün fotoğrafları (opsiyonel)"),
     description: str = Form(..., description="Kullanıcı açıklaması (metin)"),
+    check_duplicates: bool = Form(
+        default=True,
+        description="Fotoğraf kayıtlı bir ürünle eşleşirse AI yerine o ürünün formunu döndür",
+    ),
 ):
     """Ürün açıklamasını (ve opsiyonel fotoğrafları) AI ile analiz ederek form verisi oluşturur.
 
     Multipart form data olarak:
     - images: Ürün fotoğrafları (opsiyonel)
     - description: Kullanıcının ürün hakkındaki açıklaması (zorunlu)
+    - check_duplicates: Fotoğraf kayıtlı bir ürünle eşleşirse (algısal özet)
+      AI çağrılmaz, o ürünün formu `duplicate_of` ile döner (varsayılan True)
 
     Dönen yapı:
     - status: "success" | "error"
@@ -94,27 +118,31 @@ async def analyze_product(
     session_id = uuid.uuid4().hex
 
     try:
-        # ── 1. Görselleri kaydet (varsa) ──
-        image_paths = _save_uploaded_images(images, session_id) if images else []
+        # ── 1. Görselleri bellekte küçült (varsa) ──
+        ingested = await ingest_uploads(images) if images else []
 
         logger.info(
             "Analiz başlatılıyor. Session: %s, Fotoğraf: %d, Açıklama: %d karakter",
             session_id,
-            len(image_paths),
+            len(ingested),
             len(description),
         )
 
-        # ── 2. Agent'ı çalıştır (senkron — Windows TLS uyumluluğu için) ──
-        from agent import ProductAnalysisAgent
+        # ── 2. Kayıtlı ürün fotoğrafı mı? ──
+        result = None
+        if ingested and check_duplicates:
+            result = await asyncio.to_thread(_duplicate_result, await _hash_images(ingested))
 
-        agent = ProductAnalysisAgent()
-        result = await asyncio.to_thread(
-            agent.analyze_sync,
-            image_paths=image_paths,
-            user_description=description,
-        )
+        # ── 3. Agent'ı çalıştır (async — bekleme event loop'u bloklamaz) ──
+        if result is None:
+            from agent import get_agent
+
+            result = await get_agent().analyze(
+                images=ingested,
+                user_description=description,
+            )
 
-        # ── 3. Yanıtı dön ──
+        # ── 4. Yanıtı dön ──
         return JSONResponse(
             content={
                 "session_id": session_id,
@@ -131,9 +159,109 @@ async def analyze_product(
             status_code=500,
             detail=f"Ürün analizi sırasında hata oluştu: {str(e)}",
         )
-    finally:
-        # Geçici dosyaları temizle
-        _cleanup_session(session_id)
+
+
+# İş durumu SSE akışında MongoDB'yi yoklama aralığı
+JOB_EVENTS_POLL_SECONDS = 1.0
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.post("/analyze-stream")
+async def analyze_product_stream(
+    images: List[UploadFile] = File(default=[], description="Ürün fotoğrafları (opsiyonel)"),
+    description: str = Form(..., description="Kullanıcı açıklaması (metin)"),
+    check_duplicates: bool = Form(
+        default=True,
+        description="Fotoğraf kayıtlı bir ürünle eşleşirse AI yerine o ürünün formunu döndür",
+    ),
+):
+    """/analyze ile aynı girdi; yanıt Server-Sent Events akışıdır.
+
+    Olaylar: "field" (kök form alanı), "spec" (extra_specs alanı),
+    "result" (doğrulanmış son sonuç — /analyze yanıtıyla aynı yapı),
+    "error". Frontend formu ilk alanlar gelir gelmez doldurmaya başlayabilir.
+    Fotoğraf kayıtlı bir ürünle eşleşirse doğrudan "result" gönderilir.
+    """
+    session_id = uuid.uuid4().hex
+    ingested = await ingest_uploads(images) if images else []
+
+    async def _events():
+        from agent import get_agent
+
+        try:
+            yield _sse("start", {"session_id": session_id, "timestamp": datetime.utcnow().isoformat()})
+            if ingested and check_duplicates:
+                duplicate = await asyncio.to_thread(_duplicate_result, await _hash_images(ingested))
+                if duplicate is not None:
+                    yield _sse("result", duplicate)
+                    return
+            async for event in get_agent().analyze_stream(
+                images=ingested,
+                user_description=description,
+            ):
+                yield _sse(event["event"], event["data"])
+        except Exception as e:
+            logger.error("Akışlı analiz hatası: %s", str(e), exc_info=True)
+            yield _sse("error", {
+                "status": "error",
+                "product_form": None,
+                "warnings": [],
+                "errors": [f"Ürün analizi sırasında hata oluştu: {str(e)}"],
+            })
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Tek istekte kabul edilen en fazla açıklama
+MAX_BATCH_DESCRIPTIONS = 200
+
+
+class AnalyzeBatchRequest(_PydanticBaseModel):
+    descriptions: List[str]
+
+
+@router.post("/analyze-batch")
+async def analyze_batch(req: AnalyzeBatchRequest):
+    """Birden çok ürün açıklamasını (görselsiz) toplu analiz eder.
+
+    Açıklamalar parçalara bölünüp her parça tek LLM çağrısıyla işlenir.
+    Sonuçlar gönderilen sırayla, her biri kendi status/errors alanıyla döner.
+    """
+    descriptions = req.descriptions
+    if not descriptions:
+        raise HTTPException(status_code=400, detail="En az bir açıklama gerekli")
+    if any(not d or not d.strip() for d in descriptions):
+        raise HTTPException(status_code=400, detail="Boş açıklama gönderilemez")
+    if len(descriptions) > MAX_BATCH_DESCRIPTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tek istekte en fazla {MAX_BATCH_DESCRIPTIONS} açıklama gönderilebilir",
+        )
+
+    try:
+        from agent import get_agent
+
+        result = await get_agent().analyze_batch(descriptions)
+        return JSONResponse(
+            content={
+                "session_id": uuid.uuid4().hex,
+                "timestamp": datetime.utcnow().isoformat(),
+                **result,
+            }
+        )
+    except Exception as e:
+        logger.error("Toplu analiz hatası: %s", str(e), exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Toplu analiz sırasında hata oluştu: {str(e)}",
+        )
 
 
 @router.post("/analyze-and-save")
@@ -144,60 +272,77 @@ async def analyze_and_save_product(
         default=False,
         description="True ise doğrudan veritabanına kaydet, False ise onay bekle",
     ),
+    background: bool = Form(
+        default=False,
+        description="True ise iş kuyruğa alınır ve job_id hemen döner (202)",
+    ),
+    check_duplicates: bool = Form(
+        default=True,
+        description="Fotoğraf kayıtlı bir ürünle eşleşirse AI yerine o ürünün formunu döndür",
+    ),
 ):
     """Ürünü analiz et ve opsiyonel olarak doğrudan veritabanına kaydet.
 
     auto_save=True olduğunda:
     - Analiz başarılıysa ürün otomatik kaydedilir
     - Hata/belirsizlik varsa kaydetmez, kullanıcıya bildirir
+
+    background=True olduğunda bağlantı LLM çağrısı boyunca açık tutulmaz;
+    durum GET /jobs/{job_id} veya GET /jobs/{job_id}/events (SSE) ile izlenir.
+
+    Fotoğraf kayıtlı bir ürünle eşleşirse (check_duplicates) o ürünün formu
+    döner ve auto_save olsa da yeni ürün kaydedilmez.
     """
     session_id = uuid.uuid4().hex
-    saved_image_paths: list[str] = []
 
     try:
-        # ── 1. Görselleri kaydet ──
-        image_paths = _save_uploaded_images(images, session_id)
+        # ── 1. Görselleri bellekte küçült ──
+        ingested = await ingest_uploads(images)
 
-        if not image_paths:
+        if not ingested:
             raise HTTPException(
                 status_code=400,
                 detail="Geçerli bir ürün fotoğrafı yüklenemedi.",
             )
 
-        # ── 2. Agent analizi (senkron — Windows TLS uyumluluğu için) ──
-        from agent import ProductAnalysisAgent
+        if background:
+            # Orijinal fotoğraflar iş belgesine sığmaz (16 MB) — kaydedilecekse
+            # şimdi diske yazılır; ürün kaydedilmezse iş sonunda silinir
+            image_paths = (
+                await asyncio.to_thread(save_images, ingested, f"ai_{session_id[:8]}")
+                if auto_save else None
+            )
+            job_id = await job_queue.aenqueue(ANALYZE_AND_SAVE_JOB, {
+                "session_id": session_id,
+                "description": description,
+                "auto_save": auto_save,
+                "check_duplicates": check_duplicates,
+                "image_paths": image_paths,
+                "images": [
+                    {
+                        "data": Binary(img.data),
+                        "mime_type": img.mime_type,
+                        "width": img.width,
+                        "height": img.height,
+                        "original_size": img.original_size,
+                    }
+                    for img in ingested
+                ],
+            })
+            return JSONResponse(
+                status_code=202,
+                content={
+                    "job_id": job_id,
+                    "status": "queued",
+                    "status_url": f"/api/ai/jobs/{job_id}",
+                    "events_url": f"/api/ai/jobs/{job_id}/events",
+                },
+            )
 
-        agent = ProductAnalysisAgent()
-        result = await asyncio.to_thread(
-            agent.analyze_sync,
-            image_paths=image_paths,
-            user_description=description,
+        result = await _analyze_and_save(
+            ingested, description, auto_save, session_id, check_duplicates=check_duplicates,
         )
 
-        # ── 3. Otomatik kaydetme ──
-        product_id = None
-
-        if auto_save and result.get("status") == "success" and result.get("product_form"):
-            form = result["product_form"]
-
-            # Görselleri kalıcı dizine taşı
-            saved_image_paths = _move_images_to_permanent(image_paths, session_id)
-
-            # Ürünü veritabanına ekle
-            product_id = _save_product_to_db(form, saved_image_paths)
-
-            result["saved"] = True
-            result["product_id"] = product_id
-        else:
-            result["saved"] = False
-            result["product_id"] = None
-
-            if auto_save and result.get("status") != "success":
-                result["save_skipped_reason"] = (
-                    "Analiz durumu 'success' değil. "
-                    "Önce uyarıları/soruları çözün."
-                )
-
         return JSONResponse(
             content={
                 "session_id": session_id,
@@ -214,43 +359,210 @@ async def analyze_and_save_product(
             status_code=500,
             detail=f"Ürün analizi/kaydetme sırasında hata oluştu: {str(e)}",
         )
-    finally:
-        # Geçici dosyaları temizle (kaydedilmemişleri)
-        _cleanup_session(session_id)
-
-
-def _move_images_to_permanent(
-    temp_paths: list[str], session_id: str
-) -> list[str]:
-    """Geçici görselleri kalıcı ürün dizinine taşı."""
-    permanent_dir = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-        "uploads",
-        "products",
+
+
+async def _analyze_and_save(
+    ingested: list[IngestedImage],
+    description: str,
+    auto_save: bool,
+    session_id: str,
+    product_id: Optional[int] = None,
+    check_duplicates: bool = True,
+    job_id: Optional[str] = None,
+    saved_image_paths: Optional[list[str]] = None,
+) -> dict:
+    """Analiz + (auto_save ise) görselleri yazıp ürünü kaydet.
+
+    product_id verilirse ürün bu id ile kaydedilir; aynı id zaten varsa
+    tekrar eklenmez (iş yeniden denendiğinde çift kayıt oluşmasın).
+    Arka plan işinde yazılan görsel yolları işe kaydedilir (job_id) ve
+    yeniden denemede saved_image_paths olarak geri gelir — dosyalar
+    tekrar yazılmaz. Önceden yazılmış görseller ürün kaydedilmezse silinir.
+    Kaydedilen görsellerin algısal özetleri tekrar tespiti için saklanır.
+    """
+    hashes = await _hash_images(ingested)
+
+    # ── 2. Kayıtlı ürün fotoğrafı mı? ──
+    if check_duplicates:
+        # Yeniden denenen iş: önceki denemede kaydedilen ürün kendisiyle eşleşmesin
+        duplicate = await asyncio.to_thread(_duplicate_result, hashes, product_id)
+        if duplicate is not None:
+            if saved_image_paths:
+                await asyncio.to_thread(remove_images, saved_image_paths)
+            duplicate["saved"] = False
+            duplicate["product_id"] = None
+            if auto_save:
+                duplicate["save_skipped_reason"] = (
+                    f"Fotoğraf kayıtlı ürün #{duplicate['duplicate_of']['product_id']} ile eşleşti. "
+                    "Yine de kaydetmek için check_duplicates=false gönderin."
+                )
+            return duplicate
+
+    # ── 3. Agent analizi (async) ──
+    from agent import get_agent
+
+    result = await get_agent().analyze(
+        images=ingested,
+        user_description=description,
     )
-    os.makedirs(permanent_dir, exist_ok=True)
 
-    saved_paths: list[str] = []
-    for temp_path in temp_paths:
-        ext = os.path.splitext(temp_path)[1]
-        permanent_name = f"ai_{session_id[:8]}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}{ext}"
-        permanent_path = os.path.join(permanent_dir, permanent_name)
+    # ── 4. Otomatik kaydetme ──
+    if auto_save and result.get("status") == "success" and result.get("product_form"):
+        form = dict(result["product_form"])
+
+        # Görseller diske yalnızca ürün kaydedilirken yazılır
+        if saved_image_paths is None:
+            saved_image_paths = await asyncio.to_thread(
+                save_images, ingested, f"ai_{session_id[:8]}",
+            )
+            if job_id is not None:
+                await asyncio.to_thread(job_queue.update_payload, job_id, image_paths=saved_image_paths)
+
+        # Ürünü veritabanına ekle
+        product_id = await asyncio.to_thread(
+            _save_product_to_db, form, saved_image_paths, product_id,
+        )
+        # Yazılamayan görsel varsa yollar hizalanamaz — özetler yolsuz saklanır
+        paths = saved_image_paths if len(saved_image_paths) == len(hashes) else [None] * len(hashes)
+        await asyncio.to_thread(image_hash.record, product_id, list(zip(hashes, paths)), "ai")
+
+        result["saved"] = True
+        result["product_id"] = product_id
+    else:
+        if saved_image_paths:
+            await asyncio.to_thread(remove_images, saved_image_paths)
+        result["saved"] = False
+        result["product_id"] = None
+
+        if auto_save and result.get("status") != "success":
+            result["save_skipped_reason"] = (
+                "Analiz durumu 'success' değil. "
+                "Önce uyarıları/soruları çözün."
+            )
+
+    return result
 
-        try:
-            shutil.copy2(temp_path, permanent_path)
-            relative_path = f"/uploads/products/{permanent_name}"
-            saved_paths.append(relative_path)
-        except Exception as e:
-            logger.warning("Görsel taşıma hatası: %s", str(e))
 
-    return saved_paths
+def _already_saved_result(product_id: int) -> Optional[dict]:
+    """İşin ürünü önceki denemede kaydedildiyse kayıtlı ürünün sonucu."""
+    doc = products_col.find_one({"id": product_id}, {"_id": 0})
+    if doc is None:
+        return None
+    return {
+        "status": "success",
+        "product_form": _product_form(doc),
+        "warnings": [],
+        "errors": [],
+        "saved": True,
+        "product_id": product_id,
+    }
+
+
+async def _analyze_and_save_job(job: dict) -> dict:
+    """Kuyruktaki analyze-and-save işini çalıştır.
+
+    Ürün önceki denemede kaydedilip iş bitirilemediyse (_finish hatası,
+    kira süresi) analiz tekrarlanmaz: yeniden analiz kendi ürününü tekrar
+    sanıp kayıtlı ürünün fotoğraflarını silebilirdi.
+    """
+    payload = job["payload"]
+    if payload.get("product_id") is not None:
+        saved = await asyncio.to_thread(_already_saved_result, payload["product_id"])
+        if saved is not None:
+            logger.info("İşin ürünü zaten kayıtlı, analiz atlandı. İş: %s, ürün: %d", job["_id"], payload["product_id"])
+            return {"session_id": payload["session_id"], **saved}
+
+    ingested = [
+        IngestedImage(bytes(i["data"]), i["mime_type"], i["width"], i["height"], i["original_size"])
+        for i in payload["images"]
+    ]
+
+    # Ürün id'si ilk denemede ayrılır ve işe yazılır; yeniden denemede aynısı kullanılır
+    product_id = payload.get("product_id")
+    if payload["auto_save"] and product_id is None:
+        product_id = await asyncio.to_thread(get_next_id, "products")
+        await asyncio.to_thread(job_queue.update_payload, job["_id"], product_id=product_id)
+
+    result = await _analyze_and_save(
+        ingested, payload["description"], payload["auto_save"], payload["session_id"], product_id,
+        check_duplicates=payload.get("check_duplicates", True),
+        job_id=job["_id"],
+        saved_image_paths=payload.get("image_paths"),
+    )
+    return {"session_id": payload["session_id"], **result}
+
+
+def _analyze_and_save_failed(payload: dict) -> None:
+    """Kalıcı olarak başarısız işin kuyruğa alınırken yazdığı görselleri sil.
+
+    Ürün kaydedildiyse (sonraki adımda hata) görseller ürüne aittir, silinmez.
+    """
+    paths = payload.get("image_paths")
+    if not paths:
+        return
+    product_id = payload.get("product_id")
+    if product_id is not None and products_col.count_documents({"id": product_id}, limit=1):
+        return
+    remove_images(paths)
+
+
+ANALYZE_AND_SAVE_JOB = "analyze_and_save"
+job_queue.register_handler(ANALYZE_AND_SAVE_JOB, _analyze_and_save_job, on_failed=_analyze_and_save_failed)
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Arka plan işinin durumu: queued | running | done | failed (+ result / error)."""
+    job = await asyncio.to_thread(job_queue.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    return job
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_status(job_id: str):
+    """İş durumunu SSE ile izle — durum her değiştiğinde "status" olayı, bitince kapanır."""
+    job = await asyncio.to_thread(job_queue.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+
+    async def _events():
+        last = None
+        current = job
+        while True:
+            if current is None:
+                yield _sse("error", {"detail": "İş bulunamadı"})
+                return
+            marker = (current["status"], current["attempts"])
+            if marker != last:
+                last = marker
+                yield _sse("status", current)
+            if current["status"] in job_queue.TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+            current = await asyncio.to_thread(job_queue.get_job, job_id)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 def _save_product_to_db(
     form: dict,
     image_paths: list[str],
+    product_id: Optional[int] = None,
 ) -> int:
-    """Ürün formunu MongoDB'ye kaydet."""
+    """Ürün formunu MongoDB'ye kaydet.
+
+    product_id önceden ayrılmışsa (arka plan işi) ve ürün zaten kayıtlıysa
+    tekrar eklenmez.
+    """
+    if product_id is not None and products_col.count_documents({"id": product_id}, limit=1):
+        logger.info("Ürün zaten kayıtlı, atlanıyor. ID: %d", product_id)
+        return product_id
+
     extra_specs = form.pop("extra_specs", None)
     if extra_specs and isinstance(extra_specs, dict):
         extra_specs = {k: v for k, v in extra_specs.items() if v is not None}
@@ -258,13 +570,15 @@ def _save_product_to_db(
         extra_specs = None
 
     now = datetime.utcnow()
-    product_id = get_next_id("products")
+    if product_id is None:
+        product_id = get_next_id("products")
 
     doc = {
         "id": product_id,
         "name": form.get("name", "AI Analizi - İsimsiz Ürün"),
-        "category_id": form.get("category_id"),
-        "product_type": form.get("product_type"),
+        # AI formu kategoriyi adıyla, çeşidi product_type_value ile verir
+        "category_id": form.get("category_id") or get_registry().category_id(form.get("category_name")),
+        "product_type": form.get("product_type") or form.get("product_type_value"),
         "purchase_price": form.get("purchase_price", 0.0),
         "sale_price": form.get("sale_price", 0.0),
         "negotiation_margin": form.get("negotiation_margin", 0.0),
@@ -280,6 +594,7 @@ def _save_product_to_db(
     }
 
     products_col.insert_one(doc)
+    cache.invalidate("products")
     logger.info("Ürün kaydedildi. ID: %d, Ad: %s", product_id, doc["name"])
     return product_id
 
@@ -290,40 +605,30 @@ async def transcribe_audio(
 ):
     """Ses dosyasını Groq Whisper ile yazıya çevirir.
 
+    Uzun kayıtlar sessizlik noktalarından bölünüp paralel çevrilir;
+    aynı ses içeriği için önbellekteki metin döner.
+
     Returns:
-        {"text": "Çevrilen metin"}
+        {"text": "Çevrilen metin", "chunks": 1, "cached": false}
     """
     try:
-        from groq import Groq
-        from agent.config import GROQ_API_KEY
+        from agent.config import GROQ_API_KEY, TRANSCRIBE_MAX_UPLOAD_MB
+        from agent.transcription import transcribe
 
         if not GROQ_API_KEY:
             raise HTTPException(status_code=500, detail="GROQ_API_KEY ayarlanmamış")
 
-        # Ses dosyasını geçici kaydet
-        temp_path = os.path.join(AGENT_UPLOAD_DIR, f"audio_{uuid.uuid4().hex[:8]}")
-        ext = os.path.splitext(audio.filename or "audio.webm")[1] or ".webm"
-        temp_path += ext
-
-        with open(temp_path, "wb") as f:
-            shutil.copyfileobj(audio.file, f)
+        data = await read_upload(audio, max_bytes=TRANSCRIBE_MAX_UPLOAD_MB * 1024 * 1024)
+        if not data:
+            raise HTTPException(status_code=400, detail="Ses dosyası boş")
 
-        try:
-            client = Groq(api_key=GROQ_API_KEY)
-            with open(temp_path, "rb") as audio_file:
-                transcription = client.audio.transcriptions.create(
-                    file=(os.path.basename(temp_path), audio_file),
-                    model="whisper-large-v3-turbo",
-                    language="tr",
-                    response_format="text",
-                )
-
-            text = transcription.strip() if isinstance(transcription, str) else str(transcription).strip()
-            logger.info("Transcription başarılı: %d karakter", len(text))
-            return {"text": text}
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        ext = os.path.splitext(audio.filename or "audio.webm")[1] or ".webm"
+        result = await transcribe(data, filename=f"audio{ext}")
+        logger.info(
+            "Transcription başarılı: %d karakter, %d parça%s",
+            len(result["text"]), result["chunks"], " (önbellek)" if result["cached"] else "",
+        )
+        return result
 
     except HTTPException:
         raise
@@ -332,61 +637,12 @@ async def transcribe_audio(
         raise HTTPException(status_code=500, detail=f"Ses çevirme hatası: {str(e)}")
 
 
-CATEGORY_ASSIST_PROMPT = """Sen endüstriyel mutfak ekipmanları kategori yönetim asistanısın. Kullanıcının doğal dilde yazdığı talimatları anlayıp kategori verisini güncelleyeceksin.
-
-## MEVCUT KATEGORİ VERİSİ
-{current_data}
-
-## KULLANICI TALİMATI
-{user_message}
-
-## KURALLAR
-1. Kullanıcının talebini analiz et ve mevcut kategori verisini buna göre güncelle.
-2. Ürün çeşidi (product_types) eklerken value alanı snake_case olmalı (Türkçe karakterler dönüştürülmeli: ş→s, ç→c, ğ→g, ü→u, ö→o, ı→i).
-3. Teknik alan (fields) eklerken name alanı snake_case olmalı.
-4. Teknik alan tipi "text", "number" veya "select" olabilir.
-5. Select tipindeki alanlar için options listesi sağla.
-6. Birim (unit) varsa ekle: cm, mm, kg, L, HP vb.
-7. Mevcut verileri koruyarak sadece talep edilen değişiklikleri yap.
-8. Eğer kullanıcı sadece ürün çeşidi ekliyorsa, diğer alanları olduğu gibi bırak.
-9. Eğer kullanıcı sadece teknik alan ekliyorsa, diğer alanları olduğu gibi bırak.
-10. "message" alanında yaptığın değişiklikleri kısa özetle (Türkçe).
-
-## ÇIKTI (SADECE JSON, başka bir şey yazma)
-{{
-    "name": "Kategori adı",
-    "description": "Kategori açıklaması",
-    "product_types": [
-        {{
-            "value": "snake_case_deger",
-            "label": "Görünen Ad",
-            "fields": [
-                {{
-                    "name": "alan_adi",
-                    "label": "Alan Başlığı",
-                    "type": "number|text|select",
-                    "unit": "cm",
-                    "options": ["seçenek1", "seçenek2"]
-                }}
-            ]
-        }}
-    ],
-    "default_fields": [
-        {{
-            "name": "alan_adi",
-            "label": "Alan Başlığı",
-            "type": "number|text|select",
-            "unit": "birim",
-            "options": []
-        }}
-    ],
-    "message": "Yapılan değişikliklerin kısa özeti"
-}}"""
-
-
 class CategoryAssistRequest(_PydanticBaseModel):
     message: str
     current_category: Optional[dict] = None
+    # full: model kategorinin tamamını yeniden üretir (varsayılan, mevcut yanıt biçimi)
+    # patch: model sadece değişiklik işlemlerini döner (az çıktı token'ı)
+    mode: Literal["patch", "full"] = "full"
 
 
 @router.post("/category-assist")
@@ -395,7 +651,16 @@ async def category_assist(body: CategoryAssistRequest):
 
     Kullanıcı doğal dilde ne istediğini yazar,
     AI mevcut kategori verisini buna göre günceller.
+    Patch modunda yanıt işlenemezse tam üretime düşülür.
     """
+    from agent.category_assist import (
+        CATEGORY_ASSIST_PROMPT,
+        CATEGORY_PATCH_PROMPT,
+        CATEGORY_SCHEMA,
+        OPERATIONS_SCHEMA,
+        apply_operations,
+    )
+
     try:
         current_data = body.current_category or {
             "name": "",
@@ -404,44 +669,29 @@ async def category_assist(body: CategoryAssistRequest):
             "default_fields": [],
         }
 
-        current_data_str = json.dumps(current_data, ensure_ascii=False, indent=2)
+        if body.mode == "patch":
+            prompt = CATEGORY_PATCH_PROMPT.format(
+                current_data=json.dumps(current_data, ensure_ascii=False, separators=(",", ":")),
+                user_message=body.message,
+            )
+            result_data = await _ainvoke_category_llm(prompt, schema=OPERATIONS_SCHEMA)
+            operations = result_data.get("operations") if result_data else None
+            if isinstance(operations, list):
+                category_data, skipped = apply_operations(current_data, operations)
+                return JSONResponse(content={
+                    "status": "success",
+                    "message": result_data.get("message") or "Kategori güncellendi.",
+                    "category_data": category_data,
+                    "operations": operations,
+                    "skipped_operations": skipped,
+                })
+            logger.warning("Category assist patch yanıtı işlenemedi, tam üretime geçiliyor")
 
         prompt = CATEGORY_ASSIST_PROMPT.format(
-            current_data=current_data_str,
+            current_data=json.dumps(current_data, ensure_ascii=False, indent=2),
             user_message=body.message,
         )
-
-        from agent.config import (
-            GOOGLE_MODEL,
-            GOOGLE_MODEL_FALLBACK,
-            configure_langsmith,
-            get_google_llm,
-        )
-        from agent.retry import invoke_with_retry, is_rate_limit_error
-        from langchain_core.messages import HumanMessage
-
-        configure_langsmith()
-
-        models_to_try = [GOOGLE_MODEL, GOOGLE_MODEL_FALLBACK]
-        result_data = None
-
-        for model_name in models_to_try:
-            try:
-                llm = get_google_llm(model=model_name)
-                response = invoke_with_retry(
-                    llm.invoke,
-                    [HumanMessage(content=prompt)],
-                )
-                raw_text = response.content
-
-                parsed = _extract_json_from_text(raw_text)
-                if parsed:
-                    result_data = parsed
-                    break
-            except Exception as e:
-                if is_rate_limit_error(e):
-                    continue
-                raise
+        result_data = await _ainvoke_category_llm(prompt, schema=CATEGORY_SCHEMA)
 
         if not result_data:
             return JSONResponse(content={
@@ -484,50 +734,86 @@ async def category_assist(body: CategoryAssistRequest):
         )
 
 
-def _extract_json_from_text(text: str) -> Optional[dict]:
-    """Extract JSON from AI response text."""
-    if not text:
-        return None
+async def _ainvoke_category_llm(prompt: str, schema: dict) -> Optional[dict]:
+    """Kategori asistanı prompt'unu model zincirinde şemaya bağlı çalıştır; ilk geçerli JSON nesnesini döndür."""
+    from agent.config import (
+        GOOGLE_MODEL,
+        GOOGLE_MODEL_FALLBACK,
+        bind_google_json,
+        configure_langsmith,
+        get_google_llm,
+    )
+    from agent.rate_limiter import aacquire, mark_rate_limited
+    from agent.retry import ainvoke_with_retry, is_rate_limit_error, retry_delay_seconds
+    from langchain_core.messages import HumanMessage
 
-    try:
-        if "```json" in text:
-            json_str = text.split("```json")[1].split("```")[0].strip()
-            return json.loads(json_str)
-        elif "```" in text:
-            for block in text.split("```")[1::2]:
-                block = block.strip()
-                if block.startswith("json"):
-                    block = block[4:].strip()
-                try:
-                    return json.loads(block)
-                except json.JSONDecodeError:
-                    continue
-    except (json.JSONDecodeError, IndexError):
-        pass
+    configure_langsmith()
 
-    try:
-        return json.loads(text.strip())
-    except json.JSONDecodeError:
-        pass
+    for hop, model_name in enumerate([GOOGLE_MODEL, GOOGLE_MODEL_FALLBACK]):
+        if not await aacquire(model_name):
+            continue
+        try:
+            llm = bind_google_json(get_google_llm(model=model_name), schema)
+            response = await ainvoke_with_retry(
+                llm.ainvoke,
+                [HumanMessage(content=prompt)],
+                ledger_site="category_assist",
+                ledger_model=model_name,
+                ledger_hop=hop,
+            )
+            try:
+                parsed = json.loads(response.content)
+            except (TypeError, json.JSONDecodeError):
+                parsed = None
+            if isinstance(parsed, dict) and parsed:
+                return parsed
+        except Exception as e:
+            if is_rate_limit_error(e):
+                mark_rate_limited(model_name, retry_delay_seconds(e))
+                continue
+            raise
+    return None
+
+
+@router.get("/metrics")
+def agent_metrics(hours: float = 24):
+    """LLM çağrı metrikleri: gecikme p50/p95/p99, token, retry/fallback oranı ve günlük kota."""
+    from agent import call_ledger
+
+    if hours <= 0:
+        raise HTTPException(status_code=400, detail="hours pozitif olmalı")
 
     try:
-        start = text.index("{")
-        end = text.rindex("}") + 1
-        return json.loads(text[start:end])
-    except (ValueError, json.JSONDecodeError):
-        return None
+        from agent.rate_limiter import usage_today
+        quota = usage_today()
+    except Exception as e:
+        logger.warning("Kota kullanımı okunamadı: %s", e)
+        quota = None
+
+    return {**call_ledger.metrics(hours), "quota": quota}
 
 
 @router.get("/status")
 def agent_status():
     """Agent durumu ve konfigürasyon kontrolü."""
-    from agent.config import validate_config, GOOGLE_MODEL, LANGSMITH_PROJECT
+    from agent import hedging, model_router
+    from agent.config import validate_config, GOOGLE_MODEL, HEDGE_ENABLED, LANGSMITH_PROJECT, ROUTER_ENABLED
 
     issues = validate_config()
 
+    try:
+        from agent.rate_limiter import usage_today
+        quota = usage_today()
+    except Exception as e:
+        logger.warning("Kota kullanımı okunamadı: %s", e)
+        quota = None
+
     return {
         "status": "ready" if not issues else "configuration_needed",
         "model": GOOGLE_MODEL,
         "langsmith_project": LANGSMITH_PROJECT,
         "configuration_issues": issues,
+        "quota": quota,
+        "hedging": {"enabled": HEDGE_ENABLED, **hedging.stats()},
+        "routing": {"enabled": ROUTER_ENABLED, **model_router.stats()},
     }
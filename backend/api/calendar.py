@@ -1,20 +1,22 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from datetime import datetime, date
+from typing import Optional
 
 from database import (
     transactions_col, expenses_col, reminders_col,
     notes_col, products_col, categories_col, suppliers_col, doc_to_dict,
 )
+from pagination import paginated_find
+from shop_time import local_day_range_utc, local_day_start_utc
 
 router = APIRouter()
 
 
 @router.get("/daily/{day}")
 def get_daily_summary(day: date):
-    start_dt = datetime.combine(day, datetime.min.time())
-    end_dt = datetime.combine(day, datetime.max.time())
-    date_q = {"date": {"$gte": start_dt, "$lte": end_dt}}
-    created_q = {"created_at": {"$gte": start_dt, "$lte": end_dt}}
+    start_dt, end_dt = local_day_range_utc(day, day)
+    date_q = {"date": {"$gte": start_dt, "$lt": end_dt}}
+    created_q = {"created_at": {"$gte": start_dt, "$lt": end_dt}}
 
     _txn_proj = {"_id": 0, "id": 1, "product_id": 1, "transaction_type": 1, "amount": 1, "date": 1, "description": 1}
     sold = list(transactions_col.find({**date_q, "transaction_type": "sale"}, _txn_proj))
@@ -33,7 +35,7 @@ def get_daily_summary(day: date):
         return d.isoformat() if isinstance(d, datetime) else str(d) if d else None
 
     return {
-        "date": start_dt.isoformat(),
+        "date": datetime.combine(day, datetime.min.time()).isoformat(),
         "sold_products": [
             {"id": t["id"], "product_id": t.get("product_id"), "transaction_type": t["transaction_type"],
              "amount": float(t["amount"]), "date": fmt_dt(t.get("date")), "description": t.get("description")}
@@ -72,22 +74,31 @@ def get_daily_summary(day: date):
 
 
 @router.get("/upcoming-notes")
-def get_upcoming_notes():
-    now = datetime.now()
-    docs = notes_col.find({"date": {"$gt": now}}).sort("date", 1)
-    return [
-        {"id": n["id"], "title": n.get("title"), "content": n.get("content"),
-         "date": n["date"].isoformat() if isinstance(n.get("date"), datetime) else str(n.get("date"))}
-        for n in docs
-    ]
+def get_upcoming_notes(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+):
+    return paginated_find(
+        notes_col,
+        {"date": {"$gt": datetime.now()}},
+        {"_id": 0, "id": 1, "title": 1, "content": 1, "date": 1},
+        response,
+        sort_field="date",
+        direction=1,
+        limit=limit,
+        cursor=cursor,
+        stream=stream,
+    )
 
 
 @router.get("/monthly/{year}/{month}")
 def get_monthly_summary(year: int, month: int):
     start_date = date(year, month, 1)
     end_date = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
-    start_dt = datetime.combine(start_date, datetime.min.time())
-    end_dt = datetime.combine(end_date, datetime.min.time())
+    start_dt = local_day_start_utc(start_date)
+    end_dt = local_day_start_utc(end_date)
     date_q = {"date": {"$gte": start_dt, "$lt": end_dt}}
 
     transactions = list(transactions_col.find(date_q).sort("date", -1))
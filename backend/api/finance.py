@@ -1,12 +1,49 @@
 from fastapi import APIRouter, HTTPException
 from typing import Optional
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 
 from database import transactions_col, expenses_col, products_col, get_next_id, doc_to_dict
 from models import TransactionCreate, ExpenseCreate
+import cache
+from exporters import export_response
+from shop_time import local_day_start_utc
+
+# product-profit sonuçları bu koleksiyonlara yazıldığında geçersizleşir
+PROFIT_CACHE_TAGS = ("transactions", "expenses", "products", "categories")
 
 router = APIRouter()
 
+TRANSACTION_EXPORT_COLUMNS = ["id", "date", "transaction_type", "product_id", "amount", "description", "created_at"]
+EXPENSE_EXPORT_COLUMNS = ["id", "date", "expense_type", "product_id", "amount", "description", "created_at"]
+
+
+def _date_range_query(start_date: Optional[date], end_date: Optional[date]) -> dict:
+    """Tarih filtresi — gün sınırları dükkan saat dilimine göre."""
+    query: dict = {}
+    if start_date:
+        query.setdefault("date", {})["$gte"] = local_day_start_utc(start_date)
+    if end_date:
+        query.setdefault("date", {})["$lt"] = local_day_start_utc(end_date + timedelta(days=1))
+    return query
+
+
+def _transactions_query(
+    start_date: Optional[date], end_date: Optional[date], transaction_type: Optional[str]
+) -> dict:
+    query = _date_range_query(start_date, end_date)
+    if transaction_type:
+        query["transaction_type"] = transaction_type
+    return query
+
+
+def _expenses_query(
+    start_date: Optional[date], end_date: Optional[date], expense_type: Optional[str]
+) -> dict:
+    query = _date_range_query(start_date, end_date)
+    if expense_type:
+        query["expense_type"] = expense_type
+    return query
+
 
 @router.get("/transactions")
 def get_transactions(
@@ -16,18 +53,25 @@ def get_transactions(
     skip: int = 0,
     limit: int = 100,
 ):
-    query = {}
-    if start_date:
-        query.setdefault("date", {})["$gte"] = datetime.combine(start_date, datetime.min.time())
-    if end_date:
-        query.setdefault("date", {})["$lte"] = datetime.combine(end_date, datetime.max.time())
-    if transaction_type:
-        query["transaction_type"] = transaction_type
-
+    query = _transactions_query(start_date, end_date, transaction_type)
     docs = transactions_col.find(query).sort("date", -1).skip(skip).limit(limit)
     return [doc_to_dict(d) for d in docs]
 
 
+@router.get("/transactions/export")
+def export_transactions(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    transaction_type: Optional[str] = None,
+    format: str = "csv",
+):
+    """Tüm işlemleri (filtreli) CSV/XLSX olarak akıtır — sayfalama yok."""
+    query = _transactions_query(start_date, end_date, transaction_type)
+    projection = {"_id": 0, **{c: 1 for c in TRANSACTION_EXPORT_COLUMNS}}
+    cursor = transactions_col.find(query, projection).sort("date", -1)
+    return export_response(cursor, TRANSACTION_EXPORT_COLUMNS, "transactions", format)
+
+
 @router.post("/transactions")
 def create_transaction(transaction: TransactionCreate):
     if transaction.product_id:
@@ -44,6 +88,7 @@ def create_transaction(transaction: TransactionCreate):
         "created_at": now,
     }
     transactions_col.insert_one(doc)
+    cache.invalidate("transactions", "products")
     return doc_to_dict(doc)
 
 
@@ -53,6 +98,7 @@ def delete_transaction(transaction_id: int):
     if not doc:
         raise HTTPException(status_code=404, detail="Transaction not found")
     transactions_col.delete_one({"id": transaction_id})
+    cache.invalidate("transactions")
     return {"message": "Transaction deleted successfully"}
 
 
@@ -64,18 +110,25 @@ def get_expenses(
     skip: int = 0,
     limit: int = 100,
 ):
-    query = {}
-    if start_date:
-        query.setdefault("date", {})["$gte"] = datetime.combine(start_date, datetime.min.time())
-    if end_date:
-        query.setdefault("date", {})["$lte"] = datetime.combine(end_date, datetime.max.time())
-    if expense_type:
-        query["expense_type"] = expense_type
-
+    query = _expenses_query(start_date, end_date, expense_type)
     docs = expenses_col.find(query).sort("date", -1).skip(skip).limit(limit)
     return [doc_to_dict(d) for d in docs]
 
 
+@router.get("/expenses/export")
+def export_expenses(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    expense_type: Optional[str] = None,
+    format: str = "csv",
+):
+    """Tüm giderleri (filtreli) CSV/XLSX olarak akıtır — sayfalama yok."""
+    query = _expenses_query(start_date, end_date, expense_type)
+    projection = {"_id": 0, **{c: 1 for c in EXPENSE_EXPORT_COLUMNS}}
+    cursor = expenses_col.find(query, projection).sort("date", -1)
+    return export_response(cursor, EXPENSE_EXPORT_COLUMNS, "expenses", format)
+
+
 @router.post("/expenses")
 def create_expense(expense: ExpenseCreate):
     if expense.product_id:
@@ -90,6 +143,7 @@ def create_expense(expense: ExpenseCreate):
         "created_at": now,
     }
     expenses_col.insert_one(doc)
+    cache.invalidate("expenses")
     return doc_to_dict(doc)
 
 
@@ -99,6 +153,7 @@ def delete_expense(expense_id: int):
     if not doc:
         raise HTTPException(status_code=404, detail="Expense not found")
     expenses_col.delete_one({"id": expense_id})
+    cache.invalidate("expenses")
     return {"message": "Expense deleted successfully"}
 
 
@@ -108,17 +163,8 @@ def get_financial_summary(
     end_date: Optional[date] = None,
 ):
     """Finansal özet: gelir, gider, kar."""
-    revenue_query = {"transaction_type": "sale"}
-    expense_query = {}
-
-    if start_date:
-        start_dt = datetime.combine(start_date, datetime.min.time())
-        revenue_query.setdefault("date", {})["$gte"] = start_dt
-        expense_query.setdefault("date", {})["$gte"] = start_dt
-    if end_date:
-        end_dt = datetime.combine(end_date, datetime.max.time())
-        revenue_query.setdefault("date", {})["$lte"] = end_dt
-        expense_query.setdefault("date", {})["$lte"] = end_dt
+    revenue_query = _transactions_query(start_date, end_date, "sale")
+    expense_query = _date_range_query(start_date, end_date)
 
     pipeline_rev = [{"$match": revenue_query}, {"$group": {"_id": None, "total": {"$sum": "$amount"}}}]
     pipeline_exp = [{"$match": expense_query}, {"$group": {"_id": None, "total": {"$sum": "$amount"}}}]
@@ -136,3 +182,164 @@ def get_financial_summary(
         "start_date": start_date,
         "end_date": end_date,
     }
+
+
+def _product_profit_pipeline(
+    category_id: Optional[int],
+    stock_status: Optional[str],
+    group_by: str,
+    skip: int,
+    limit: int,
+) -> list[dict]:
+    """Ürün başına gelir/maliyet/gider/kâr pipeline'ı.
+
+    $lookup'lar localField + pipeline birlikte kullanır; böylece
+    transactions.product_id ve expenses.product_id index'leri kullanılır
+    ve ürün başına sadece tek bir toplam satırı döner.
+    """
+    match: dict = {}
+    if category_id:
+        match["category_id"] = category_id
+    if stock_status:
+        match["stock_status"] = stock_status
+
+    pipeline: list[dict] = [{"$match": match}]
+    if group_by == "product":
+        # Sayfalamayı join'lerden önce yap — sadece sayfadaki ürünler join'lenir
+        pipeline += [
+            {"$sort": {"created_at": -1}},
+            {"$skip": skip},
+            {"$limit": limit},
+        ]
+
+    pipeline += [
+        {"$lookup": {
+            "from": "transactions",
+            "localField": "id",
+            "foreignField": "product_id",
+            "pipeline": [
+                {"$match": {"transaction_type": "sale"}},
+                {"$group": {
+                    "_id": None,
+                    "total": {"$sum": "$amount"},
+                    "count": {"$sum": 1},
+                    "last_date": {"$max": "$date"},
+                }},
+            ],
+            "as": "sales",
+        }},
+        {"$lookup": {
+            "from": "expenses",
+            "localField": "id",
+            "foreignField": "product_id",
+            "pipeline": [
+                {"$group": {
+                    "_id": {"$eq": ["$expense_type", "mal_alimi"]},
+                    "total": {"$sum": "$amount"},
+                }},
+            ],
+            "as": "expense_groups",
+        }},
+        {"$lookup": {
+            "from": "categories",
+            "localField": "category_id",
+            "foreignField": "id",
+            "pipeline": [{"$project": {"_id": 0, "name": 1}}],
+            "as": "cat_info",
+        }},
+        {"$project": {
+            "_id": 0,
+            "id": 1,
+            "name": 1,
+            "category_id": 1,
+            "product_type": 1,
+            "stock_status": 1,
+            "created_at": 1,
+            "category_name": {"$ifNull": [{"$arrayElemAt": ["$cat_info.name", 0]}, "Kategorisiz"]},
+            "revenue": {"$ifNull": [{"$arrayElemAt": ["$sales.total", 0]}, 0]},
+            "sale_count": {"$ifNull": [{"$arrayElemAt": ["$sales.count", 0]}, 0]},
+            "sold_at": {"$arrayElemAt": ["$sales.last_date", 0]},
+            # mal_alimi gider kaydı yoksa (eski ürünler) purchase_price kullan
+            "cost": {"$ifNull": [
+                {"$arrayElemAt": [{"$map": {
+                    "input": {"$filter": {"input": "$expense_groups", "cond": {"$eq": ["$$this._id", True]}}},
+                    "in": "$$this.total",
+                }}, 0]},
+                {"$ifNull": ["$purchase_price", 0]},
+            ]},
+            "extra_expenses": {"$ifNull": [
+                {"$arrayElemAt": [{"$map": {
+                    "input": {"$filter": {"input": "$expense_groups", "cond": {"$eq": ["$$this._id", False]}}},
+                    "in": "$$this.total",
+                }}, 0]},
+                0,
+            ]},
+        }},
+        {"$addFields": {
+            "margin": {"$subtract": ["$revenue", {"$add": ["$cost", "$extra_expenses"]}]},
+            "days_in_stock": {"$dateDiff": {
+                "startDate": "$created_at",
+                "endDate": {"$ifNull": ["$sold_at", "$$NOW"]},
+                "unit": "day",
+            }},
+        }},
+    ]
+
+    if group_by == "category":
+        pipeline += [
+            {"$group": {
+                "_id": "$category_id",
+                "category_name": {"$first": "$category_name"},
+                "product_count": {"$sum": 1},
+                "sold_count": {"$sum": {"$cond": [{"$gt": ["$sale_count", 0]}, 1, 0]}},
+                "revenue": {"$sum": "$revenue"},
+                "cost": {"$sum": "$cost"},
+                "extra_expenses": {"$sum": "$extra_expenses"},
+                "margin": {"$sum": "$margin"},
+                "avg_days_in_stock": {"$avg": "$days_in_stock"},
+            }},
+            {"$project": {
+                "_id": 0,
+                "category_id": "$_id",
+                "category_name": 1,
+                "product_count": 1,
+                "sold_count": 1,
+                "revenue": 1,
+                "cost": 1,
+                "extra_expenses": 1,
+                "margin": 1,
+                "avg_days_in_stock": {"$round": ["$avg_days_in_stock", 1]},
+            }},
+            {"$sort": {"margin": -1}},
+            {"$skip": skip},
+            {"$limit": limit},
+        ]
+
+    return pipeline
+
+
+@router.get("/product-profit")
+def get_product_profit(
+    category_id: Optional[int] = None,
+    stock_status: Optional[str] = None,
+    group_by: str = "product",
+    skip: int = 0,
+    limit: int = 100,
+):
+    """Ürün (veya kategori) bazında gelir, maliyet, ek gider, kâr ve stokta kalma süresi.
+
+    group_by: "product" (varsayılan) | "category"
+    """
+    if group_by not in ("product", "category"):
+        raise HTTPException(status_code=400, detail="group_by 'product' veya 'category' olmalıdır")
+    limit = max(1, min(limit, 500))
+
+    def _load() -> list[dict]:
+        pipeline = _product_profit_pipeline(category_id, stock_status, group_by, skip, limit)
+        return list(products_col.aggregate(pipeline))
+
+    return cache.get_or_set(
+        ("product-profit", category_id, stock_status, group_by, skip, limit),
+        _load,
+        tags=PROFIT_CACHE_TAGS,
+    )
@@ -1,10 +1,28 @@
-from fastapi import APIRouter
-from typing import Optional
+import logging
+
+from fastapi import APIRouter, Response
+from typing import Any, Optional
 from datetime import datetime, date, timedelta
+from pymongo.errors import OperationFailure
 
 from database import products_col, categories_col, doc_to_dict
+from pagination import paginated_find
+from shop_time import SHOP_TIMEZONE
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+DAILY_LOG_PER_DAY = 50
+
+# Stok yaşı histogramı sınırları (gün) — son kova "365+"
+AGING_BOUNDARIES = [0, 7, 30, 60, 90, 180, 365]
+
+# Liste görünümleri için — extra_specs/notes gibi ağır alanlar hariç
+PRODUCT_LIST_PROJECTION = {
+    "_id": 0, "id": 1, "name": 1, "category_id": 1, "product_type": 1,
+    "purchase_price": 1, "sale_price": 1, "material": 1, "status": 1,
+    "stock_status": 1, "images": 1, "created_at": 1, "updated_at": 1,
+}
 
 
 @router.get("/summary")
@@ -137,45 +155,98 @@ def get_empty_categories():
     return result
 
 
-@router.get("/daily-log")
-def get_daily_log(days: int = 30):
-    """$lookup ile kategori adlarını tek sorguda çöz."""
-    start = datetime.utcnow() - timedelta(days=days)
-    pipeline = [
+_DAILY_LOG_PRODUCT = {
+    "id": "$id",
+    "name": "$name",
+    "category_id": "$category_id",
+    "purchase_price": "$purchase_price",
+    "sale_price": "$sale_price",
+    "stock_status": "$stock_status",
+}
+
+
+def _daily_log_pipeline(start: datetime, per_day: int, top_n: bool = True) -> list[dict]:
+    """Günlük log aggregation'ı.
+
+    top_n: $topN (MongoDB 5.2+) grup başına yalnız per_day ürünü bellekte
+    tutar; eski sunucularda sıralı $push + $slice kullanılır (günün tüm
+    ürünleri grupta birikir).
+    """
+    if top_n:
+        head = []
+        products = {"$topN": {"n": per_day, "sortBy": {"created_at": -1}, "output": _DAILY_LOG_PRODUCT}}
+        sliced: Any = 1
+    else:
+        head = [{"$sort": {"created_at": -1}}]
+        products = {"$push": _DAILY_LOG_PRODUCT}
+        sliced = {"$slice": ["$products", per_day]}
+    return [
         {"$match": {"created_at": {"$gte": start}}},
+        *head,
+        {"$group": {
+            "_id": {"$dateToString": {
+                "format": "%Y-%m-%d",
+                "date": "$created_at",
+                "timezone": SHOP_TIMEZONE,
+            }},
+            "count": {"$sum": 1},
+            "products": products,
+        }},
+        {"$sort": {"_id": -1}},
+        {"$project": {
+            "_id": 0,
+            "date": "$_id",
+            "count": 1,
+            "products": sliced,
+        }},
         {"$lookup": {
             "from": "categories",
-            "localField": "category_id",
+            "localField": "products.category_id",
             "foreignField": "id",
-            "as": "cat_info",
+            "pipeline": [{"$project": {"_id": 0, "id": 1, "name": 1}}],
+            "as": "cats",
         }},
         {"$project": {
-            "name": 1, "id": 1, "category_id": 1,
-            "purchase_price": 1, "sale_price": 1,
-            "stock_status": 1, "created_at": 1,
-            "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
-            "category_name": {"$arrayElemAt": ["$cat_info.name", 0]},
+            "date": 1,
+            "count": 1,
+            "products": {"$map": {
+                "input": "$products",
+                "as": "p",
+                "in": {
+                    "id": "$$p.id",
+                    "name": "$$p.name",
+                    "category": {"$arrayElemAt": [
+                        {"$map": {
+                            "input": {"$filter": {"input": "$cats", "cond": {"$eq": ["$$this.id", "$$p.category_id"]}}},
+                            "in": "$$this.name",
+                        }},
+                        0,
+                    ]},
+                    "purchase_price": "$$p.purchase_price",
+                    "sale_price": "$$p.sale_price",
+                    "stock_status": "$$p.stock_status",
+                },
+            }},
         }},
-        {"$sort": {"created_at": -1}},
     ]
-    products = list(products_col.aggregate(pipeline))
-
-    days_map: dict = {}
-    for p in products:
-        day = p.get("day", "unknown")
-        if day not in days_map:
-            days_map[day] = {"date": day, "count": 0, "products": []}
-        days_map[day]["count"] += 1
-        days_map[day]["products"].append({
-            "id": p["id"],
-            "name": p["name"],
-            "category": p.get("category_name"),
-            "purchase_price": p.get("purchase_price"),
-            "sale_price": p.get("sale_price"),
-            "stock_status": p.get("stock_status"),
-        })
 
-    return sorted(days_map.values(), key=lambda x: x["date"], reverse=True)
+
+@router.get("/daily-log")
+def get_daily_log(days: int = 30, per_day: int = DAILY_LOG_PER_DAY):
+    """Son N günde eklenen ürünler, dükkan saat dilimine göre günlere gruplu.
+
+    Gruplama Mongo'da yapılır; her gün için en yeni per_day ürün döner
+    (count o günün toplamıdır). Kategori adları gruplamadan sonra,
+    gün başına tek $lookup ile çözülür. $topN desteklenmiyorsa
+    (MongoDB < 5.2) $push + $slice ile aynı sonuç üretilir.
+    """
+    start = datetime.utcnow() - timedelta(days=days)
+    per_day = max(1, min(per_day, 500))
+    try:
+        return list(products_col.aggregate(_daily_log_pipeline(start, per_day)))
+    except OperationFailure as e:
+        logger.info("$topN desteklenmiyor, $push + $slice kullanılacak: %s", e)
+        return list(products_col.aggregate(_daily_log_pipeline(start, per_day, top_n=False)))
 
 
 @router.get("/sold-products")
@@ -212,21 +283,41 @@ def get_sold_products(skip: int = 0, limit: int = 100):
 
 
 @router.get("/missing")
-def get_missing_products():
-    docs = products_col.find(
+def get_missing_products(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+):
+    """Satılmış/rezerve ürünler — id'ye göre yeniden eskiye, keyset sayfalı."""
+    return paginated_find(
+        products_col,
         {"stock_status": {"$in": ["sold", "reserved"]}},
-        {"_id": 0},
+        PRODUCT_LIST_PROJECTION,
+        response,
+        limit=limit,
+        cursor=cursor,
+        stream=stream,
     )
-    return list(docs)
 
 
 @router.get("/needed")
-def get_needed_products():
-    docs = products_col.find(
+def get_needed_products(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+):
+    """Bozuk/tamirde olan stoktaki ürünler — keyset sayfalı."""
+    return paginated_find(
+        products_col,
         {"status": {"$in": ["broken", "repair"]}, "stock_status": "available"},
-        {"_id": 0},
+        PRODUCT_LIST_PROJECTION,
+        response,
+        limit=limit,
+        cursor=cursor,
+        stream=stream,
     )
-    return list(docs)
 
 
 @router.get("/by-stock-status")
@@ -236,3 +327,107 @@ def get_inventory_by_stock_status():
     ]
     results = list(products_col.aggregate(pipeline))
     return [{"stock_status": r["_id"], "count": r["count"]} for r in results]
+
+
+@router.get("/aging")
+def get_stock_aging(category_id: Optional[int] = None):
+    """Stoktaki ürünlerin eklenme tarihinden bu yana geçen güne göre histogramı."""
+    match: dict = {"stock_status": "available", "created_at": {"$type": "date"}}
+    if category_id:
+        match["category_id"] = category_id
+
+    pipeline = [
+        {"$match": match},
+        {"$project": {
+            "_id": 0,
+            "purchase_price": 1,
+            "sale_price": 1,
+            "age_days": {"$dateDiff": {"startDate": "$created_at", "endDate": "$$NOW", "unit": "day"}},
+        }},
+        {"$bucket": {
+            "groupBy": "$age_days",
+            "boundaries": AGING_BOUNDARIES,
+            "default": "365+",
+            "output": {
+                "count": {"$sum": 1},
+                "purchase_value": {"$sum": {"$ifNull": ["$purchase_price", 0]}},
+                "sale_value": {"$sum": {"$ifNull": ["$sale_price", 0]}},
+                "oldest_days": {"$max": "$age_days"},
+            },
+        }},
+    ]
+    buckets = {r["_id"]: r for r in products_col.aggregate(pipeline)}
+
+    labels = [
+        (lo, f"{lo}-{hi - 1}")
+        for lo, hi in zip(AGING_BOUNDARIES, AGING_BOUNDARIES[1:])
+    ] + [("365+", "365+")]
+
+    result = []
+    for key, label in labels:
+        b = buckets.get(key, {})
+        result.append({
+            "range": label,
+            "count": b.get("count", 0),
+            "purchase_value": round(b.get("purchase_value", 0), 2),
+            "sale_value": round(b.get("sale_value", 0), 2),
+            "oldest_days": b.get("oldest_days"),
+        })
+    return result
+
+
+def _price_bucket_stage(buckets: int) -> list[dict]:
+    return [
+        {"$bucketAuto": {
+            "groupBy": "$sale_price",
+            "buckets": buckets,
+            "output": {"count": {"$sum": 1}, "avg": {"$avg": "$sale_price"}},
+        }},
+        {"$project": {
+            "_id": 0,
+            "min": "$_id.min",
+            "max": "$_id.max",
+            "count": 1,
+            "avg": {"$round": ["$avg", 2]},
+        }},
+    ]
+
+
+@router.get("/price-distribution")
+def get_price_distribution(category_id: Optional[int] = None, buckets: int = 8):
+    """Stoktaki ürünlerin satış fiyatı dağılımı, kategori başına $bucketAuto.
+
+    Tüm kategoriler tek aggregation'da ($facet) hesaplanır.
+    """
+    buckets = max(1, min(buckets, 50))
+    base_match = {"stock_status": "available", "sale_price": {"$gt": 0}}
+
+    cat_query = {"id": category_id} if category_id else {"is_active": True}
+    cats = list(categories_col.find(cat_query, {"_id": 0, "id": 1, "name": 1}))
+    if not cats:
+        return []
+
+    facets = {
+        f"c{c['id']}": [{"$match": {"category_id": c["id"]}}, *_price_bucket_stage(buckets)]
+        for c in cats
+    }
+    pipeline = [
+        {"$match": {**base_match, "category_id": {"$in": [c["id"] for c in cats]}}},
+        {"$project": {"_id": 0, "category_id": 1, "sale_price": 1}},
+        {"$facet": facets},
+    ]
+    agg = list(products_col.aggregate(pipeline))
+    facet_result = agg[0] if agg else {}
+
+    result = []
+    for c in cats:
+        histogram = facet_result.get(f"c{c['id']}", [])
+        if not histogram:
+            continue
+        result.append({
+            "category_id": c["id"],
+            "category": c["name"],
+            "count": sum(b["count"] for b in histogram),
+            "buckets": histogram,
+        })
+    return result
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from datetime import datetime
+from typing import Optional
 
 from database import reminders_col, notes_col, get_next_id, doc_to_dict
+from pagination import paginated_find
 from models import (
     ReminderCreate, ReminderUpdate,
     NoteCreate, NoteUpdate,
@@ -14,9 +16,13 @@ router = APIRouter()
 
 @router.get("/reminders")
 def get_reminders(
+    response: Response,
     start_date: datetime = None,
     end_date: datetime = None,
     is_completed: bool = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
 ):
     query = {}
     if start_date:
@@ -26,8 +32,17 @@ def get_reminders(
     if is_completed is not None:
         query["is_completed"] = is_completed
 
-    docs = reminders_col.find(query).sort("date", 1)
-    return [doc_to_dict(d) for d in docs]
+    return paginated_find(
+        reminders_col,
+        query,
+        {"_id": 0, "id": 1, "title": 1, "description": 1, "date": 1, "is_completed": 1},
+        response,
+        sort_field="date",
+        direction=1,
+        limit=limit,
+        cursor=cursor,
+        stream=stream,
+    )
 
 
 @router.post("/reminders")
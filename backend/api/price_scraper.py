@@ -8,10 +8,11 @@ import logging
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
 
 from database import ai_price_results_col, get_next_id, doc_to_dict
+from pagination import paginated_find
 
 logger = logging.getLogger(__name__)
 
@@ -86,14 +87,34 @@ async def search_prices(req: PriceSearchRequest):
 
 
 @router.get("/results")
-def get_all_results(category_id: Optional[int] = None):
-    """Tüm AI fiyat sonuçlarını döndürür."""
+def get_all_results(
+    response: Response,
+    category_id: Optional[int] = None,
+    include_listings: bool = True,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+):
+    """AI fiyat sonuçlarını döndürür (keyset sayfalı).
+
+    include_listings=false ile ilan listeleri (belgenin en ağır kısmı) çıkarılır.
+    """
     query = {}
     if category_id:
         query["category_id"] = category_id
 
-    docs = ai_price_results_col.find(query).sort("updated_at", -1)
-    return [doc_to_dict(d) for d in docs]
+    projection = {"_id": 0} if include_listings else {"_id": 0, "listings": 0}
+    return paginated_find(
+        ai_price_results_col,
+        query,
+        projection,
+        response,
+        sort_field="updated_at",
+        direction=-1,
+        limit=limit,
+        cursor=cursor,
+        stream=stream,
+    )
 
 
 @router.get("/results/{category_id}/{product_type}")
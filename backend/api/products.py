@@ -1,24 +1,31 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File
 from datetime import datetime
+import asyncio
 from typing import Optional
 import os
 import logging
-import cloudinary
-import cloudinary.uploader
 
-from database import products_col, categories_col, transactions_col, expenses_col, get_next_id, doc_to_dict
+from database import products_col, transactions_col, expenses_col, get_next_id, reserve_ids, doc_to_dict
 from models import ProductCreate, ProductUpdate
+import cache
+from exporters import export_response
+import image_hash
+from agent.form_validator import validate_product
+from agent.schema_registry import category_by_id, get_registry
+from sdk_clients import cloudinary_uploader
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Cloudinary config
-cloudinary.config(secure=True)
-
+PRODUCT_EXPORT_COLUMNS = [
+    "id", "name", "category_id", "product_type", "purchase_price", "sale_price",
+    "negotiation_margin", "negotiation_type", "material", "status", "stock_status",
+    "notes", "created_at", "updated_at",
+]
 
 def _upload_to_cloudinary(file: UploadFile, product_id: int) -> str:
     """Dosyayı Cloudinary'ye yükler, URL döndürür."""
-    result = cloudinary.uploader.upload(
+    result = cloudinary_uploader().upload(
         file.file,
         folder=f"ayhanticaret/products/{product_id}",
         resource_type="image",
@@ -36,21 +43,19 @@ def _delete_from_cloudinary(url: str) -> None:
             # version prefix'i kaldır
             if public_id.startswith("v"):
                 public_id = "/".join(public_id.split("/")[1:])
-            cloudinary.uploader.destroy(public_id)
+            cloudinary_uploader().destroy(public_id)
     except Exception as e:
         logger.warning("Cloudinary silme hatası: %s", e)
 
 
 def _build_category_map(category_ids: list) -> dict:
-    """Batch-fetch categories → {id: {id, name}} map."""
-    unique_ids = list({cid for cid in category_ids if cid})
-    if not unique_ids:
-        return {}
-    cats = categories_col.find(
-        {"id": {"$in": unique_ids}},
-        {"_id": 0, "id": 1, "name": 1},
-    )
-    return {c["id"]: {"id": c["id"], "name": c["name"]} for c in cats}
+    """Categories from the schema registry → {id: {id, name}} map."""
+    by_id = get_registry().by_id
+    return {
+        cid: {"id": cid, "name": by_id[cid].name}
+        for cid in set(category_ids)
+        if cid in by_id
+    }
 
 
 def _enrich_product(doc: dict) -> dict:
@@ -58,14 +63,8 @@ def _enrich_product(doc: dict) -> dict:
     if doc is None:
         return None
     doc.pop("_id", None)
-    if doc.get("category_id"):
-        cat = categories_col.find_one(
-            {"id": doc["category_id"]},
-            {"_id": 0, "id": 1, "name": 1},
-        )
-        doc["category"] = {"id": cat["id"], "name": cat["name"]} if cat else None
-    else:
-        doc["category"] = None
+    cat = category_by_id(doc.get("category_id"))
+    doc["category"] = {"id": cat.id, "name": cat.name} if cat else None
     if doc.get("images") is None:
         doc["images"] = []
     return doc
@@ -86,6 +85,15 @@ def _enrich_products_batch(docs: list) -> list:
     return result
 
 
+def _products_query(category_id: int = None, stock_status: str = None) -> dict:
+    query = {}
+    if category_id:
+        query["category_id"] = category_id
+    if stock_status:
+        query["stock_status"] = stock_status
+    return query
+
+
 @router.get("/")
 def get_products(
     category_id: int = None,
@@ -93,16 +101,24 @@ def get_products(
     skip: int = 0,
     limit: int = 100,
 ):
-    query = {}
-    if category_id:
-        query["category_id"] = category_id
-    if stock_status:
-        query["stock_status"] = stock_status
-
+    query = _products_query(category_id, stock_status)
     docs = list(products_col.find(query).sort("created_at", -1).skip(skip).limit(limit))
     return _enrich_products_batch(docs)
 
 
+@router.get("/export")
+def export_products(
+    category_id: int = None,
+    stock_status: str = None,
+    format: str = "csv",
+):
+    """Tüm ürünleri (filtreli) CSV/XLSX olarak akıtır — sayfalama yok."""
+    query = _products_query(category_id, stock_status)
+    projection = {"_id": 0, **{c: 1 for c in PRODUCT_EXPORT_COLUMNS}}
+    cursor = products_col.find(query, projection).sort("created_at", -1)
+    return export_response(cursor, PRODUCT_EXPORT_COLUMNS, "products", format)
+
+
 @router.get("/{product_id}")
 def get_product(product_id: int):
     doc = products_col.find_one({"id": product_id})
@@ -111,18 +127,26 @@ def get_product(product_id: int):
     return _enrich_product(doc)
 
 
+def _validated(data: dict, category_name: Optional[str], product_type: Optional[str], partial: bool = False) -> dict:
+    """Kategori/çeşit alan tanımlarına göre dönüştür; hata varsa 422."""
+    checked = validate_product(data, category_name, product_type, partial=partial)
+    if not checked.ok:
+        raise HTTPException(status_code=422, detail=checked.errors)
+    return checked.data
+
+
 @router.post("/")
 def create_product(product: ProductCreate):
-    if product.category_id:
-        cat = categories_col.find_one({"id": product.category_id})
-        if not cat:
-            raise HTTPException(status_code=404, detail="Category not found")
+    cat = category_by_id(product.category_id)
+    if product.category_id and not cat:
+        raise HTTPException(status_code=404, detail="Category not found")
 
+    data = _validated(product.dict(), cat.name if cat else None, product.product_type)
     now = datetime.utcnow()
     product_id = get_next_id("products")
     doc = {
         "id": product_id,
-        **product.dict(),
+        **data,
         "images": [],
         "created_at": now,
         "updated_at": now,
@@ -130,37 +154,109 @@ def create_product(product: ProductCreate):
     products_col.insert_one(doc)
 
     # Otomatik gider kaydı (mal alımı)
-    if product.purchase_price and product.purchase_price > 0:
-        expense_doc = {
-            "id": get_next_id("expenses"),
-            "product_id": product_id,
-            "expense_type": "mal_alimi",
-            "amount": product.purchase_price,
-            "date": now,
-            "description": f"Ürün alımı: {product.name}",
-            "products_data": [],
-            "created_at": now,
-        }
-        expenses_col.insert_one(expense_doc)
+    if doc["purchase_price"] and doc["purchase_price"] > 0:
+        expenses_col.insert_one(_purchase_expense(doc, now))
 
+    cache.invalidate("products", "expenses")
     return _enrich_product(doc)
 
 
+def _purchase_expense(doc: dict, now: datetime, expense_id: Optional[int] = None) -> dict:
+    return {
+        "id": expense_id if expense_id is not None else get_next_id("expenses"),
+        "product_id": doc["id"],
+        "expense_type": "mal_alimi",
+        "amount": doc["purchase_price"],
+        "date": now,
+        "description": f"Ürün alımı: {doc['name']}",
+        "products_data": [],
+        "created_at": now,
+    }
+
+
+@router.post("/bulk")
+def bulk_create_products(products: list[ProductCreate]):
+    """Toplu içe aktarma: satırlar tek tek doğrulanır, geçerli olanlar tek seferde eklenir.
+
+    Geçersiz satırlar atlanır ve `rejected` içinde sırasıyla döner.
+    Ürün ve gider ID'leri koleksiyon başına tek sayaç güncellemesiyle ayrılır.
+    """
+    now = datetime.utcnow()
+    valid, rejected = [], []
+
+    cats = {cid: category_by_id(cid) for cid in {p.category_id for p in products}}
+    for index, product in enumerate(products):
+        cat = cats[product.category_id]
+        if product.category_id and not cat:
+            rejected.append({"index": index, "errors": ["Category not found"]})
+            continue
+        checked = validate_product(product.dict(), cat.name if cat else None, product.product_type)
+        if not checked.ok:
+            rejected.append({"index": index, "errors": checked.errors})
+            continue
+        valid.append(checked.data)
+
+    docs = [
+        {"id": product_id, **data, "images": [], "created_at": now, "updated_at": now}
+        for product_id, data in zip(reserve_ids("products", len(valid)), valid)
+    ]
+    purchased = [d for d in docs if d["purchase_price"] and d["purchase_price"] > 0]
+    expenses = [
+        _purchase_expense(doc, now, expense_id)
+        for expense_id, doc in zip(reserve_ids("expenses", len(purchased)), purchased)
+    ]
+
+    if docs:
+        products_col.insert_many(docs, ordered=False)
+    if expenses:
+        expenses_col.insert_many(expenses, ordered=False)
+    if docs:
+        cache.invalidate("products", "expenses")
+    return {
+        "inserted": len(docs),
+        "ids": [d["id"] for d in docs],
+        "rejected": rejected,
+    }
+
+
 @router.put("/{product_id}")
 def update_product(product_id: int, product_update: ProductUpdate):
     doc = products_col.find_one({"id": product_id})
     if not doc:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    if product_update.category_id:
-        cat = categories_col.find_one({"id": product_update.category_id})
-        if not cat:
-            raise HTTPException(status_code=404, detail="Category not found")
-
-    update_data = product_update.dict(exclude_unset=True)
+    category_id = product_update.category_id or doc.get("category_id")
+    cat = category_by_id(category_id)
+    if product_update.category_id and not cat:
+        raise HTTPException(status_code=404, detail="Category not found")
+
+    payload = product_update.dict(exclude_unset=True)
+    # Düzenleme sayfası tüm extra_specs'i geri gönderir: sadece değişen
+    # anahtarlar doğrulanır, kayıtlı değerler (eski "80 cm" gibi) olduğu gibi kalır
+    specs = payload.get("extra_specs")
+    stored_specs = doc.get("extra_specs") or {}
+    unchanged = {}
+    if isinstance(specs, dict):
+        unchanged = {k: v for k, v in specs.items() if k in stored_specs and stored_specs[k] == v}
+        payload["extra_specs"] = {k: v for k, v in specs.items() if k not in unchanged}
+
+    update_data = _validated(
+        payload,
+        cat.name if cat else None,
+        product_update.product_type or doc.get("product_type"),
+        partial=True,
+    )
+    if unchanged:
+        checked_specs = update_data.get("extra_specs") or {}
+        update_data["extra_specs"] = {
+            k: unchanged[k] if k in unchanged else checked_specs[k]
+            for k in specs
+            if k in unchanged or k in checked_specs
+        }
     update_data["updated_at"] = datetime.utcnow()
 
     products_col.update_one({"id": product_id}, {"$set": update_data})
+    cache.invalidate("products")
     updated = products_col.find_one({"id": product_id})
     return _enrich_product(updated)
 
@@ -177,6 +273,8 @@ def delete_product(product_id: int):
             _delete_from_cloudinary(img_url)
 
     products_col.delete_one({"id": product_id})
+    image_hash.remove_product(product_id)
+    cache.invalidate("products")
     return {"message": "Product deleted successfully"}
 
 
@@ -189,12 +287,18 @@ async def upload_product_image(
     if not doc:
         raise HTTPException(status_code=404, detail="Product not found")
 
+    # Algısal özet (AI analizinde tekrar tespiti için); dosya sonra baştan yüklenir
+    hashed = await asyncio.to_thread(image_hash.hash_image, await file.read())
+    await file.seek(0)
+
     try:
         image_url = _upload_to_cloudinary(file, product_id)
     except Exception as e:
         logger.error("Cloudinary upload hatası: %s", e)
         raise HTTPException(status_code=500, detail=f"Resim yükleme hatası: {str(e)}")
 
+    await asyncio.to_thread(image_hash.record, product_id, [(hashed, image_url)], "upload")
+
     images = doc.get("images", [])
     images.append(image_url)
 
@@ -241,6 +345,7 @@ def sell_product(product_id: int, body: SellRequest):
         "created_at": now,
     }
     transactions_col.insert_one(transaction_doc)
+    cache.invalidate("products", "transactions")
 
     updated = products_col.find_one({"id": product_id})
     return {
@@ -0,0 +1,62 @@
+"""Mevcut ürün görselleri için algısal özetleri (image_hashes) dolduran tek seferlik script.
+
+Yerel /uploads/... yolları diskten, Cloudinary URL'leri HTTP ile okunur.
+Özeti zaten kayıtlı görseller atlanır; tekrar çalıştırmak güvenlidir.
+Kayıtlı özetlerin `bands` alanı güncel kurala göre (bilgisiz bantlar
+hariç) yeniden yazılır.
+"""
+import os
+import urllib.request
+
+from database import image_hashes_col, products_col
+import image_hash
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _read(image: str) -> bytes:
+    if image.startswith(("http://", "https://")):
+        with urllib.request.urlopen(image, timeout=30) as resp:
+            return resp.read()
+    with open(os.path.join(BACKEND_DIR, image.lstrip("/")), "rb") as f:
+        return f.read()
+
+
+def _refresh_bands() -> int:
+    from pymongo import UpdateOne
+
+    ops = [
+        UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {"bands": image_hash.ImageHash(int(doc["ahash"], 16), int(doc["dhash"], 16)).bands()}},
+        )
+        for doc in image_hashes_col.find({}, {"ahash": 1, "dhash": 1})
+    ]
+    if ops:
+        image_hashes_col.bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+if __name__ == "__main__":
+    print(f"{_refresh_bands()} kayıtlı özetin bantları güncellendi")
+    done = set(image_hashes_col.distinct("image"))
+    hashed = skipped = failed = 0
+
+    for doc in products_col.find({"images.0": {"$exists": True}}, {"_id": 0, "id": 1, "images": 1}):
+        for image in doc["images"]:
+            if image in done:
+                skipped += 1
+                continue
+            try:
+                h = image_hash.hash_image(_read(image))
+            except Exception as e:
+                h = None
+                print(f"[HATA] #{doc['id']} {image}: {e}")
+            if h is None:
+                failed += 1
+                continue
+            source = "upload" if image.startswith("http") else "ai"
+            image_hash.record(doc["id"], [(h, image)], source)
+            hashed += 1
+
+    print(f"\nToplam: {hashed} görsel özetlendi, {skipped} zaten kayıtlı, {failed} okunamadı")
@@ -0,0 +1,89 @@
+"""
+Süreç-içi Sorgu Önbelleği
+──────────────────────────────────────────────
+Pahalı aggregation sonuçlarını kısa süreli bellekte tutar.
+
+Her kayıt, bağlı olduğu koleksiyon adlarıyla etiketlenir.
+Bir koleksiyona yazan endpoint invalidate("koleksiyon") çağırır,
+o koleksiyona bağlı tüm kayıtlar düşer.
+
+Süresi dolan kayıtlar her yazmada temizlenir; kayıt sayısı MAX_ENTRIES'ı
+aşarsa en uzun süredir kullanılmayan (LRU) kayıtlar atılır — anahtarlar
+sorgu parametrelerini (filtre, cursor, limit) içerdiği için sınırsız
+büyüyebilirdi.
+
+Invalidation yalnızca bu süreç içindir: birden fazla worker/süreç
+çalışıyorsa diğerlerinin önbelleği TTL dolana kadar eski kalabilir.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable
+
+DEFAULT_TTL_SECONDS = 300
+MAX_ENTRIES = 1024
+
+_lock = threading.Lock()
+# key → (expires_at, tags, value); sıra son kullanıma göre (LRU sonda)
+_store: "OrderedDict[Hashable, tuple[float, frozenset[str], Any]]" = OrderedDict()
+# etiket → invalidate sayacı; None anahtarı clear() içindir
+_generations: dict[str | None, int] = {}
+
+
+def _snapshot(tags: frozenset[str]) -> tuple[int, ...]:
+    return tuple(_generations.get(t, 0) for t in (None, *sorted(tags)))
+
+
+def _prune(now: float) -> None:
+    """Süresi dolanları sil, sonra sınırı aşan en eski kayıtları at (kilit altında)."""
+    for key in [k for k, (expires_at, _, _) in _store.items() if expires_at <= now]:
+        del _store[key]
+    while len(_store) > MAX_ENTRIES:
+        _store.popitem(last=False)
+
+
+def get_or_set(
+    key: Hashable,
+    loader: Callable[[], Any],
+    tags: Iterable[str],
+    ttl: float = DEFAULT_TTL_SECONDS,
+) -> Any:
+    """Önbellekte varsa döndürür, yoksa loader() ile hesaplayıp saklar.
+
+    loader() kilit dışında çalışır; bu sırada etiketlerden biri invalidate
+    edildiyse sonuç eski veriden hesaplanmış olabilir, döndürülür ama
+    saklanmaz.
+    """
+    tags = frozenset(tags)
+    now = time.monotonic()
+    with _lock:
+        entry = _store.get(key)
+        if entry and entry[0] > now:
+            _store.move_to_end(key)
+            return entry[2]
+        generation = _snapshot(tags)
+
+    value = loader()
+    with _lock:
+        if _snapshot(tags) == generation:
+            _store[key] = (now + ttl, tags, value)
+            _store.move_to_end(key)
+            _prune(time.monotonic())
+    return value
+
+
+def invalidate(*collections: str) -> None:
+    """Verilen koleksiyonlara bağlı tüm önbellek kayıtlarını siler."""
+    targets = set(collections)
+    with _lock:
+        for tag in targets:
+            _generations[tag] = _generations.get(tag, 0) + 1
+        for key in [k for k, (_, tags, _) in _store.items() if tags & targets]:
+            del _store[key]
+
+
+def clear() -> None:
+    """Tüm önbelleği boşaltır."""
+    with _lock:
+        _generations[None] = _generations.get(None, 0) + 1
+        _store.clear()
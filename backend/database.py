@@ -38,6 +38,12 @@ suppliers_col = db["suppliers"]
 ai_price_results_col = db["ai_price_results"]
 marketplace_searches_col = db["marketplace_searches"]
 counters_col = db["counters"]
+ai_analysis_cache_col = db["ai_analysis_cache"]
+llm_quota_col = db["llm_quota"]
+ai_jobs_col = db["ai_jobs"]
+ai_transcription_cache_col = db["ai_transcription_cache"]
+ai_call_ledger_col = db["ai_call_ledger"]
+image_hashes_col = db["image_hashes"]
 
 
 def get_next_id(collection_name: str) -> int:
@@ -51,41 +57,127 @@ def get_next_id(collection_name: str) -> int:
     return result["seq"]
 
 
+def reserve_ids(collection_name: str, count: int) -> range:
+    """Tek sayaç güncellemesiyle ardışık `count` ID ayırır (toplu ekleme)."""
+    if count <= 0:
+        return range(0)
+    result = counters_col.find_one_and_update(
+        {"_id": collection_name},
+        {"$inc": {"seq": count}},
+        upsert=True,
+        return_document=True,
+    )
+    return range(result["seq"] - count + 1, result["seq"] + 1)
+
+
+def _ensure_index(col, keys, **kwargs) -> bool:
+    """Tek index oluşturur; hata diğer indexleri engellemesin diye burada yakalanır."""
+    try:
+        col.create_index(keys, **kwargs)
+        return True
+    except Exception as e:
+        print(f"WARNING: index {col.name}{keys} oluşturulamadı: {e}")
+        return False
+
+
+def _ensure_ttl_index(col, field: str, seconds: int) -> bool:
+    """TTL index'i oluşturur; süre değiştiyse collMod ile günceller.
+
+    create_index aynı anahtarla farklı expireAfterSeconds görünce
+    IndexOptionsConflict verir; TTL değişikliği index'i yeniden kurmadan
+    collMod ile uygulanır.
+    """
+    try:
+        for info in col.index_information().values():
+            if info["key"] == [(field, ASCENDING)] and "expireAfterSeconds" in info:
+                if info["expireAfterSeconds"] != seconds:
+                    db.command(
+                        "collMod", col.name,
+                        index={"keyPattern": {field: ASCENDING}, "expireAfterSeconds": seconds},
+                    )
+                return True
+    except Exception as e:
+        print(f"WARNING: TTL index {col.name}.{field} güncellenemedi: {e}")
+        return False
+    return _ensure_index(col, [(field, ASCENDING)], expireAfterSeconds=seconds)
+
+
 def init_db():
-    """Indexler ve başlangıç verileri oluşturur."""
+    """Indexler ve başlangıç verileri oluşturur (her index bağımsız denenir)."""
+    from agent.config import ANALYSIS_CACHE_TTL_HOURS, TRANSCRIPTION_CACHE_TTL_HOURS
+
+    # Sunucuya ulaşılamıyorsa her index ayrı ayrı zaman aşımına düşmesin
     try:
-        categories_col.create_index([("name", ASCENDING)], unique=True)
-        categories_col.create_index([("id", ASCENDING)], unique=True)
-        products_col.create_index([("id", ASCENDING)], unique=True)
-        products_col.create_index([("name", ASCENDING)])
-        products_col.create_index([("category_id", ASCENDING)])
-        products_col.create_index([("created_at", DESCENDING)])
-        products_col.create_index([("stock_status", ASCENDING)])
-        products_col.create_index([("status", ASCENDING)])
-        products_col.create_index([("material", ASCENDING)])
-        transactions_col.create_index([("id", ASCENDING)], unique=True)
-        transactions_col.create_index([("date", DESCENDING)])
-        transactions_col.create_index([("product_id", ASCENDING)])
-        expenses_col.create_index([("id", ASCENDING)], unique=True)
-        expenses_col.create_index([("date", DESCENDING)])
-        expenses_col.create_index([("product_id", ASCENDING)])
-        reminders_col.create_index([("id", ASCENDING)], unique=True)
-        reminders_col.create_index([("date", ASCENDING)])
-        notes_col.create_index([("id", ASCENDING)], unique=True)
-        notes_col.create_index([("date", DESCENDING)])
-        price_ranges_col.create_index([("id", ASCENDING)], unique=True)
-        ai_price_results_col.create_index([("id", ASCENDING)], unique=True)
-        ai_price_results_col.create_index(
-            [("category_id", ASCENDING), ("product_type", ASCENDING)], unique=True
-        )
-        suppliers_col.create_index([("id", ASCENDING)], unique=True)
-        suppliers_col.create_index([("name", ASCENDING)])
-        marketplace_searches_col.create_index([("id", ASCENDING)], unique=True)
-        marketplace_searches_col.create_index([("query", ASCENDING)])
-        marketplace_searches_col.create_index([("searched_at", DESCENDING)])
-        print(f"MongoDB indexes created on {MONGODB_DB_NAME}")
+        client.admin.command("ping")
     except Exception as e:
         print(f"WARNING: MongoDB init_db failed (will retry on first request): {e}")
+        return
+
+    indexes = [
+        (categories_col, [("name", ASCENDING)], {"unique": True}),
+        (categories_col, [("id", ASCENDING)], {"unique": True}),
+        (products_col, [("id", ASCENDING)], {"unique": True}),
+        (products_col, [("name", ASCENDING)], {}),
+        (products_col, [("category_id", ASCENDING)], {}),
+        (products_col, [("created_at", DESCENDING)], {}),
+        (products_col, [("stock_status", ASCENDING)], {}),
+        (products_col, [("status", ASCENDING)], {}),
+        (products_col, [("material", ASCENDING)], {}),
+        (transactions_col, [("id", ASCENDING)], {"unique": True}),
+        (transactions_col, [("date", DESCENDING)], {}),
+        (transactions_col, [("product_id", ASCENDING)], {}),
+        (expenses_col, [("id", ASCENDING)], {"unique": True}),
+        (expenses_col, [("date", DESCENDING)], {}),
+        (expenses_col, [("product_id", ASCENDING)], {}),
+        (reminders_col, [("id", ASCENDING)], {"unique": True}),
+        (reminders_col, [("date", ASCENDING)], {}),
+        (notes_col, [("id", ASCENDING)], {"unique": True}),
+        (notes_col, [("date", DESCENDING)], {}),
+        (price_ranges_col, [("id", ASCENDING)], {"unique": True}),
+        (ai_price_results_col, [("id", ASCENDING)], {"unique": True}),
+        (ai_price_results_col, [("updated_at", DESCENDING)], {}),
+        (ai_price_results_col, [("category_id", ASCENDING), ("product_type", ASCENDING)], {"unique": True}),
+        (suppliers_col, [("id", ASCENDING)], {"unique": True}),
+        (suppliers_col, [("name", ASCENDING)], {}),
+        (marketplace_searches_col, [("id", ASCENDING)], {"unique": True}),
+        (marketplace_searches_col, [("query", ASCENDING)], {}),
+        (marketplace_searches_col, [("searched_at", DESCENDING)], {}),
+        (ai_jobs_col, [("status", ASCENDING), ("created_at", ASCENDING)], {}),
+        (ai_jobs_col, [("status", ASCENDING), ("lease_until", ASCENDING)], {}),
+        (ai_analysis_cache_col, [("key", ASCENDING)], {"unique": True}),
+        (ai_transcription_cache_col, [("key", ASCENDING)], {"unique": True}),
+        # Görsel özetleri: dHash bantları (multikey) ile Hamming adayları
+        (image_hashes_col, [("bands", ASCENDING)], {}),
+        (image_hashes_col, [("product_id", ASCENDING)], {}),
+    ]
+    ttl_indexes = [
+        (ai_jobs_col, "finished_at", 7 * 24 * 3600),
+        (llm_quota_col, "expires_at", 0),
+        (ai_analysis_cache_col, "created_at", ANALYSIS_CACHE_TTL_HOURS * 3600),
+        (ai_transcription_cache_col, "created_at", TRANSCRIPTION_CACHE_TTL_HOURS * 3600),
+    ]
+
+    ok = all([_ensure_index(col, keys, **kwargs) for col, keys, kwargs in indexes])
+    ok = all([_ensure_ttl_index(col, field, seconds) for col, field, seconds in ttl_indexes]) and ok
+
+    # LLM çağrı defteri: sabit boyutlu (capped), en eski kayıtlar kendiliğinden düşer
+    try:
+        if "ai_call_ledger" not in db.list_collection_names():
+            db.create_collection(
+                "ai_call_ledger",
+                capped=True,
+                size=int(os.getenv("LLM_LEDGER_SIZE_MB", "64")) * 1024 * 1024,
+                max=int(os.getenv("LLM_LEDGER_MAX_DOCS", "200000")),
+            )
+    except Exception as e:
+        ok = False
+        print(f"WARNING: ai_call_ledger oluşturulamadı: {e}")
+    ok = _ensure_index(ai_call_ledger_col, [("ts", DESCENDING)]) and ok
+
+    if ok:
+        print(f"MongoDB indexes created on {MONGODB_DB_NAME}")
+    else:
+        print(f"WARNING: MongoDB init_db incomplete on {MONGODB_DB_NAME} (see warnings above)")
 
 
 def doc_to_dict(doc: dict) -> dict:
@@ -0,0 +1,107 @@
+"""
+Akışlı CSV / XLSX Dışa Aktarım
+──────────────────────────────────────────────
+MongoDB cursor'ından satır satır okuyup StreamingResponse ile gönderir.
+Tüm sonuç hiçbir zaman belleğe alınmaz; bellek kullanımı
+satır sayısından bağımsız kalır.
+
+XLSX için openpyxl (write_only modu) opsiyoneldir.
+"""
+import csv
+import io
+import tempfile
+from datetime import datetime, date
+from typing import Any, Iterable, Iterator
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+# Mongo'dan tek round-trip'te çekilecek belge sayısı
+EXPORT_BATCH_SIZE = 2000
+# CSV tamponu bu kadar satırda bir boşaltılır
+CSV_FLUSH_ROWS = 500
+XLSX_CHUNK_BYTES = 64 * 1024
+
+
+def _cell(value: Any) -> Any:
+    """Mongo değerini tablo hücresine uygun hale getirir."""
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return str(value)
+    return value
+
+
+def _iter_csv(docs: Iterable[dict], columns: list[str]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    # Excel'in Türkçe karakterleri doğru açması için BOM
+    yield "\ufeff".encode("utf-8")
+    writer.writerow(columns)
+    rows = 0
+    for doc in docs:
+        writer.writerow([_cell(doc.get(c)) for c in columns])
+        rows += 1
+        if rows % CSV_FLUSH_ROWS == 0:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate(0)
+    tail = buf.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+def _iter_xlsx(docs: Iterable[dict], columns: list[str], sheet_title: str) -> Iterator[bytes]:
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title[:31])
+    ws.append(columns)
+    for doc in docs:
+        ws.append([_cell(doc.get(c)) for c in columns])
+
+    # XLSX bir zip arşivi — önce diske (geçici) yazılır, sonra parça parça okunur
+    with tempfile.TemporaryFile() as tmp:
+        wb.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(XLSX_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+
+def export_response(
+    cursor,
+    columns: list[str],
+    filename: str,
+    fmt: str = "csv",
+) -> StreamingResponse:
+    """Cursor'ı CSV veya XLSX olarak akıtan StreamingResponse döndürür.
+
+    cursor: find() ile oluşturulmuş, henüz iterasyona başlanmamış cursor.
+    """
+    if fmt not in ("csv", "xlsx"):
+        raise HTTPException(status_code=400, detail="format 'csv' veya 'xlsx' olmalıdır")
+
+    cursor = cursor.batch_size(EXPORT_BATCH_SIZE)
+    stamp = datetime.utcnow().strftime("%Y%m%d")
+
+    if fmt == "xlsx":
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="XLSX dışa aktarım için openpyxl kurulu değil")
+        body = _iter_xlsx(cursor, columns, filename)
+        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    else:
+        body = _iter_csv(cursor, columns)
+        media_type = "text/csv; charset=utf-8"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}_{stamp}.{fmt}"'},
+    )
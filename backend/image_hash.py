@@ -0,0 +1,187 @@
+"""
+Görsel Algısal Özeti (aHash + dHash) ve Tekrar Tespiti
+──────────────────────────────────────────────
+Aynı ürün sık sık yeniden fotoğraflanıyor (tekrar ilan, ikinci açı,
+iade). Kaydedilen her ürün görseli için 64 bitlik aHash ve dHash
+hesaplanıp image_hashes koleksiyonuna yazılır; yeni yüklenen fotoğraf
+kayıtlı bir ürünle eşleşirse AI analizi yerine o ürünün formu önerilir.
+
+Hamming mesafesi araması: dHash 8 adet 8 bitlik banda bölünür ve her
+bant `bands` dizisinde (multikey index) tutulur. Mesafe ≤ 7 olan iki
+özetin en az bir bandı birebir aynıdır (güvercin yuvası), bu yüzden
+`bands $in` sorgusu adayları getirir; kesin mesafe Python'da hesaplanır.
+Eşleşme için iki özetin de eşik altında olması gerekir — yanlış ürünün
+formunu önermek, analizi tekrar yapmaktan pahalıdır.
+
+Düz fonlu ürün fotoğraflarında dHash baytlarının çoğu 0x00 / 0xFF'tir;
+bu bantlar neredeyse tüm koleksiyonda ortak olduğundan indekse ve
+sorguya girmez. Tek ortak bandı bilgisiz olan eşleşme kaçabilir (analiz
+normal yapılır). Adaylar sorgu özetiyle ortak bant sayısına göre
+sıralanıp ilk _MAX_CANDIDATES tanesi alınır: ortak bandı çok olan
+(Hamming mesafesi küçük olması muhtemel) görseller kalabalık bantlarda
+sınır yüzünden elenmez.
+
+Ortam değişkenleri:
+  IMAGE_DEDUP_ENABLED       — tekrar tespiti açık mı (varsayılan true)
+  IMAGE_DEDUP_MAX_DISTANCE  — en fazla farklı bit, 0–7 (varsayılan 5)
+"""
+import io
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+IMAGE_DEDUP_ENABLED: bool = os.getenv("IMAGE_DEDUP_ENABLED", "true").lower() == "true"
+IMAGE_DEDUP_MAX_DISTANCE: int = min(7, max(0, int(os.getenv("IMAGE_DEDUP_MAX_DISTANCE", "5"))))
+
+_HASH_SIZE = 8
+_BANDS = 8  # 8 bitlik bantlar → mesafe ≤ 7 için en az bir ortak bant
+# Düz fonda hemen her görselde aynı olan bant baytları
+_LOW_INFO_BYTES = (0x00, 0xFF)
+_MAX_CANDIDATES = 500
+
+
+@dataclass(frozen=True)
+class ImageHash:
+    ahash: int
+    dhash: int
+
+    def bands(self) -> list[int]:
+        """dHash'in bilgi taşıyan bantları; bant sırası değere gömülür (i * 256 + bayt)."""
+        result = []
+        for i in range(_BANDS):
+            byte = (self.dhash >> (8 * (_BANDS - 1 - i))) & 0xFF
+            if byte not in _LOW_INFO_BYTES:
+                result.append(i * 256 + byte)
+        return result
+
+    def distance(self, other: "ImageHash") -> int:
+        """İki özetten büyük olan Hamming mesafesi."""
+        return max((self.ahash ^ other.ahash).bit_count(), (self.dhash ^ other.dhash).bit_count())
+
+
+@dataclass(frozen=True)
+class HashMatch:
+    product_id: int
+    distance: int
+    image: Optional[str]
+
+
+def _bits_to_int(bits) -> int:
+    import numpy as np
+
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def hash_image(raw: bytes) -> Optional[ImageHash]:
+    """Görselin aHash ve dHash'i (senkron, CPU). Çözülemezse None."""
+    import numpy as np
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(io.BytesIO(raw)) as img:
+            # JPEG'i küçük ölçekte çöz — 9x8 için tam çözünürlük gereksiz
+            img.draft("L", (64, 64))
+            gray = ImageOps.exif_transpose(img).convert("L")
+            small = gray.resize((_HASH_SIZE, _HASH_SIZE), Image.Resampling.BOX)
+            wide = gray.resize((_HASH_SIZE + 1, _HASH_SIZE), Image.Resampling.BOX)
+    except Exception as e:
+        logger.warning("Görsel özeti hesaplanamadı: %s", e)
+        return None
+
+    pixels = np.asarray(small, dtype=np.float32)
+    diff = np.asarray(wide, dtype=np.int16)
+    return ImageHash(
+        ahash=_bits_to_int(pixels > pixels.mean()),
+        dhash=_bits_to_int(diff[:, 1:] > diff[:, :-1]),
+    )
+
+
+def _hex(value: int) -> str:
+    return f"{value:016x}"
+
+
+def record(
+    product_id: int,
+    hashes: list[tuple[Optional[ImageHash], Optional[str]]],
+    source: str,
+) -> None:
+    """Ürün görsellerinin özetlerini kaydet: [(özet, görsel yolu/URL'si)].
+
+    Aynı ürün için aynı özet tekrar yazılmaz (yeniden denenen işler).
+    """
+    from pymongo import UpdateOne
+
+    now = datetime.utcnow()
+    ops = [
+        UpdateOne(
+            {"product_id": product_id, "ahash": _hex(h.ahash), "dhash": _hex(h.dhash)},
+            {
+                "$set": {"bands": h.bands()},
+                "$setOnInsert": {"image": image, "source": source, "created_at": now},
+            },
+            upsert=True,
+        )
+        for h, image in hashes
+        if h is not None
+    ]
+    if not ops:
+        return
+    try:
+        from database import image_hashes_col
+        image_hashes_col.bulk_write(ops, ordered=False)
+    except Exception as e:
+        logger.warning("Görsel özetleri kaydedilemedi (ürün %s): %s", product_id, e)
+
+
+def find_match(
+    hashes: list[Optional[ImageHash]],
+    max_distance: int = IMAGE_DEDUP_MAX_DISTANCE,
+    exclude_product_id: Optional[int] = None,
+) -> Optional[HashMatch]:
+    """Görsellerden herhangi biriyle en yakın kayıtlı ürün görseli (eşik altındaysa)."""
+    hashes = [h for h in hashes if h is not None]
+    if not hashes:
+        return None
+    bands = sorted({b for h in hashes for b in h.bands()})
+    if not bands:
+        return None  # düz / boş görsel — ayırt edici bant yok
+    try:
+        from database import image_hashes_col
+        match: dict[str, Any] = {"bands": {"$in": bands}}
+        if exclude_product_id is not None:
+            match["product_id"] = {"$ne": exclude_product_id}
+        candidates = list(image_hashes_col.aggregate([
+            {"$match": match},
+            {"$project": {
+                "_id": 0, "product_id": 1, "image": 1, "ahash": 1, "dhash": 1,
+                "shared": {"$size": {"$filter": {"input": "$bands", "cond": {"$in": ["$$this", bands]}}}},
+            }},
+            # $sort + $limit → sunucu sadece ilk _MAX_CANDIDATES'ı bellekte tutar
+            {"$sort": {"shared": -1}},
+            {"$limit": _MAX_CANDIDATES},
+        ]))
+    except Exception as e:
+        logger.warning("Görsel özeti araması başarısız: %s", e)
+        return None
+    if len(candidates) >= _MAX_CANDIDATES:
+        logger.info("Görsel özeti araması aday sınırına ulaştı (%d)", _MAX_CANDIDATES)
+
+    best: Optional[HashMatch] = None
+    for c in candidates:
+        stored = ImageHash(ahash=int(c["ahash"], 16), dhash=int(c["dhash"], 16))
+        distance = min(h.distance(stored) for h in hashes)
+        if distance <= max_distance and (best is None or distance < best.distance):
+            best = HashMatch(product_id=c["product_id"], distance=distance, image=c.get("image"))
+    return best
+
+
+def remove_product(product_id: int) -> None:
+    try:
+        from database import image_hashes_col
+        image_hashes_col.delete_many({"product_id": product_id})
+    except Exception as e:
+        logger.warning("Görsel özetleri silinemedi (ürün %s): %s", product_id, e)
@@ -0,0 +1,177 @@
+"""
+Görsel Alımı (diske yazmadan)
+──────────────────────────────────────────────
+Yüklenen fotoğraflar bellekte okunur (boyut sınırıyla), Pillow ile
+worker havuzunda çözülüp vision modelinin kullandığı çözünürlüğe
+küçültülür ve bellekte JPEG/WebP olarak yeniden kodlanır.
+
+Telefon fotoğrafları 4–12 MB iken küçültülmüş hali ~200 KB'dır;
+base64 + LLM isteği buna göre küçülür. Orijinal baytlar da tutulur:
+kalıcı ürün fotoğrafı (save_images) orijinaldir, küçültülmüş kopya
+sadece modele gider. Disk yalnızca ürün kaydedilirken kullanılır.
+
+Ortam değişkenleri:
+  IMAGE_MAX_UPLOAD_MB   — tek dosya için üst sınır (varsayılan 15)
+  IMAGE_MAX_DIMENSION   — uzun kenar piksel sınırı (varsayılan 1536)
+  IMAGE_WORKERS         — çözme/küçültme havuzu boyutu (varsayılan 4)
+"""
+import asyncio
+import base64
+import io
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException, UploadFile
+
+logger = logging.getLogger(__name__)
+
+IMAGE_MAX_UPLOAD_BYTES: int = int(float(os.getenv("IMAGE_MAX_UPLOAD_MB", "15")) * 1024 * 1024)
+# Gemini görselleri 768px karolara böler; 1536 = 2x2 karo, etiket/plaka okunur kalır
+IMAGE_MAX_DIMENSION: int = int(os.getenv("IMAGE_MAX_DIMENSION", "1536"))
+IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", "4"))
+JPEG_QUALITY = 85
+
+ALLOWED_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp")
+_READ_CHUNK = 1 << 20
+
+PRODUCT_UPLOAD_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "uploads", "products",
+)
+
+# Pillow çözme/yeniden boyutlandırma sırasında GIL'i büyük ölçüde bırakır;
+# thread havuzu süreç havuzundan ucuzdur ve bayt kopyalamaz.
+_pool = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image-ingest")
+
+
+# Pillow biçimi → orijinal dosya uzantısı
+_FORMAT_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "GIF": ".gif", "WEBP": ".webp", "BMP": ".bmp"}
+
+
+class IngestedImage:
+    """Bellekte, modele gönderilmeye hazır küçültülmüş görsel (+ kaydetmek için orijinali)."""
+
+    __slots__ = ("data", "mime_type", "width", "height", "original_size", "original", "original_ext")
+
+    def __init__(
+        self,
+        data: bytes,
+        mime_type: str,
+        width: int,
+        height: int,
+        original_size: int,
+        original: Optional[bytes] = None,
+        original_ext: Optional[str] = None,
+    ) -> None:
+        self.data = data
+        self.mime_type = mime_type
+        self.width = width
+        self.height = height
+        self.original_size = original_size
+        self.original = original
+        self.original_ext = original_ext
+
+    @property
+    def ext(self) -> str:
+        return ".webp" if self.mime_type == "image/webp" else ".jpg"
+
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{base64.b64encode(self.data).decode('ascii')}"
+
+
+def downscale_image(raw: bytes, max_dimension: int = IMAGE_MAX_DIMENSION) -> IngestedImage:
+    """Görseli çöz, EXIF yönünü uygula, küçült ve yeniden kodla (senkron, CPU)."""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(raw)) as img:
+        original_ext = _FORMAT_EXTENSIONS.get(img.format or "")
+        # JPEG'de draft() DCT ölçeklemesiyle çözer — tam çözünürlüğü hiç açmaz
+        img.draft("RGB", (max_dimension, max_dimension))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+        out = io.BytesIO()
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        if has_alpha:
+            img.convert("RGBA").save(out, format="WEBP", quality=JPEG_QUALITY, method=4)
+            mime_type = "image/webp"
+        else:
+            img.convert("RGB").save(out, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+            mime_type = "image/jpeg"
+        return IngestedImage(
+            out.getvalue(), mime_type, img.width, img.height, len(raw),
+            original=raw if original_ext else None, original_ext=original_ext,
+        )
+
+
+async def read_upload(upload: UploadFile, max_bytes: int = IMAGE_MAX_UPLOAD_BYTES) -> bytes:
+    """UploadFile'ı parça parça belleğe oku; sınır aşılırsa 413."""
+    buf = bytearray()
+    while True:
+        chunk = await upload.read(_READ_CHUNK)
+        if not chunk:
+            break
+        buf += chunk
+        if len(buf) > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"'{upload.filename}' çok büyük (en fazla {max_bytes // (1024 * 1024)} MB)",
+            )
+    return bytes(buf)
+
+
+async def _ingest_one(upload: UploadFile) -> Optional[IngestedImage]:
+    raw = await read_upload(upload)
+    if not raw:
+        return None
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_pool, downscale_image, raw)
+    except Exception as e:
+        logger.warning("Görsel çözülemedi (%s): %s", upload.filename, e)
+        return None
+
+
+async def ingest_uploads(uploads: list[UploadFile]) -> list[IngestedImage]:
+    """Geçerli uzantılı yüklemeleri paralel olarak bellekte işle (sıra korunur)."""
+    accepted = [
+        u for u in uploads
+        if u.filename and os.path.splitext(u.filename)[1].lower() in ALLOWED_EXTENSIONS
+    ]
+    results = await asyncio.gather(*[_ingest_one(u) for u in accepted])
+    images = [img for img in results if img is not None]
+    if images:
+        logger.info(
+            "Görseller küçültüldü: %d adet, %.1f MB → %.1f MB",
+            len(images),
+            sum(i.original_size for i in images) / 1e6,
+            sum(len(i.data) for i in images) / 1e6,
+        )
+    return images
+
+
+def save_images(images: list[IngestedImage], prefix: str) -> list[str]:
+    """Görselleri (orijinal baytlarıyla) kalıcı ürün dizinine yaz; /uploads/... yollarını döndür."""
+    os.makedirs(PRODUCT_UPLOAD_DIR, exist_ok=True)
+    saved: list[str] = []
+    for img in images:
+        data, ext = (img.original, img.original_ext) if img.original else (img.data, img.ext)
+        name = f"{prefix}_{uuid.uuid4().hex[:8]}{ext}"
+        try:
+            with open(os.path.join(PRODUCT_UPLOAD_DIR, name), "wb") as f:
+                f.write(data)
+            saved.append(f"/uploads/products/{name}")
+        except OSError as e:
+            logger.warning("Görsel kaydedilemedi: %s", e)
+    return saved
+
+
+def remove_images(paths: list[str]) -> None:
+    """save_images ile yazılmış ama ürüne bağlanmamış görselleri sil."""
+    for path in paths:
+        try:
+            os.remove(os.path.join(PRODUCT_UPLOAD_DIR, os.path.basename(path)))
+        except OSError as e:
+            logger.warning("Görsel silinemedi (%s): %s", path, e)
@@ -0,0 +1,286 @@
+"""
+Kalıcı Arka Plan İş Kuyruğu
+──────────────────────────────────────────────
+Uzun süren işler (AI analizi + kaydetme) HTTP bağlantısını açık tutmaz:
+endpoint iş belgesini MongoDB'ye yazar, job_id'yi hemen döner; süreç
+içindeki sınırlı sayıda worker işi alıp çalıştırır.
+
+Dayanıklılık — kira (lease) modeli:
+  - Worker işi find_one_and_update ile atomik olarak alır ve
+    lease_until = şimdi + JOB_LEASE_SECONDS yazar
+  - Çalışırken kirayı periyodik olarak yeniler
+  - Süreç ölürse kira dolar; herhangi bir worker işi yeniden alır
+  - JOB_MAX_ATTEMPTS denemeden sonra iş "failed" olur; iş tipinin
+    on_failed kancası payload ile çağrılır (örn. diske yazılmış dosyaları
+    silmek için), ardından payload silinir
+
+Durumlar: queued → running → done | failed
+Biten işler 7 gün sonra TTL index ile silinir.
+
+Ortam değişkenleri: JOB_WORKERS (2), JOB_LEASE_SECONDS (120), JOB_MAX_ATTEMPTS (3)
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from pymongo import ReturnDocument
+
+from database import ai_jobs_col
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", "120"))
+JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+_POLL_INTERVAL_SECONDS = 5.0
+
+TERMINAL_STATUSES = ("done", "failed")
+
+JobHandler = Callable[[dict], Awaitable[dict]]
+FailureHook = Callable[[dict], None]
+
+_handlers: dict[str, JobHandler] = {}
+_failure_hooks: dict[str, FailureHook] = {}
+_workers: list[asyncio.Task] = []
+_wakeup: Optional[asyncio.Event] = None
+_worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def register_handler(job_type: str, handler: JobHandler, on_failed: Optional[FailureHook] = None) -> None:
+    """İş tipi için async işleyici kaydet. İşleyici iş belgesini alır, sonuç dict'i döner.
+
+    on_failed: iş kalıcı olarak "failed" olduğunda payload ile çağrılır (senkron).
+    """
+    _handlers[job_type] = handler
+    if on_failed is not None:
+        _failure_hooks[job_type] = on_failed
+
+
+def _on_failed(job: dict) -> None:
+    """Kalıcı hatada iş tipinin temizlik kancasını çalıştır; hata yutulur."""
+    hook = _failure_hooks.get(job.get("type"))
+    if hook is None or not job.get("payload"):
+        return
+    try:
+        hook(job["payload"])
+    except Exception as e:
+        logger.warning("İş temizliği başarısız: %s — %s", job["_id"], e)
+
+
+def public_view(doc: dict) -> dict:
+    """İş belgesinin API'ye dönen kısmı (payload hariç)."""
+    return {
+        "job_id": doc["_id"],
+        "type": doc.get("type"),
+        "status": doc.get("status"),
+        "attempts": doc.get("attempts", 0),
+        "result": doc.get("result"),
+        "error": doc.get("error"),
+        "created_at": doc.get("created_at"),
+        "started_at": doc.get("started_at"),
+        "finished_at": doc.get("finished_at"),
+    }
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    doc = ai_jobs_col.find_one({"_id": job_id}, {"payload": 0})
+    return public_view(doc) if doc else None
+
+
+def enqueue(job_type: str, payload: dict[str, Any]) -> str:
+    if job_type not in _handlers:
+        raise ValueError(f"Bilinmeyen iş tipi: {job_type}")
+    job_id = uuid.uuid4().hex
+    now = datetime.utcnow()
+    ai_jobs_col.insert_one({
+        "_id": job_id,
+        "type": job_type,
+        "status": "queued",
+        "payload": payload,
+        "attempts": 0,
+        "lease_until": None,
+        "created_at": now,
+        "updated_at": now,
+    })
+    return job_id
+
+
+async def aenqueue(job_type: str, payload: dict[str, Any]) -> str:
+    """enqueue'nun async sürümü — boştaki worker'ları hemen uyandırır."""
+    job_id = await asyncio.to_thread(enqueue, job_type, payload)
+    if _wakeup is not None:
+        _wakeup.set()
+    return job_id
+
+
+def update_payload(job_id: str, **fields: Any) -> None:
+    """Çalışan işin payload'ına alan yaz (örn. yeniden denemede tekrar kullanılacak id)."""
+    ai_jobs_col.update_one(
+        {"_id": job_id},
+        {"$set": {f"payload.{k}": v for k, v in fields.items()}},
+    )
+
+
+# ─── Worker tarafı ───────────────────────────────────────────
+
+def _claim() -> Optional[dict]:
+    """Sıradaki işi (veya kirası dolmuş işi) atomik olarak al."""
+    now = datetime.utcnow()
+    return ai_jobs_col.find_one_and_update(
+        {
+            "$or": [
+                {"status": "queued"},
+                {"status": "running", "lease_until": {"$lt": now}},
+            ],
+            "attempts": {"$lt": JOB_MAX_ATTEMPTS},
+            "type": {"$in": list(_handlers)},
+        },
+        {
+            "$set": {
+                "status": "running",
+                "worker": _worker_id,
+                "lease_until": now + timedelta(seconds=JOB_LEASE_SECONDS),
+                "started_at": now,
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("created_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def _fail_abandoned() -> None:
+    """Kirası dolmuş ve deneme hakkı bitmiş işleri kapat.
+
+    İşler tek tek kapatılır: payload'ı silinmeden önce alınıp temizlik
+    kancasına verilir (aynı işi iki worker kapatırsa kanca bir kez çalışır).
+    """
+    now = datetime.utcnow()
+    abandoned = {"status": "running", "lease_until": {"$lt": now}, "attempts": {"$gte": JOB_MAX_ATTEMPTS}}
+    for doc in ai_jobs_col.find(abandoned, {"_id": 1}):
+        job = ai_jobs_col.find_one_and_update(
+            {**abandoned, "_id": doc["_id"]},
+            {
+                "$set": {
+                    "status": "failed",
+                    "error": "İş tamamlanamadı (deneme sınırı aşıldı)",
+                    "finished_at": now,
+                    "updated_at": now,
+                },
+                "$unset": {"payload": ""},
+            },
+            return_document=ReturnDocument.BEFORE,
+        )
+        if job is not None:
+            _on_failed(job)
+
+
+def _renew_lease(job_id: str) -> None:
+    now = datetime.utcnow()
+    ai_jobs_col.update_one(
+        {"_id": job_id, "worker": _worker_id, "status": "running"},
+        {"$set": {"lease_until": now + timedelta(seconds=JOB_LEASE_SECONDS), "updated_at": now}},
+    )
+
+
+def _finish(job: dict, result: Optional[dict], error: Optional[str]) -> None:
+    now = datetime.utcnow()
+    if error is None:
+        update = {
+            "$set": {"status": "done", "result": result, "error": None, "finished_at": now},
+            "$unset": {"payload": ""},
+        }
+    elif job["attempts"] < JOB_MAX_ATTEMPTS:
+        update = {"$set": {"status": "queued", "error": error, "lease_until": None}}
+    else:
+        update = {
+            "$set": {"status": "failed", "error": error, "finished_at": now},
+            "$unset": {"payload": ""},
+        }
+    update["$set"]["updated_at"] = now
+    # Kira başka bir worker'a geçtiyse sonucu ezme
+    res = ai_jobs_col.update_one({"_id": job["_id"], "worker": _worker_id}, update)
+    if res.modified_count and update["$set"]["status"] == "failed":
+        _on_failed(job)
+
+
+async def _keep_lease(job_id: str) -> None:
+    while True:
+        await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+        try:
+            await asyncio.to_thread(_renew_lease, job_id)
+        except Exception as e:
+            logger.warning("İş kirası yenilenemedi (%s): %s", job_id, e)
+
+
+async def _run(job: dict) -> None:
+    """İşi çalıştır ve sonucu yaz. Worker döngüsüne hiçbir hata sızmaz;
+    sonuç yazılamazsa iş kira dolunca yeniden kuyruğa düşer."""
+    logger.info("İş başladı: %s (%s, deneme %d)", job["_id"], job.get("type"), job["attempts"])
+    heartbeat = asyncio.create_task(_keep_lease(job["_id"]))
+    result, error = None, None
+    try:
+        handler = _handlers.get(job.get("type"))
+        if handler is None:
+            raise ValueError(f"Bilinmeyen iş tipi: {job.get('type')}")
+        result = await handler(job)
+    except Exception as e:
+        logger.error("İş hatası: %s — %s", job["_id"], e, exc_info=True)
+        error = str(e) or type(e).__name__
+    finally:
+        heartbeat.cancel()
+    try:
+        await asyncio.to_thread(_finish, job, result, error)
+    except Exception as e:
+        logger.error("İş sonucu yazılamadı: %s — %s (kira dolunca yeniden denenecek)", job["_id"], e)
+        return
+    logger.info("İş bitti: %s (%s)", job["_id"], "hata" if error else "başarılı")
+
+
+async def _worker_loop(n: int) -> None:
+    while True:
+        # Temizleme claim'den önce: arada gelen enqueue sinyali kaybolmaz
+        _wakeup.clear()
+        try:
+            job = await asyncio.to_thread(_claim)
+        except Exception as e:
+            logger.warning("İş kuyruğu okunamadı: %s", e)
+            job = None
+
+        if job is not None:
+            await _run(job)
+            continue
+
+        if n == 0:
+            try:
+                await asyncio.to_thread(_fail_abandoned)
+            except Exception:
+                pass
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=_POLL_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_workers() -> None:
+    """Worker'ları mevcut event loop'ta başlat (FastAPI startup)."""
+    global _wakeup
+    if _workers or JOB_WORKERS <= 0:
+        return
+    _wakeup = asyncio.Event()
+    for n in range(JOB_WORKERS):
+        _workers.append(asyncio.create_task(_worker_loop(n), name=f"job-worker-{n}"))
+    logger.info("İş kuyruğu: %d worker başlatıldı (%s)", JOB_WORKERS, _worker_id)
+
+
+async def stop_workers() -> None:
+    """Worker'ları durdur. Yarım kalan işler kira dolunca yeniden alınır."""
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
@@ -37,6 +37,7 @@ logging.basicConfig(level=logging.INFO, format="%(name)s - %(levelname)s - %(mes
 from database import init_db
 from api import products, categories, inventory, finance, calendar, notes, price_ranges, suppliers, ai_agent, price_scraper, marketplace_search
 from api.categories import seed_product_types as _seed_pt
+from agent.schema_registry import RegistryUnavailable
 
 app = FastAPI(title="Endüstriyel Mutfak Yönetim Sistemi", default_response_class=MongoJSONResponse)
 
@@ -90,6 +91,57 @@ async def global_exception_handler(request: Request, exc: Exception):
         }
     )
 
+@app.exception_handler(RegistryUnavailable)
+async def registry_unavailable_handler(request: Request, exc: RegistryUnavailable):
+    """Kategori tanımları okunamıyor (MongoDB) — geçici hata, seed ile doldurulmaz."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc), "type": type(exc).__name__},
+        headers={
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Credentials": "true",
+            "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+            "Access-Control-Allow-Headers": "*",
+        }
+    )
+
+@app.on_event("startup")
+def warm_llm_clients():
+    """LLM istemcilerini arka planda hazırla — ilk AI isteği kurulum maliyeti ödemesin."""
+    import threading
+    from agent.config import GOOGLE_API_KEY, GOOGLE_MODEL, GOOGLE_MODEL_FALLBACK
+    from agent.llm_registry import warm_up
+
+    if GOOGLE_API_KEY:
+        threading.Thread(
+            target=warm_up,
+            args=([GOOGLE_MODEL, GOOGLE_MODEL_FALLBACK],),
+            daemon=True,
+        ).start()
+
+@app.on_event("startup")
+def load_schema_registry():
+    """Kategori şema kayıt defterini ilk istekten önce yükle."""
+    from agent import schema_registry
+    try:
+        schema_registry.load()
+    except RegistryUnavailable as e:
+        # İlk kategori isteği tekrar dener (o zamana kadar 503)
+        logging.warning(f"Şema kayıt defteri yüklenemedi: {e}")
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    """Arka plan iş kuyruğu worker'larını başlat (kirası dolmuş işler de yeniden alınır)."""
+    import job_queue
+    job_queue.start_workers()
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    import job_queue
+    await job_queue.stop_workers()
+
 # Static files for uploads
 os.makedirs("uploads", exist_ok=True)
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
@@ -12,7 +12,8 @@ from datetime import datetime
 from contextlib import contextmanager
 
 from dotenv import load_dotenv
-from langsmith import Client as LangSmithClient
+
+from sdk_clients import langsmith_client
 
 load_dotenv()
 
@@ -21,13 +22,6 @@ logger = logging.getLogger(__name__)
 LANGSMITH_MARKETPLACE_API_KEY = os.getenv("LANGSMITH_MARKETPLACE_API_KEY")
 LANGSMITH_MARKETPLACE_PROJECT = os.getenv("LANGSMITH_MARKETPLACE_PROJECT", "marketplace arama")
 
-ls_client = None
-if LANGSMITH_MARKETPLACE_API_KEY:
-    ls_client = LangSmithClient(
-        api_key=LANGSMITH_MARKETPLACE_API_KEY,
-        api_url="https://api.smith.langchain.com",
-    )
-
 
 @contextmanager
 def _langsmith_env():
@@ -75,6 +69,7 @@ async def search_marketplace_listings(
 ) -> dict:
     """Tavily ile web'de ürün ilanı araması yapar."""
     run_id = uuid.uuid4()
+    ls_client = langsmith_client(LANGSMITH_MARKETPLACE_API_KEY)
     if ls_client:
         ls_client.create_run(
             name="marketplace_listing_search",
@@ -0,0 +1,127 @@
+"""
+Keyset Sayfalama + NDJSON Akışı
+──────────────────────────────────────────────
+Sınırsız liste endpoint'leri için ortak yardımcılar.
+
+- Sayfalama skip yerine opak bir cursor ile yapılır (sort alanı + id).
+  Sonraki sayfanın cursor'ı X-Next-Cursor header'ında döner, böylece
+  yanıt gövdesi eskisi gibi düz bir liste kalır.
+- limit ve cursor verilmezse liste eskisi gibi tamamıdır (mevcut
+  istemciler sessizce kesilmesin); sayfalamak isteyen limit gönderir.
+- stream=true ile tüm sonuç NDJSON olarak (satır başına bir belge) akıtılır.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 500
+STREAM_BATCH_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+def encode_cursor(doc: dict, sort_field: str) -> str:
+    value = doc.get(sort_field)
+    payload = {"id": doc.get("id")}
+    if isinstance(value, datetime):
+        payload["dt"] = value.isoformat()
+    else:
+        payload["v"] = value
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[Any, Any]:
+    """Cursor'ı (sort değeri, id) çiftine çözer."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(payload, dict):
+            raise ValueError("cursor bir nesne değil")
+        value = datetime.fromisoformat(payload["dt"]) if "dt" in payload else payload.get("v")
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
+    return value, payload.get("id")
+
+
+def _after_cursor(sort_field: str, direction: int, cursor: str) -> dict:
+    value, last_id = decode_cursor(cursor)
+    op = "$gt" if direction > 0 else "$lt"
+    if sort_field == "id":
+        return {"id": {op: last_id}}
+    return {"$or": [
+        {sort_field: {op: value}},
+        {sort_field: value, "id": {op: last_id}},
+    ]}
+
+
+def _sort_spec(sort_field: str, direction: int) -> list[tuple[str, int]]:
+    if sort_field == "id":
+        return [("id", direction)]
+    return [(sort_field, direction), ("id", direction)]
+
+
+def stream_ndjson(col, query: dict, projection: dict, sort_field: str, direction: int) -> StreamingResponse:
+    """Sorgunun tamamını NDJSON olarak akıtır (bellekte biriktirmeden)."""
+    cursor = (
+        col.find(query, projection)
+        .sort(_sort_spec(sort_field, direction))
+        .batch_size(STREAM_BATCH_SIZE)
+    )
+
+    def _lines():
+        for doc in cursor:
+            doc.pop("_id", None)
+            yield (json.dumps(doc, ensure_ascii=False, default=_json_default) + "\n").encode("utf-8")
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
+def paginated_find(
+    col,
+    query: dict,
+    projection: dict,
+    response: Response,
+    sort_field: str = "id",
+    direction: int = -1,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+):
+    """Keyset sayfalı liste ya da stream=true ise NDJSON akışı döndürür.
+
+    limit ve cursor ikisi de yoksa tüm liste döner (sayfasız). Cursor
+    limitsiz gelirse DEFAULT_PAGE_LIMIT kullanılır.
+    projection'da sort alanı ve id bulunmalıdır (cursor için).
+    """
+    if stream:
+        return stream_ndjson(col, query, projection, sort_field, direction)
+
+    if limit is None and not cursor:
+        docs = list(col.find(query, projection).sort(_sort_spec(sort_field, direction)))
+        for d in docs:
+            d.pop("_id", None)
+        return docs
+    if limit is None:
+        limit = DEFAULT_PAGE_LIMIT
+
+    limit = max(1, min(limit, MAX_PAGE_LIMIT))
+    if cursor:
+        query = {"$and": [query, _after_cursor(sort_field, direction, cursor)]}
+
+    # Bir fazlasını çek — sonraki sayfa var mı anlamak için
+    docs = list(col.find(query, projection).sort(_sort_spec(sort_field, direction)).limit(limit + 1))
+    if len(docs) > limit:
+        docs = docs[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(docs[-1], sort_field)
+    for d in docs:
+        d.pop("_id", None)
+    return docs
@@ -13,7 +13,8 @@ import uuid
 from datetime import datetime
 
 from dotenv import load_dotenv
-from langsmith import Client as LangSmithClient
+
+from sdk_clients import langsmith_client
 
 load_dotenv()
 
@@ -23,13 +24,6 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 LANGSMITH_PRICE_API_KEY = os.getenv("LANGSMITH_PRICE_API_KEY")
 LANGSMITH_PRICE_PROJECT = os.getenv("LANGSMITH_PRICE_PROJECT", "fiyatarama")
 
-ls_client = None
-if LANGSMITH_PRICE_API_KEY:
-    ls_client = LangSmithClient(
-        api_key=LANGSMITH_PRICE_API_KEY,
-        api_url="https://api.smith.langchain.com",
-    )
-
 
 async def search_marketplace_prices(
     product_name: str,
@@ -37,6 +31,7 @@ async def search_marketplace_prices(
     time_period: str = "24_hours",
 ) -> dict:
     run_id = uuid.uuid4()
+    ls_client = langsmith_client(LANGSMITH_PRICE_API_KEY)
     if ls_client:
         ls_client.create_run(
             name="marketplace_price_search",
@@ -144,6 +139,8 @@ async def _extract_with_gemini(
 ) -> dict:
     """Gemini ile arama sonuçlarından fiyat verisi çıkarır."""
     from agent.config import get_google_llm
+    from agent.rate_limiter import aacquire, mark_rate_limited
+    from agent.retry import ainvoke_with_retry, retry_delay_seconds
     from langchain_core.messages import HumanMessage
 
     prompt = PRICE_EXTRACTION_PROMPT.format(
@@ -153,10 +150,20 @@ async def _extract_with_gemini(
     )
 
     last_error = None
-    for model_name in models:
+    for hop, model_name in enumerate(models):
+        if not await aacquire(model_name):
+            continue
         try:
             llm = get_google_llm(model=model_name)
-            response = await llm.ainvoke([HumanMessage(content=prompt)])
+            # Kota hatasında aynı modeli beklemek yerine sıradaki modele geç (max_retries=1)
+            response = await ainvoke_with_retry(
+                llm.ainvoke,
+                [HumanMessage(content=prompt)],
+                max_retries=1,
+                ledger_site="price_extraction",
+                ledger_model=model_name,
+                ledger_hop=hop,
+            )
             content = response.content if hasattr(response, "content") else str(response)
             return _parse_gemini_result(content, product_name)
         except Exception as e:
@@ -164,13 +171,14 @@ async def _extract_with_gemini(
             msg = str(e).lower()
             if "429" in msg or "resource_exhausted" in msg or "quota" in msg:
                 logger.warning("Model %s kota aşımı, fallback deneniyor...", model_name)
+                mark_rate_limited(model_name, retry_delay_seconds(e))
                 continue
             logger.error("Gemini extraction error: %s", e, exc_info=True)
             raise
 
     if last_error:
         raise last_error
-    return _empty_result()
+    return {**_empty_result(), "error": "Tüm modellerin kotası dolu, daha sonra tekrar deneyin"}
 
 
 def _parse_gemini_result(text: str, product_name: str) -> dict:
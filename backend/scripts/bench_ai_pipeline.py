@@ -0,0 +1,153 @@
+"""
+AI uç noktaları — uçtan uca benchmark (kayıtlı sağlayıcı yanıtlarıyla)
+/api/ai/analyze, /api/price-scraper/search ve /api/marketplace-search/search
+uygulamanın kendisi üzerinden (ASGI, ağ yok) eşzamanlı çağrılır. Her istek için:
+  - toplam süre
+  - sağlayıcıda geçen süre (Gemini / Groq / Tavily — fake_providers.provider_timer)
+  - bizim ek yükümüz = toplam − sağlayıcı (prompt kurma, ayrıştırma, MongoDB,
+    kota sayaçları, event loop'u bloklayan senkron çağrılar ...)
+
+Varsayılan AI_PROVIDER_MODE=replay: yanıtlar scripts/fixtures/ai_cassette.jsonl'dan
+gelir, kota harcanmaz. Gecikme dağılımı AI_FAKE_LATENCY ile değiştirilebilir:
+    AI_FAKE_LATENCY='{"google": "lognormal:2.0:0.4", "tavily": "uniform:0.8:1.6"}'
+Gerçek yanıtları kaydetmek için (kotadan harcar):
+    AI_PROVIDER_MODE=record AI_CASSETTE_PATH=/tmp/kaset.jsonl python scripts/bench_ai_pipeline.py
+
+MongoDB gerekir (MONGODB_URI); ayrı bir veritabanı için MONGODB_DB_NAME verin —
+fiyat / arama sonuçları ve kota sayaçları yazılır.
+
+Kullanım (backend/ dizininden):
+    python scripts/bench_ai_pipeline.py [--requests 20] [--concurrency 8] [--cache]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, __file__.rsplit("scripts", 1)[0])
+os.environ.setdefault("AI_PROVIDER_MODE", "replay")
+os.environ.setdefault("GOOGLE_API_KEY", "bench-dummy-key")
+os.environ.setdefault("LANGSMITH_TRACING", "false")
+# Yük testinde istemci tarafı kota sınırı ölçümü bozmasın
+os.environ.setdefault("LLM_QUOTAS", '{"gemini-2.5-flash": [100000, 10000000], '
+                                    '"gemini-2.5-flash-lite": [100000, 10000000]}')
+
+import httpx  # noqa: E402
+
+from agent.fake_providers import provider_timer  # noqa: E402
+from main import app  # noqa: E402
+
+_BENCH_HEADER = b"x-bench-id"
+_provider_seconds: dict[str, float] = {}
+
+
+async def timed_app(scope, receive, send):
+    """Her isteğin sağlayıcı süresini x-bench-id başlığına göre kaydeden ASGI sarmalayıcı."""
+    if scope["type"] != "http":
+        return await app(scope, receive, send)
+    bench_id = dict(scope["headers"]).get(_BENCH_HEADER, b"").decode()
+    with provider_timer() as acc:
+        try:
+            await app(scope, receive, send)
+        finally:
+            _provider_seconds[bench_id] = acc.seconds
+
+
+DESCRIPTIONS = [
+    "pilav arabası paslanmaz 80 cm alış 4500 satış 6000",
+    "çift kapılı buzdolabı 1200 litre, alış 18 bin",
+    "100 litre gazlı çorba kazanı",
+    "spiral mikser 50 kg hamur kapasiteli",
+    "6 gözlü gazlı ocak fırınlı",
+    "konveksiyonlu fırın 10 tepsili buharlı",
+]
+PRODUCT_TYPES = [
+    ("Arabalar", "pilav_arabasi", "Pilav Arabası"),
+    ("Kazanlar", "corba_kazani", "Çorba Kazanı"),
+    ("Ocaklar", "gazli_ocak", "Gazlı Ocak"),
+]
+
+
+def _analyze(i: int, nonce: str) -> dict:
+    # Nonce analiz önbelleğini atlatır (--cache verilmezse)
+    return {"data": {"description": f"{DESCRIPTIONS[i % len(DESCRIPTIONS)]} {nonce}".strip()}}
+
+
+def _price(i: int, nonce: str) -> dict:
+    name, value, label = PRODUCT_TYPES[i % len(PRODUCT_TYPES)]
+    return {"json": {
+        "category_id": 1, "category_name": name, "product_type": value,
+        "product_type_label": label, "location": "İzmir",
+    }}
+
+
+def _marketplace(i: int, nonce: str) -> dict:
+    return {"json": {"query": PRODUCT_TYPES[i % len(PRODUCT_TYPES)][2], "location": "İzmir"}}
+
+
+SCENARIOS = [
+    ("POST /api/ai/analyze", "/api/ai/analyze", _analyze),
+    ("POST /api/price-scraper/search", "/api/price-scraper/search", _price),
+    ("POST /api/marketplace-search/search", "/api/marketplace-search/search", _marketplace),
+]
+
+
+def _pct(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, round(p / 100 * (len(values) - 1)))] if values else 0.0
+
+
+async def run(n: int, concurrency: int, use_cache: bool) -> None:
+    sem = asyncio.Semaphore(concurrency)
+    samples: dict[str, list[tuple[float, float, int]]] = {name: [] for name, _, _ in SCENARIOS}
+    transport = httpx.ASGITransport(app=timed_app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        async def one(name: str, path: str, build, i: int) -> None:
+            bench_id = uuid.uuid4().hex
+            nonce = "" if use_cache else f"#{bench_id[:6]}"
+            async with sem:
+                start = time.perf_counter()
+                resp = await client.post(path, headers={"x-bench-id": bench_id}, **build(i, nonce))
+                elapsed = time.perf_counter() - start
+            samples[name].append((elapsed, _provider_seconds.pop(bench_id, 0.0), resp.status_code))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            one(name, path, build, i)
+            for i in range(n)
+            for name, path, build in SCENARIOS
+        ))
+        wall = time.perf_counter() - started
+
+    print(f"\n{n} istek/uç nokta, eşzamanlılık {concurrency}, mod {os.environ['AI_PROVIDER_MODE']}, "
+          f"toplam {wall:.2f} sn ({n * len(SCENARIOS) / wall:.1f} istek/sn)\n")
+    print(f"{'Uç nokta':<36} {'hata':>4} {'toplam p50':>10} {'p95':>7} {'sağlayıcı p50':>13} "
+          f"{'ek yük p50':>10} {'p95':>7} {'ek yük %':>8}")
+    for name, rows in samples.items():
+        totals = [t for t, _, _ in rows]
+        providers = [p for _, p, _ in rows]
+        overheads = [max(0.0, t - p) for t, p, _ in rows]
+        errors = sum(1 for _, _, code in rows if code >= 400)
+        share = sum(overheads) / sum(totals) if sum(totals) else 0.0
+        print(f"{name:<36} {errors:>4} {_pct(totals, 50):>9.3f}s {_pct(totals, 95):>6.3f}s "
+              f"{_pct(providers, 50):>12.3f}s {_pct(overheads, 50):>9.3f}s {_pct(overheads, 95):>6.3f}s "
+              f"{share:>8.1%}")
+    all_overheads = [max(0.0, t - p) for rows in samples.values() for t, p, _ in rows]
+    print(f"\nEk yük ortalaması: {statistics.mean(all_overheads) * 1000:.0f} ms/istek")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20, help="uç nokta başına istek sayısı")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--cache", action="store_true", help="analiz önbelleğini atlatma")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency, args.cache))
+
+
+if __name__ == "__main__":
+    main()
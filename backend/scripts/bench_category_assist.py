@@ -0,0 +1,195 @@
+"""
+Kategori asistanı — patch modu vs. tam üretim benchmark'ı
+Büyük kategoriler üzerinde tipik düzenleme talimatları için:
+  - çıktı boyutu (tahmini token): işlem listesi vs. kategorinin tamamı
+  - --live: gerçek model çağrısı ile çıktı token'ı (usage_metadata) ve gecikme
+
+Kategoriler şema kayıt defterinin seed tanımları + product_specs'ten kurulur; ayrıca
+tüm çeşitlerin tek kategoride toplandığı sentetik bir "en kötü durum" vardır.
+Çevrimdışı modda ağ ve veritabanı kullanılmaz; çıktı boyutu, beklenen
+işlemlerden (patch) ve bunların uygulanmış sonucundan (tam) hesaplanır.
+
+Kullanım (backend/ dizininden):
+    python scripts/bench_category_assist.py [--live] [--runs N]
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, __file__.rsplit("scripts", 1)[0])
+os.environ.setdefault("GOOGLE_API_KEY", "bench-dummy-key")
+os.environ.setdefault("SCHEMA_REGISTRY_SOURCE", "seed")
+
+from agent.agent import _estimate_tokens  # noqa: E402
+from agent.category_assist import (  # noqa: E402
+    CATEGORY_ASSIST_PROMPT,
+    CATEGORY_PATCH_PROMPT,
+    CATEGORY_SCHEMA,
+    OPERATIONS_SCHEMA,
+    apply_operations,
+)
+from agent.output_schema import field_schema  # noqa: E402
+from agent.schema_registry import get_registry  # noqa: E402
+
+_UNITS = {"_cm": "cm", "_mm": "mm", "_kg": "kg", "_kw": "kW", "_liters": "L", "_lt": "L"}
+
+# (talimat, beklenen işlemler) — {type} kategorinin ilk çeşidiyle doldurulur
+EDITS: list[tuple[str, list[dict]]] = [
+    (
+        "İlk çeşide garanti süresi alanı ekle (ay)",
+        [{"op": "add_field", "type": "{type}", "field": "garanti_suresi", "label": "Garanti Süresi",
+          "field_type": "number", "unit": "ay"}],
+    ),
+    (
+        "Kategori geneline menşei alanı ekle: Yerli, İthal",
+        [{"op": "add_field", "type": "", "field": "mensei", "label": "Menşei",
+          "field_type": "select", "options": ["Yerli", "İthal"]}],
+    ),
+    (
+        "İlk çeşidin adını 'Standart Model' yap",
+        [{"op": "rename", "type": "{type}", "label": "Standart Model"}],
+    ),
+    (
+        "İlk çeşidi sil",
+        [{"op": "remove", "type": "{type}"}],
+    ),
+    (
+        "Yeni çeşit ekle: Mini Model, genişlik ve yükseklik alanlarıyla",
+        [
+            {"op": "add_type", "type": "mini_model", "label": "Mini Model"},
+            {"op": "add_field", "type": "mini_model", "field": "width_cm", "label": "Genişlik",
+             "field_type": "number", "unit": "cm"},
+            {"op": "add_field", "type": "mini_model", "field": "height_cm", "label": "Yükseklik",
+             "field_type": "number", "unit": "cm"},
+        ],
+    ),
+]
+
+
+def _field(category: str, name: str, info: dict) -> dict:
+    schema = field_schema(category, name, info)
+    field = {"name": name, "label": schema.get("description") or name.replace("_", " ").title()}
+    if "enum" in schema:
+        field.update(type="select", options=schema["enum"])
+    elif schema["type"] in ("number", "integer"):
+        field["type"] = "number"
+    else:
+        field["type"] = "text"
+    unit = next((u for suffix, u in _UNITS.items() if name.endswith(suffix)), None)
+    if unit:
+        field["unit"] = unit
+    return field
+
+
+def build_category(name: str, info: dict) -> dict:
+    fields = [_field(name, f, info) for f in info["fields"]]
+    return {
+        "name": name,
+        "description": f"{name} kategorisi",
+        "product_types": [
+            {"value": t, "label": t.replace("_", " ").title(), "fields": [dict(f) for f in fields]}
+            for t in info["types"]
+        ],
+        "default_fields": [],
+    }
+
+
+def bench_categories() -> list[dict]:
+    categories = get_registry().prompt_categories
+    ranked = sorted(
+        categories.items(),
+        key=lambda kv: len(kv[1]["types"]) * len(kv[1]["fields"]),
+        reverse=True,
+    )
+    cats = [build_category(n, i) for n, i in ranked[:3]]
+    merged = {"name": "Tüm Ekipmanlar (sentetik)", "description": "", "product_types": [], "default_fields": []}
+    for n, i in categories.items():
+        merged["product_types"] += build_category(n, i)["product_types"]
+    cats.append(merged)
+    return cats
+
+
+def _fill(ops: list[dict], type_value: str) -> list[dict]:
+    return [{k: (v.replace("{type}", type_value) if isinstance(v, str) else v) for k, v in op.items()} for op in ops]
+
+
+def offline(categories: list[dict]) -> None:
+    print(f"{'Kategori':<28} {'çeşit':>5} {'tam (tok)':>10} {'patch (tok)':>12} {'oran':>7}")
+    total_full = total_patch = 0
+    for cat in categories:
+        first = cat["product_types"][0]["value"]
+        full_tokens = patch_tokens = 0
+        for _, ops in EDITS:
+            ops = _fill(ops, first)
+            updated, skipped = apply_operations(cat, ops)
+            assert not skipped, skipped
+            message = "Değişiklik uygulandı."
+            full_tokens += _estimate_tokens(json.dumps({**updated, "message": message}, ensure_ascii=False, indent=2))
+            patch_tokens += _estimate_tokens(json.dumps({"operations": ops, "message": message}, ensure_ascii=False))
+        total_full += full_tokens
+        total_patch += patch_tokens
+        print(f"{cat['name'][:28]:<28} {len(cat['product_types']):>5} {full_tokens / len(EDITS):>10.0f} "
+              f"{patch_tokens / len(EDITS):>12.0f} {patch_tokens / full_tokens:>7.1%}")
+    print(f"\nOrtalama çıktı: tam {total_full / len(categories) / len(EDITS):.0f} token, "
+          f"patch {total_patch / len(categories) / len(EDITS):.0f} token "
+          f"({1 - total_patch / total_full:.0%} azalma, tahmini)")
+
+
+async def _call(prompt: str, schema: dict) -> tuple[int, float, bool]:
+    from langchain_core.messages import HumanMessage
+
+    from agent.config import GOOGLE_MODEL, bind_google_json, get_google_llm
+
+    llm = bind_google_json(get_google_llm(model=GOOGLE_MODEL), schema)
+    start = time.perf_counter()
+    response = await llm.ainvoke([HumanMessage(content=prompt)])
+    elapsed = time.perf_counter() - start
+    usage = getattr(response, "usage_metadata", None) or {}
+    tokens = usage.get("output_tokens") or _estimate_tokens(response.content)
+    try:
+        ok = isinstance(json.loads(response.content), dict)
+    except (TypeError, json.JSONDecodeError):
+        ok = False
+    return tokens, elapsed, ok
+
+
+async def live(categories: list[dict], runs: int) -> None:
+    print(f"{'Kategori':<28} {'mod':<6} {'çıktı tok':>10} {'gecikme':>9} {'geçerli':>8}")
+    for cat in categories:
+        first = cat["product_types"][0]["value"]
+        for mode in ("full", "patch"):
+            tokens = elapsed = valid = 0
+            n = 0
+            for instruction, _ in EDITS:
+                instruction = instruction.replace("{type}", first)
+                if mode == "full":
+                    prompt = CATEGORY_ASSIST_PROMPT.format(
+                        current_data=json.dumps(cat, ensure_ascii=False, indent=2), user_message=instruction)
+                    schema = CATEGORY_SCHEMA
+                else:
+                    prompt = CATEGORY_PATCH_PROMPT.format(
+                        current_data=json.dumps(cat, ensure_ascii=False, separators=(",", ":")),
+                        user_message=instruction)
+                    schema = OPERATIONS_SCHEMA
+                for _ in range(runs):
+                    t, e, ok = await _call(prompt, schema)
+                    tokens += t
+                    elapsed += e
+                    valid += ok
+                    n += 1
+            print(f"{cat['name'][:28]:<28} {mode:<6} {tokens / n:>10.0f} {elapsed / n:>8.2f}s {valid}/{n:>6}")
+
+
+def main() -> None:
+    runs = int(sys.argv[sys.argv.index("--runs") + 1]) if "--runs" in sys.argv else 1
+    categories = bench_categories()
+    if "--live" in sys.argv:
+        asyncio.run(live(categories, runs))
+    else:
+        offline(categories)
+
+
+if __name__ == "__main__":
+    main()
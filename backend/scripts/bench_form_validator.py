@@ -0,0 +1,76 @@
+"""
+Ürün formu doğrulama hızı mikro benchmark'ı
+validate_product_form aracı (JSON string + genel kurallar) vs.
+kategori/çeşit bazlı derlenmiş doğrulayıcı (form_validator).
+
+Ağ / veritabanı kullanmaz (kategori tanımları seed_fields'ten).
+Kullanım (backend/ dizininden):
+    python scripts/bench_form_validator.py [satir_sayisi]
+"""
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, __file__.rsplit("scripts", 1)[0])
+os.environ.setdefault("GOOGLE_API_KEY", "bench-dummy-key")
+os.environ.setdefault("SCHEMA_REGISTRY_SOURCE", "seed")
+
+from agent.form_validator import clear_cache, validate_product  # noqa: E402
+from agent.tools.validator import validate_product_form  # noqa: E402
+
+TYPES = [
+    ("Arabalar", "pilav_arabasi"),
+    ("Fırınlar", "konveksiyonlu_firin"),
+    ("Benmari", "sulu_benmari"),
+    ("Ocaklar", "wok_ocagi"),
+    ("Kazanlar", None),
+]
+
+
+def _row(i: int) -> tuple[dict, str, str]:
+    category, product_type = TYPES[i % len(TYPES)]
+    return {
+        "name": f"Ürün {i}",
+        "product_type": product_type,
+        "purchase_price": str(random.randint(1000, 50000)),
+        "sale_price": random.randint(1000, 60000),
+        "negotiation_type": "amount",
+        "status": "working",
+        "stock_status": "available",
+        "extra_specs": {
+            "width_cm": "80",
+            "height_cm": 90,
+            "brand": "Öztiryakiler",
+            "production_year": 2019,
+            "has_steam": "evet",
+            "gn_pan_count": "4",
+            "energy_type": "gaz",
+        },
+    }, category, product_type
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rows = [_row(i) for i in range(n)]
+
+    start = time.perf_counter()
+    for data, category, _ in rows:
+        validate_product_form.invoke(json.dumps({"product_data": data, "category_name": category}))
+    before = time.perf_counter() - start
+
+    clear_cache()
+    start = time.perf_counter()
+    errors = 0
+    for data, category, product_type in rows:
+        errors += not validate_product(data, category, product_type).ok
+    after = time.perf_counter() - start
+
+    print(f"{'validate_product_form aracı':<30} {n / before:>10,.0f} satır/sn")
+    print(f"{'derlenmiş doğrulayıcı':<30} {n / after:>10,.0f} satır/sn  ({errors} geçersiz)")
+    print(f"\nHızlanma: {before / after:.1f}x  ({n} satır, {len(TYPES)} kategori/çeşit)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+LLM istemci kurulum maliyeti mikro benchmark'ı
+Her çağrıda yeni ChatGoogleGenerativeAI oluşturma vs. kayıt defterinden alma.
+
+Ağ çağrısı yapmaz — sadece istemci kurulum süresini ölçer.
+Kullanım (backend/ dizininden):
+    python scripts/bench_llm_registry.py [tekrar_sayisi]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, __file__.rsplit("scripts", 1)[0])
+os.environ.setdefault("GOOGLE_API_KEY", "bench-dummy-key")
+
+from agent.config import GOOGLE_MODEL, get_google_llm, new_google_llm  # noqa: E402
+from agent import llm_registry  # noqa: E402
+
+
+def _bench(label: str, fn, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    per_call_ms = (time.perf_counter() - start) * 1000 / n
+    print(f"{label:<28} {per_call_ms:9.3f} ms/çağrı")
+    return per_call_ms
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    # İlk import/kurulum maliyetini ölçümden çıkar
+    new_google_llm(model=GOOGLE_MODEL)
+
+    before = _bench("önce (her çağrıda yeni)", lambda: new_google_llm(model=GOOGLE_MODEL), n)
+    llm_registry.clear()
+    after = _bench("sonra (kayıt defteri)", lambda: get_google_llm(model=GOOGLE_MODEL), n)
+
+    if after > 0:
+        print(f"\nHızlanma: {before / after:,.0f}x  ({n} çağrı, model={GOOGLE_MODEL})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Kategori ön sınıflandırıcı — çevrimdışı doğruluk ve prompt boyutu benchmark'ı
+Etiketli örnek açıklamalar üzerinde:
+  - top-1 doğruluk ve aday listesinin doğru kategoriyi içerme oranı (recall@k)
+  - güvenli (daraltılmış prompt) karar oranı ve bu kararlardaki hata oranı
+  - tam prompt vs. daraltılmış prompt karakter / tahmini token boyutu
+  - sınıflandırma süresi
+
+Ağ ve veritabanı kullanmaz.
+Kullanım (backend/ dizininden):
+    python scripts/bench_preclassifier.py [-v]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, __file__.rsplit("scripts", 1)[0])
+os.environ.setdefault("GOOGLE_API_KEY", "bench-dummy-key")
+os.environ.setdefault("SCHEMA_REGISTRY_SOURCE", "seed")
+
+from agent.agent import (  # noqa: E402
+    get_category_classifier,
+    narrowed_prompt_prefix,
+    prompt_state,
+)
+from agent.config import PRECLASSIFIER_TOP_K  # noqa: E402
+
+# (açıklama, doğru kategori)
+SAMPLES: list[tuple[str, str]] = [
+    ("pilav arabası paslanmaz 80 cm alış 4500 satış 6000", "Arabalar"),
+    ("kokoreç arabası camlı tezgahlı, 120x70", "Arabalar"),
+    ("tantuni arabası sıfır ayarında", "Arabalar"),
+    ("çift kapılı buzdolabı 1200 litre, alış 18 bin", "Buzdolapları"),
+    ("içecek dolabı teşhirli tek kapı", "Buzdolapları"),
+    ("buzdolabı vitrinli pastane tipi 150 cm", "Buzdolapları"),
+    ("derin dondurucu sandık tipi 400 lt", "Dondurucular"),
+    ("yatay dondurucu dondurma için camlı", "Dondurucular"),
+    ("ada tipi davlumbaz 200 cm motorlu", "Aspiratörler"),
+    ("duvar tipi aspiratör 150 cm filtreli", "Aspiratörler"),
+    ("100 litre gazlı çorba kazanı", "Kazanlar"),
+    ("çift cidarlı kazan 150 lt elektrikli", "Kazanlar"),
+    ("et kıyma makinesi 32 numara", "Kesme Makineleri"),
+    ("salam dilimleme makinesi 30 cm bıçak", "Kesme Makineleri"),
+    ("spiral mikser 50 kg hamur kapasiteli", "Mikserler"),
+    ("planet mikser 20 litre kazanlı", "Mikserler"),
+    ("basınçlı fritöz 2 hazneli", "Fritözler"),
+    ("elektrikli fritöz 8+8 litre", "Fritözler"),
+    ("kontakt ızgara döküm plakalı", "Izgaralar"),
+    ("gazlı ızgara 4 brülörlü lavtaşlı", "Izgaralar"),
+    ("tost makinesi 20 dilim sandviç", "Tost Makineleri"),
+    ("panini makinesi çift plaka", "Tost Makineleri"),
+    ("2 gruplu espresso makinesi", "Kahve Makineleri"),
+    ("türk kahvesi makinesi 4 hazneli", "Kahve Makineleri"),
+    ("gazlı çay kazanı 3 musluklu 40 lt", "Çay Kazanları"),
+    ("semaver 20 litre elektrikli", "Çay Kazanları"),
+    ("giyotin tipi bulaşık makinesi", "Bulaşık Makineleri"),
+    ("tezgah altı bulaşık yıkama makinesi 40 sepet", "Bulaşık Makineleri"),
+    ("konveyörlü ekmek kızartma makinesi", "Ekmek Kızartma Makineleri"),
+    ("gazlı döner makinesi 4 brülörlü 60 kg", "Döner Makineleri"),
+    ("elektrikli döner ocağı dikey", "Döner Makineleri"),
+    ("taş fırın lahmacun pide için 150 cm", "Pizza Fırınları"),
+    ("tünel pizza fırını konveyörlü", "Pizza Fırınları"),
+    ("elektrikli krep makinesi 40 cm plaka", "Krep Makineleri"),
+    ("gözleme sacı gazlı", "Krep Makineleri"),
+    ("waffle makinesi çift kalıplı", "Waffle Makineleri"),
+    ("duvar rafı paslanmaz 120 cm 2 katlı", "Raflar"),
+    ("delikli raf 4 katlı depo için", "Raflar"),
+    ("sulu benmari 4 gn küvetli", "Benmari"),
+    ("self servis sıcak tutucu", "Benmari"),
+    ("çift gözlü evye damlalıklı 140 cm", "Evyeler"),
+    ("tek gözlü eviye paslanmaz", "Evyeler"),
+    ("konveksiyonlu fırın 10 tepsili buharlı", "Fırınlar"),
+    ("rotary fırın pastane için", "Fırınlar"),
+    ("6 gözlü gazlı ocak fırınlı", "Ocaklar"),
+    ("wok ocağı tek gözlü yüksek basınçlı", "Ocaklar"),
+    ("paslanmaz çelik tezgah 180x70 alt raflı", "Tezgahlar"),
+    ("granit tezgah hazırlık için", "Tezgahlar"),
+    ("Hobart marka cihaz, az kullanılmış", "Bulaşık Makineleri"),
+    ("endüstriyel makine, sağlam, temiz", "Mikserler"),
+]
+
+
+def main() -> None:
+    verbose = "-v" in sys.argv
+    classifier = get_category_classifier()
+    full_prefix = prompt_state().prefix
+
+    top1 = recall = confident = confident_wrong = 0
+    full_chars = narrowed_chars = 0
+    start = time.perf_counter()
+    decisions = []
+    for text, expected in SAMPLES:
+        ranked = classifier.scores(text)
+        cands = classifier.candidates(text, top_k=PRECLASSIFIER_TOP_K)
+        decisions.append((text, expected, ranked[:3], cands))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    for text, expected, ranked, cands in decisions:
+        top1 += ranked[0][0] == expected
+        recall += expected in [c for c, _ in ranked[:PRECLASSIFIER_TOP_K]]
+        full_chars += len(full_prefix)
+        if cands:
+            confident += 1
+            confident_wrong += expected not in cands
+            narrowed_chars += len(narrowed_prompt_prefix(tuple(cands)))
+        else:
+            narrowed_chars += len(full_prefix)
+        if verbose or (cands and expected not in cands):
+            mark = "ok " if cands and expected in cands else ("-- " if not cands else "HATA")
+            print(f"{mark} {text[:45]:<45} → {cands or 'tam prompt'}  (beklenen: {expected})")
+
+    n = len(SAMPLES)
+    print()
+    print(f"Örnek sayısı                 : {n}")
+    print(f"Top-1 doğruluk               : {top1 / n:6.1%}")
+    print(f"Recall@{PRECLASSIFIER_TOP_K}                     : {recall / n:6.1%}")
+    print(f"Daraltılmış prompt oranı     : {confident / n:6.1%}")
+    print(f"Daraltılmış kararlarda hata  : {confident_wrong}/{confident} (→ tam prompt ile 2. çağrı)")
+    print(f"Ort. önek boyutu (tam)       : {full_chars / n:8.0f} karakter (~{full_chars / n / 3:.0f} token)")
+    print(f"Ort. önek boyutu (daraltılmış): {narrowed_chars / n:7.0f} karakter (~{narrowed_chars / n / 3:.0f} token)")
+    print(f"Sınıflandırma süresi         : {elapsed_ms / n:8.3f} ms/açıklama")
+
+
+if __name__ == "__main__":
+    main()
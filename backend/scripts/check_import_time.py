@@ -0,0 +1,131 @@
+"""
+Açılış süresi bütçe kontrolü (python -X importtime)
+Modül (varsayılan main) temiz bir yorumlayıcıda import edilir ve:
+  - doğrudan importların toplam süresi bütçeyi aşarsa
+  - ağır SDK'lardan (cloudinary, langchain, langsmith, tavily, groq,
+    google genai) biri açılışta yüklenirse
+çıkış kodu 1 olur — build'i düşürmek için CI'da çalıştırılır.
+
+Modülün kendi gövdesi (init_db, seed gibi veritabanı işleri) süreye
+dahil edilmez; sadece import zinciri ölçülür. Birden fazla çalıştırmada
+en iyi sonuç alınır (disk önbelleği gürültüsü).
+
+Varsayılan bütçe (700 ms) yeni tabanın (~540–640 ms) biraz üstünde,
+tembel importlardan önceki ölçümün (~750 ms) altındadır: ağır bir SDK
+tekrar açılışa sızarsa kontrol düşer. Taban değişirse bütçe de
+güncellenmelidir.
+
+MONGODB_URI verilmezse geçersiz bir adres kullanılır (bağlantı kurulamaz,
+main yine import edilir — sadece daha uzun sürer).
+
+Kullanım (backend/ dizininden):
+    python scripts/check_import_time.py [--module main] [--budget-ms 700] [--runs 3] [--top 15]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+BACKEND_DIR = __file__.rsplit("scripts", 1)[0] or "."
+
+# Açılışta yüklenmemesi gereken modüller (önek)
+HEAVY_SDKS = (
+    "cloudinary",
+    "langchain",
+    "langchain_core",
+    "langchain_google_genai",
+    "langchain_groq",
+    "langsmith",
+    "langgraph",
+    "tavily",
+    "groq",
+    "google.genai",
+    "google.generativeai",
+)
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int, int]]:
+    """importtime çıktısı → (modül, derinlik, kendi µs, toplam µs)."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            depth = (len(m.group(3)) - 1) // 2
+            rows.append((m.group(4), depth, int(m.group(1)), int(m.group(2))))
+    return rows
+
+
+def measure(module: str) -> list[tuple[str, int, int, int]]:
+    env = dict(os.environ)
+    env.setdefault("MONGODB_URI", "mongodb://127.0.0.1:1")
+    env.setdefault("SCHEMA_REGISTRY_SOURCE", "seed")
+    env.setdefault("LANGSMITH_TRACING", "false")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    rows = parse_importtime(proc.stderr)
+    if proc.returncode != 0 or not rows:
+        print(proc.stderr[-2000:], file=sys.stderr)
+        raise SystemExit(f"{module} import edilemedi (çıkış kodu {proc.returncode})")
+    # Yorumlayıcı açılışını (site ve bağımlılıkları) at
+    starts = [i for i, (name, depth, *_) in enumerate(rows) if name == "site" and depth == 0]
+    return rows[starts[-1] + 1:] if starts else rows
+
+
+def chain_us(rows: list[tuple[str, int, int, int]], module: str) -> int:
+    """Modülün gövdesi hariç import zinciri: doğrudan importlar + üst paketler."""
+    return sum(
+        cum for name, depth, _, cum in rows
+        if depth == 1 or (depth == 0 and name != module)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=700)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(max(1, args.runs)):
+        rows = measure(args.module)
+        total_us = chain_us(rows, args.module)
+        if best is None or total_us < best[0]:
+            best = (total_us, rows)
+    total_us, rows = best
+
+    print(f"{args.module}: import zinciri {total_us / 1000:.0f} ms (bütçe {args.budget_ms:.0f} ms)\n")
+    print(f"{'toplam ms':>10} {'kendi ms':>9}  modül")
+    children = [r for r in rows if r[0] != args.module]
+    for name, depth, own, cum in sorted(children, key=lambda r: r[3], reverse=True)[:args.top]:
+        print(f"{cum / 1000:>10.1f} {own / 1000:>9.1f}  {'  ' * max(depth - 1, 0)}{name}")
+
+    failed = False
+    heavy = sorted({
+        name for name, *_ in rows
+        if any(name == sdk or name.startswith(sdk + ".") for sdk in HEAVY_SDKS)
+    })
+    if heavy:
+        roots = sorted({n for n in heavy if "." not in n} or heavy)
+        print(f"\nHATA: açılışta ağır SDK yüklendi: {', '.join(roots)}")
+        failed = True
+    if total_us / 1000 > args.budget_ms:
+        print(f"\nHATA: import süresi bütçeyi aştı ({total_us / 1000:.0f} > {args.budget_ms:.0f} ms)")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
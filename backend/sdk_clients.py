@@ -0,0 +1,51 @@
+"""
+Ağır SDK'lara gecikmeli erişim
+─────────────────────────────────────────────────────────────
+cloudinary, langsmith ve tavily modül seviyesinde import edilmez;
+ilk kullanımda burada yüklenir ve istemci tekrar kullanılır. Böylece
+main.py'yi import eden worker'lar ve AI'a dokunmayan CLI script'leri
+(seed, migration) bu SDK'ların açılış süresini ve belleğini ödemez.
+
+LLM istemcileri için: agent/llm_registry.py.
+Açılış bütçesi kontrolü: scripts/check_import_time.py.
+"""
+import functools
+import threading
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from langsmith import Client as LangSmithClient
+    from tavily import TavilyClient
+
+_lock = threading.Lock()
+_cloudinary_ready = False
+
+
+def cloudinary_uploader() -> Any:
+    """Yapılandırılmış cloudinary.uploader modülü (CLOUDINARY_URL env'den)."""
+    global _cloudinary_ready
+    import cloudinary
+    import cloudinary.uploader
+
+    if not _cloudinary_ready:
+        with _lock:
+            if not _cloudinary_ready:
+                cloudinary.config(secure=True)
+                _cloudinary_ready = True
+    return cloudinary.uploader
+
+
+@functools.lru_cache(maxsize=None)
+def langsmith_client(api_key: Optional[str]) -> Optional["LangSmithClient"]:
+    """Proje bazlı LangSmith istemcisi; anahtar yoksa None."""
+    if not api_key:
+        return None
+    from langsmith import Client
+
+    return Client(api_key=api_key, api_url="https://api.smith.langchain.com")
+
+
+def tavily_client(api_key: str) -> "TavilyClient":
+    from tavily import TavilyClient
+
+    return TavilyClient(api_key=api_key)
@@ -7,11 +7,15 @@ Facebook Marketplace bireysel ilan linkleri + çoklu kaynak desteği.
 import logging
 import os
 import re
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from urllib.parse import quote
 
 from dotenv import load_dotenv
-from tavily import TavilyClient
+
+from sdk_clients import tavily_client
+
+if TYPE_CHECKING:
+    from tavily import TavilyClient
 
 load_dotenv()
 
@@ -23,10 +27,18 @@ MIN_REAL_PRICE_TL = 50
 MAX_REAL_PRICE_TL = 150_000
 
 
-def _get_client() -> TavilyClient:
+def _get_client() -> "TavilyClient":
+    from agent.config import AI_PROVIDER_MODE
+    if AI_PROVIDER_MODE != "live":
+        from agent.fake_providers import search_client
+        return search_client(_real_client)
+    return _real_client()
+
+
+def _real_client() -> "TavilyClient":
     if not TAVILY_API_KEY:
         raise RuntimeError("TAVILY_API_KEY ortam değişkeni ayarlanmamış")
-    return TavilyClient(api_key=TAVILY_API_KEY)
+    return tavily_client(TAVILY_API_KEY)
 
 
 def _normalize_turkish(text: str) -> str:
@@ -1,8 +1,11 @@
 """
 MongoDB kategorilerine product_types (alanlarıyla) ve default_fields ekleyen seed script.
 categoryTemplates.ts verisini Python dict'lere dönüştürür.
+
+SEED_DATA kategori tanımlarının tek seed kaynağıdır: şema kayıt defteri
+(veritabanı boşken), /api/categories/seed-product-types ve
+seed_product_types.py buradan okur.
 """
-from database import categories_col
 from datetime import datetime, timezone
 
 
@@ -588,7 +591,16 @@ SEED_DATA = {
 }
 
 
+# Kategori → [{"value", "label"}] (alanlar olmadan)
+SEED_PRODUCT_TYPES: dict[str, list[dict]] = {
+    name: [{"value": pt["value"], "label": pt["label"]} for pt in seed["product_types"]]
+    for name, seed in SEED_DATA.items()
+}
+
+
 def main():
+    from database import categories_col
+
     updated = 0
     not_found = 0
 
@@ -0,0 +1,27 @@
+"""
+Dükkan Saat Dilimi
+──────────────────────────────────────────────
+Veritabanındaki tarihler naive UTC olarak saklanır (datetime.utcnow()).
+Gün/ay sınırları ise dükkanın yerel saatine göre hesaplanmalıdır;
+aksi halde Türkiye'de 21:00'den sonra eklenen kayıtlar ertesi güne düşer.
+
+SHOP_TIMEZONE ortam değişkeni ile değiştirilebilir (varsayılan Europe/Istanbul).
+"""
+import os
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+SHOP_TIMEZONE: str = os.getenv("SHOP_TIMEZONE", "Europe/Istanbul")
+SHOP_TZ = ZoneInfo(SHOP_TIMEZONE)
+
+
+def local_day_start_utc(day: date) -> datetime:
+    """Yerel günün başlangıcını naive UTC datetime olarak döndürür."""
+    local_midnight = datetime.combine(day, time.min, tzinfo=SHOP_TZ)
+    return local_midnight.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def local_day_range_utc(start: date, end: date) -> tuple[datetime, datetime]:
+    """[start, end] yerel gün aralığını yarı açık [başlangıç, bitiş) UTC aralığına çevirir."""
+    return local_day_start_utc(start), local_day_start_utc(end + timedelta(days=1))
+
@@ -14,8 +14,11 @@ const api = axios.create({
 // Products
 export const productsApi = {
   getAll: (params?: any) => api.get('/products/', { params }),
+  exportUrl: (params?: Record<string, any>) =>
+    `${API_BASE_URL}/products/export?${new URLSearchParams(params ?? {}).toString()}`,
   getById: (id: number) => api.get(`/products/${id}`),
   create: (data: any) => api.post('/products/', data),
+  bulkCreate: (rows: any[]) => api.post('/products/bulk', rows),
   update: (id: number, data: any) => api.put(`/products/${id}`, data),
   delete: (id: number) => api.delete(`/products/${id}`),
   uploadImage: (id: number, file: File) => {
@@ -50,6 +53,9 @@ export const inventoryApi = {
   getEmptyCategories: () => api.get('/inventory/empty-categories'),
   getDailyLog: (days?: number) => api.get('/inventory/daily-log', { params: { days } }),
   getSoldProducts: (params?: any) => api.get('/inventory/sold-products', { params }),
+  getAging: (categoryId?: number) =>
+    api.get('/inventory/aging', { params: { category_id: categoryId } }),
+  getPriceDistribution: (params?: any) => api.get('/inventory/price-distribution', { params }),
 }
 
 // Finance
@@ -61,6 +67,11 @@ export const financeApi = {
   createExpense: (data: any) => api.post('/finance/expenses', data),
   deleteExpense: (id: number) => api.delete(`/finance/expenses/${id}`),
   getSummary: (params?: any) => api.get('/finance/summary', { params }),
+  transactionsExportUrl: (params?: Record<string, any>) =>
+    `${API_BASE_URL}/finance/transactions/export?${new URLSearchParams(params ?? {}).toString()}`,
+  expensesExportUrl: (params?: Record<string, any>) =>
+    `${API_BASE_URL}/finance/expenses/export?${new URLSearchParams(params ?? {}).toString()}`,
+  getProductProfit: (params?: any) => api.get('/finance/product-profit', { params }),
 }
 
 // Calendar
@@ -131,6 +142,7 @@ export const marketplaceSearchApi = {
 // AI Agent
 export const aiApi = {
   status: () => api.get('/ai/status'),
+  metrics: (hours: number = 24) => api.get('/ai/metrics', { params: { hours } }),
   transcribe: (audioBlob: Blob) => {
     const formData = new FormData()
     formData.append('audio', audioBlob, 'recording.webm')
@@ -139,10 +151,13 @@ export const aiApi = {
       timeout: 30000,
     })
   },
-  analyze: (images: File[], description: string) => {
+  // Fotoğraf kayıtlı bir ürünle eşleşirse yanıt o ürünün formunu ve duplicate_of'u taşır;
+  // checkDuplicates=false her durumda AI analizi yaptırır
+  analyze: (images: File[], description: string, checkDuplicates: boolean = true) => {
     const formData = new FormData()
     images.forEach((img) => formData.append('images', img))
     formData.append('description', description)
+    formData.append('check_duplicates', String(checkDuplicates))
     return api.post('/ai/analyze', formData, {
       headers: { 'Content-Type': 'multipart/form-data', 'ngrok-skip-browser-warning': 'true' },
       timeout: 180000,
@@ -158,10 +173,67 @@ export const aiApi = {
       timeout: 180000,
     })
   },
-  categoryAssist: (message: string, currentCategory?: any) =>
+  // Arka planda çalıştır: hemen { job_id, status_url, events_url } döner (202)
+  analyzeAndSaveJob: (images: File[], description: string, autoSave: boolean = false) => {
+    const formData = new FormData()
+    images.forEach((img) => formData.append('images', img))
+    formData.append('description', description)
+    formData.append('auto_save', String(autoSave))
+    formData.append('background', 'true')
+    return api.post('/ai/analyze-and-save', formData, {
+      headers: { 'Content-Type': 'multipart/form-data', 'ngrok-skip-browser-warning': 'true' },
+      timeout: 60000,
+    })
+  },
+  getJob: (jobId: string) => api.get(`/ai/jobs/${jobId}`),
+  // SSE: alanlar tamamlandıkça onEvent('field' | 'spec' | 'result' | 'error', data)
+  analyzeStream: async (
+    images: File[],
+    description: string,
+    onEvent: (event: string, data: any) => void,
+    signal?: AbortSignal,
+    checkDuplicates: boolean = true,
+  ) => {
+    const formData = new FormData()
+    images.forEach((img) => formData.append('images', img))
+    formData.append('description', description)
+    formData.append('check_duplicates', String(checkDuplicates))
+    const res = await fetch(`${API_BASE_URL}/ai/analyze-stream`, {
+      method: 'POST',
+      body: formData,
+      headers: { 'ngrok-skip-browser-warning': 'true' },
+      signal,
+    })
+    if (!res.ok || !res.body) throw new Error(`Analiz akışı başlatılamadı (${res.status})`)
+    const reader = res.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    for (;;) {
+      const { done, value } = await reader.read()
+      if (done) break
+      buffer += decoder.decode(value, { stream: true })
+      let sep
+      while ((sep = buffer.indexOf('\n\n')) >= 0) {
+        const block = buffer.slice(0, sep)
+        buffer = buffer.slice(sep + 2)
+        let event = 'message'
+        let data = ''
+        for (const line of block.split('\n')) {
+          if (line.startsWith('event: ')) event = line.slice(7)
+          else if (line.startsWith('data: ')) data += line.slice(6)
+        }
+        if (data) onEvent(event, JSON.parse(data))
+      }
+    }
+  },
+  analyzeBatch: (descriptions: string[]) =>
+    api.post('/ai/analyze-batch', { descriptions }, { timeout: 300000 }),
+  // mode 'patch': model sadece değişiklik işlemlerini döner; 'full': kategoriyi baştan üretir
+  categoryAssist: (message: string, currentCategory?: any, mode: 'patch' | 'full' = 'patch') =>
     api.post('/ai/category-assist', {
       message,
       current_category: currentCategory || null,
+      mode,
     }, { timeout: 120000 }),
 }
 